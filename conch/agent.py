@@ -7,12 +7,12 @@ import urllib.request
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .commands import handle_slash_command
-from .config import load_config
+from .config import get_int, load_config
 from .conversations import ConversationManager
 from .memory import MemoryStore
 from .providers import DEFAULT_API_KEY_ENVS, RAW_FNS, estimate_cost
-from .prompts import get_chat_prompt
-from .runtime import chat_turn
+from .prompts import build_system_prompt as _build_system_prompt, get_chat_prompt
+from .runtime import DEFAULT_HISTORY_TOOL_CHARS, DEFAULT_MAX_TURNS, chat_turn, window_start
 from .scheduler import Scheduler
 from .tooling import (
     ConchConfigClient,
@@ -42,7 +42,7 @@ def _detect_location():
         req = urllib.request.Request("https://ipinfo.io/json", headers={"User-Agent": "conch/1.0"})
         with urllib.request.urlopen(req, timeout=3) as resp:
             import json
-            data = json.loads(resp.read().decode())
+            data = json.loads(resp.read())
         parts = [v for v in (data.get("city"), data.get("region"), data.get("country")) if v]
         loc = ", ".join(dict.fromkeys(parts))
         if data.get("timezone"):
@@ -52,18 +52,6 @@ def _detect_location():
         return ""
 
 
-def _build_system_prompt(base_prompt, location="", provider="", model=""):
-    now = datetime.datetime.now()
-    tz_name = datetime.datetime.now(datetime.timezone.utc).astimezone().tzname()
-    parts = ["Current date and time: " + now.strftime("%A, %B %d, %Y %I:%M %p") + " (timezone: " + tz_name + ")."]
-    if location:
-        parts.append("User location: " + location + ".")
-    if provider and model:
-        parts.append("You are currently running as " + provider + "/" + model + ".")
-    parts.append("Use this for any time-sensitive or location-relevant requests.")
-    return base_prompt + "\n\n" + " ".join(parts)
-
-
 def _make_builtin_clients(memory, interactive=True):
     local_shell = LocalShellClient()
     local_shell.set_policy(LocalShellPolicy(interactive=interactive, allow_auto_execute=get_agent_mode()))
@@ -84,7 +72,7 @@ def _make_builtin_clients(memory, interactive=True):
 def _load_runtime_tools(builtin_clients, log=None):
     mcp_clients = mcp_mod.create_clients()
     all_tools, tool_map = mcp_mod.collect_tools(mcp_clients)
-    mcp_mod.save_tool_cache(all_tools)
+    mcp_mod.save_tool_cache(all_tools, tool_map)
     inject_builtin_tools(all_tools, tool_map, builtin_clients)
     prefs = load_tool_prefs()
     prefs, auto_disabled = auto_disable_oversized_groups(all_tools, tool_map, prefs)
@@ -120,6 +108,7 @@ class AgentSession:
         base_prompt = self.config.get("chat_system_prompt") or get_chat_prompt(self.provider, self.model_name)
         self.location = _detect_location()
         self.system_prompt = _build_system_prompt(base_prompt, self.location, self.provider, self.model_name)
+        self._prompt_date = datetime.date.today()
         self._base_prompt = base_prompt
         self.memory = MemoryStore()
         self.builtin_clients = _make_builtin_clients(self.memory, interactive=interactive)
@@ -146,13 +135,21 @@ class AgentSession:
     def turn(self, user_input, on_token=None):
         """Run one agent turn. Returns (reply_text, usage_dict)."""
         self.builtin_clients["local_shell"].set_policy(LocalShellPolicy(interactive=True, allow_auto_execute=get_agent_mode()))
-        mem_context = self.memory.build_context(user_input)
-        self.messages[0]["content"] = self.system_prompt + ("\n\n" + mem_context if mem_context else "")
+        # The prompt states the date; rebuild it when the day changes, not
+        # every turn, so the provider's cached prompt prefix stays valid.
+        today = datetime.date.today()
+        if today != self._prompt_date:
+            self.system_prompt = _build_system_prompt(self._base_prompt, self.location, self.provider, self.model_name)
+            self._prompt_date = today
+        self.messages[0]["content"] = self.system_prompt
         self.messages.append({"role": "user", "content": user_input})
         reply, turn_usage = chat_turn(
             self.config, self.provider, self.raw_fn, self.messages,
             self.chat_state.tools, self.chat_state.tool_map, self.builtin_clients,
             max_tool_rounds=self.max_tool_rounds, chat_state=self.chat_state, on_token=on_token,
+            context=self.memory.build_context(user_input),
+            history_start=window_start(self.messages, get_int(self.config, "max_turns", DEFAULT_MAX_TURNS)),
+            tool_result_chars=get_int(self.config, "history_tool_result_chars", DEFAULT_HISTORY_TOOL_CHARS),
         )
         if reply:
             self.messages.append({"role": "assistant", "content": reply})
@@ -8,11 +8,7 @@ import os
 import shutil
 import sys
 import threading
-
-try:
-    import readline
-except ImportError:
-    readline = None
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import select
@@ -21,17 +17,23 @@ try:
     _HAS_TERMIOS = True
 except ImportError:
     _HAS_TERMIOS = False
-import urllib.request
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 
-from .commands import handle_slash_command
-from .config import load_config
-from .conversations import Conversation, ConversationManager
+from .config import get_bool, get_int, load_config
 from .memory import MemoryStore
-from .providers import DEFAULT_API_KEY_ENVS, RAW_FNS
+from .providers import DEFAULT_API_KEY_ENVS, RAW_FNS, prewarm_connection
 from .render import highlight, StreamPrinter
-from .runtime import chat_turn, sanitize_anthropic_messages
-from .scheduler import Scheduler
+from .runtime import (
+    DEFAULT_HISTORY_TOOL_CHARS,
+    DEFAULT_MAX_TURNS,
+    SUMMARY_KEEP_TURNS,
+    HistorySummarizer,
+    chat_turn,
+    estimate_tokens,
+    history_view,
+    sanitize_anthropic_messages,
+    window_start,
+)
 from .tooling import (
     ConchConfigClient,
     PublicApiClient,
@@ -43,21 +45,31 @@ from .tooling import (
     apply_filter,
     auto_disable_oversized_groups,
     cap_tools,
+    core_tools,
     get_agent_mode,
     inject_builtin_tools,
     load_tool_prefs,
     save_tool_prefs,
     set_agent_mode,
+    wants_tools,
 )
 from . import mcp as mcp_mod
 
 
-from .prompts import get_chat_prompt
+from .prompts import build_system_prompt as _build_system_prompt, get_chat_prompt
+
+if TYPE_CHECKING:
+    from .conversations import Conversation
 
 CHAT_SYSTEM_PROMPT = None  # resolved per-provider at startup
 
 MAX_TOOL_ROUNDS = 25  # default, adjustable via /rounds
 
+_PROMPT = "\033[1;33myou:\033[0m "
+_REPLY_HEADER = "\n\033[1;36massistant:\033[0m"
+_HISTORY_LENGTH = 500  # readline entries kept in chat_history
+_EXIT_WORDS = frozenset({"exit", "quit", "/q"})
+
 CONCH_SHELL_ART = [
     "      ,/",
     "     //",
@@ -73,10 +85,12 @@ CONCH_SHELL_ART = [
 
 def _detect_location() -> str:
     try:
+        import urllib.request
+
         request = urllib.request.Request("https://ipinfo.io/json", headers={"User-Agent": "conch/1.0"})
         with urllib.request.urlopen(request, timeout=3) as response:
             import json
-            data = json.loads(response.read().decode())
+            data = json.loads(response.read())
         parts = [value for value in (data.get("city"), data.get("region"), data.get("country")) if value]
         location = ", ".join(dict.fromkeys(parts))
         if data.get("timezone"):
@@ -86,16 +100,36 @@ def _detect_location() -> str:
         return ""
 
 
-def _build_system_prompt(base_prompt: str, location: str = "", provider: str = "", model: str = "") -> str:
-    now = datetime.datetime.now()
-    tz_name = datetime.datetime.now(datetime.timezone.utc).astimezone().tzname()
-    parts = [f"Current date and time: {now.strftime('%A, %B %d, %Y %I:%M %p')} (timezone: {tz_name})."]
-    if location:
-        parts.append(f"User location: {location}.")
-    if provider and model:
-        parts.append(f"You are currently running as {provider}/{model}.")
-    parts.append("Use this for any time-sensitive or location-relevant requests.")
-    return base_prompt + "\n\n" + " ".join(parts)
+def _save_history(line_editor, history_file: str, start: int) -> int:
+    """Persist the input lines entered since history index *start*.
+
+    Appends just the new entries when readline supports it.  Once the
+    in-memory history has hit its cap, older entries may have been
+    dropped, so the whole (bounded) history is rewritten instead.
+    *start* is clamped to the current history, and the history length is
+    returned as the start for a later save.
+    """
+    length = line_editor.get_current_history_length()
+    start = min(max(start, 0), length)
+    try:
+        if length < _HISTORY_LENGTH and hasattr(line_editor, "append_history_file") and os.path.exists(history_file):
+            if length > start:
+                line_editor.append_history_file(length - start, history_file)
+        else:
+            line_editor.write_history_file(history_file)
+    except OSError:
+        pass
+    return length
+
+
+def _read_line(prompt: str) -> str:
+    """Write *prompt* and read one line from stdin without readline."""
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip("\r\n")
 
 
 def _history_path() -> str:
@@ -123,35 +157,38 @@ def _make_builtin_clients(memory: MemoryStore, interactive: bool = True) -> Dict
     }
 
 
-def _load_runtime_tools(builtin_clients: Dict[str, Any], use_cache: bool = False):
+def _load_runtime_tools(builtin_clients: Dict[str, Any], use_cache: bool = False, use_daemon: bool = False):
+    if use_daemon:
+        from . import daemon as daemon_mod
+
+        loaded = daemon_mod.load_tools()
+        if loaded is not None:
+            all_tools, tool_map = loaded
+            return {}, _tool_state(all_tools, tool_map, builtin_clients)
     if use_cache:
         cached = mcp_mod.load_cached_tools()
         if cached is not None:
-            mcp_clients = mcp_mod.create_clients()
+            # Servers are only spawned when one of their tools is called;
+            # older caches without server names fall back to asking them.
+            mcp_clients = mcp_mod.create_clients(lazy=True)
             all_tools = list(cached)
-            tool_map: Dict[str, Any] = {}
-            # Map cached tools to clients by server name
-            for client in mcp_clients.values():
-                try:
-                    live = client.list_tools()
-                except Exception:
-                    live = []
-                for t in live:
-                    tool_map[t["function"]["name"]] = client
-            inject_builtin_tools(all_tools, tool_map, builtin_clients)
-            prefs = load_tool_prefs()
-            prefs, _ = auto_disable_oversized_groups(all_tools, tool_map, prefs)
-            tools = cap_tools(apply_filter(all_tools, tool_map, prefs))
-            state = ToolRuntimeState(all_tools=all_tools, tool_map=tool_map, tools=tools)
-            builtin_clients["manage_tools"].bind(state)
-            return mcp_clients, state
+            tool_map = mcp_mod.load_cached_tool_map(mcp_clients)
+            if tool_map is None:
+                _, tool_map = mcp_mod.collect_tools(mcp_clients)
+            return mcp_clients, _tool_state(all_tools, tool_map, builtin_clients)
     mcp_clients = mcp_mod.create_clients()
     all_tools, tool_map = mcp_mod.collect_tools(mcp_clients)
-    mcp_mod.save_tool_cache(all_tools)
+    mcp_mod.save_tool_cache(all_tools, tool_map)
+    return mcp_clients, _tool_state(all_tools, tool_map, builtin_clients, announce=True)
+
+
+def _tool_state(
+    all_tools: List[dict], tool_map: Dict[str, Any], builtin_clients: Dict[str, Any], announce: bool = False
+) -> ToolRuntimeState:
     inject_builtin_tools(all_tools, tool_map, builtin_clients)
     prefs = load_tool_prefs()
     prefs, auto_disabled = auto_disable_oversized_groups(all_tools, tool_map, prefs)
-    if auto_disabled:
+    if auto_disabled and announce:
         save_tool_prefs(prefs)
         for group_name, count in auto_disabled:
             print(
@@ -161,7 +198,7 @@ def _load_runtime_tools(builtin_clients: Dict[str, Any], use_cache: bool = False
     tools = cap_tools(apply_filter(all_tools, tool_map, prefs))
     state = ToolRuntimeState(all_tools=all_tools, tool_map=tool_map, tools=tools)
     builtin_clients["manage_tools"].bind(state)
-    return mcp_clients, state
+    return state
 
 
 def _summarize_and_save(messages: List[dict], config: dict, raw_fn, memory: MemoryStore):
@@ -183,6 +220,21 @@ def _summarize_and_save(messages: List[dict], config: dict, raw_fn, memory: Memo
         pass
 
 
+def _summarize_in_background(messages: List[dict], config: dict, raw_fn, memory: MemoryStore) -> threading.Thread:
+    """Start _summarize_and_save on a worker thread and return the thread.
+
+    The summary is a full LLM round trip; running it off the input loop
+    lets /new and exit continue while it is in flight.
+    """
+    thread = threading.Thread(
+        target=_summarize_and_save,
+        args=(list(messages), dict(config), raw_fn, memory),
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
 def _conversation_title(conv: Conversation, messages: List[dict]) -> str:
     if conv.title and conv.title != "New conversation":
         return conv.title
@@ -284,6 +336,10 @@ class TypeaheadBuffer:
 
 
 def chat_loop():
+    # Only the interactive loop needs these; one-shot runs skip the imports.
+    from .conversations import ConversationManager
+    from .scheduler import Scheduler
+
     config = load_config()
     provider = (config.get("provider") or "openai").lower()
     raw_fn = RAW_FNS.get(provider)
@@ -303,6 +359,7 @@ def chat_loop():
     _loc_thread.start()
 
     system_prompt = _build_system_prompt(base_prompt, provider=provider, model=model_name)
+    system_prompt_date = datetime.date.today()
     memory = MemoryStore()
     builtin_clients = _make_builtin_clients(memory, interactive=True)
 
@@ -347,6 +404,7 @@ def chat_loop():
 
     max_tool_rounds = MAX_TOOL_ROUNDS
     session_usage = {"input_tokens": 0, "output_tokens": 0, "cost": 0.0, "turns": 0}
+    turns_without_tools = 0
 
     conv_mgr = ConversationManager()
     current_conv = conv_mgr.get_most_recent()
@@ -382,14 +440,23 @@ def chat_loop():
         messages = [{"role": "system", "content": system_prompt}]
         current_conv.messages = messages
 
+    # Readline only helps an interactive terminal; piped input and
+    # use_readline=false read straight from stdin instead.
+    line_editor = None
+    if sys.stdin.isatty() and get_bool(config, "use_readline", True):
+        try:
+            import readline as line_editor
+        except ImportError:
+            pass
     history_file = _history_path()
     os.makedirs(os.path.dirname(history_file), exist_ok=True)
-    if readline:
+    if line_editor:
         try:
-            readline.read_history_file(history_file)
+            line_editor.read_history_file(history_file)
         except (FileNotFoundError, OSError):
             pass
-        readline.set_history_length(500)
+        line_editor.set_history_length(_HISTORY_LENGTH)
+        readline_start = line_editor.get_current_history_length()
 
     _SLASH_COMMANDS = [
         "/help", "/models", "/model", "/provider", "/remember", "/memories",
@@ -407,10 +474,13 @@ def chat_loop():
             matches = []
         return matches[state] if state < len(matches) else None
 
-    if readline:
-        readline.set_completer(_completer)
-        readline.set_completer_delims(" ")
-        readline.parse_and_bind("tab: complete")
+    if line_editor:
+        line_editor.set_completer(_completer)
+        line_editor.set_completer_delims(" ")
+        line_editor.parse_and_bind("tab: complete")
+
+    summary_threads: List[threading.Thread] = []
+    history = HistorySummarizer()
 
     def _save_current():
         current_conv.messages = messages
@@ -487,21 +557,29 @@ def chat_loop():
     _typeahead_enabled = True
     _typeahead_queued: list[str] = []
     _typeahead_partial = ""
+    prewarmed = ""
 
     last_interrupt = 0.0
     try:
         while True:
             if _typeahead_queued:
                 user_input = _typeahead_queued.pop(0)
-                print(f"\033[1;33myou:\033[0m \033[2m{user_input}\033[0m")
+                print(_PROMPT + "\033[2m" + user_input + "\033[0m")
             else:
-                if _typeahead_partial:
-                    prefill = _typeahead_partial
-                    _typeahead_partial = ""
-                    if readline:
-                        readline.set_startup_hook(lambda: readline.insert_text(prefill))
+                # Dial the API while the user types, so the first turn does
+                # not start with a DNS/TCP/TLS handshake; later turns reuse
+                # the pooled connection until the provider or host changes.
+                if get_bool(config, "prewarm_connections", True):
+                    prewarmed = prewarm_connection(config, provider, prewarmed)
+                prefill = _typeahead_partial
+                _typeahead_partial = ""
+                if prefill and line_editor:
+                    line_editor.set_startup_hook(lambda: line_editor.insert_text(prefill))
                 try:
-                    user_input = input("\033[1;33myou:\033[0m ")
+                    if line_editor:
+                        user_input = input(_PROMPT)
+                    else:
+                        user_input = prefill + _read_line(_PROMPT + prefill)
                 except EOFError:
                     print("\n")
                     break
@@ -514,13 +592,15 @@ def chat_loop():
                     print("\n  \033[2m(Ctrl+C again to exit)\033[0m\n")
                     continue
                 finally:
-                    if readline:
-                        readline.set_startup_hook()
+                    if line_editor:
+                        line_editor.set_startup_hook()
 
             stripped = user_input.strip()
             if not stripped:
                 continue
-            if stripped.lower() in ("exit", "quit", "/q"):
+            # Length check first: long pastes are never exit words, so skip
+            # lowercasing a copy of them.
+            if len(stripped) <= 4 and stripped.lower() in _EXIT_WORDS:
                 break
 
             builtin_clients["local_shell"].set_policy(
@@ -528,6 +608,8 @@ def chat_loop():
             )
 
             if stripped.startswith("/"):
+                from .commands import handle_slash_command
+
                 result = handle_slash_command(
                     stripped,
                     config,
@@ -544,7 +626,7 @@ def chat_loop():
                 )
                 if result == "new_conversation":
                     _save_current()
-                    _summarize_and_save(messages, config, raw_fn, memory)
+                    summary_threads.append(_summarize_in_background(messages, config, raw_fn, memory))
                     current_conv = conv_mgr.create(model=model_name, provider=provider)
                     messages = [{"role": "system", "content": system_prompt}]
                     current_conv.messages = messages
@@ -555,6 +637,7 @@ def chat_loop():
                     messages.clear()
                     messages.append({"role": "system", "content": system_prompt})
                     current_conv.messages = messages
+                    history.reset(current_conv.id)
                     _save_current()
                     print(f"\n  \033[1;32m\u2713 Cleared {old_count} messages\033[0m\n")
                     continue
@@ -591,9 +674,34 @@ def chat_loop():
                 current_conv.title = user_input.strip().splitlines()[0][:60] or "New conversation"
 
             turn_snapshot = copy.deepcopy(messages)
-            mem_context = memory.build_context(user_input)
-            messages[0]["content"] = system_prompt + ("\n\n" + mem_context if mem_context else "")
             messages.append({"role": "user", "content": user_input})
+            # Older turns stay in the conversation (and on disk); only the
+            # request is windowed.
+            window_from = window_start(messages, get_int(config, "max_turns", DEFAULT_MAX_TURNS))
+            tool_result_chars = get_int(config, "history_tool_result_chars", DEFAULT_HISTORY_TOOL_CHARS)
+            summarize_after = get_int(config, "summarize_after_tokens", 0)
+            if summarize_after > 0:
+                if estimate_tokens(history_view(messages, window_from, tool_result_chars)) > summarize_after:
+                    window_from = max(window_from, window_start(messages, SUMMARY_KEEP_TURNS))
+                window_from = history.advance(current_conv.id, messages, window_from, config, raw_fn)
+            # The prompt states the date; rebuild it when the day changes, not
+            # every turn, so the provider's cached prompt prefix stays valid.
+            today = datetime.date.today()
+            if today != system_prompt_date:
+                system_prompt = _build_system_prompt(base_prompt, _location_result[0], provider, model_name)
+                system_prompt_date = today
+            messages[0]["content"] = system_prompt
+            turn_context = "\n\n".join(
+                part for part in (history.current(current_conv.id), memory.build_context(user_input)) if part
+            )
+
+            # With idle_tool_turns set, send only local_shell and manage_tools
+            # after that many turns without a tool call, until a turn asks
+            # for an action or the model reaches for a tool itself.
+            turn_tools = chat_state.tools
+            idle_tool_turns = get_int(config, "idle_tool_turns", 0)
+            if idle_tool_turns > 0 and turns_without_tools >= idle_tool_turns and not wants_tools(user_input):
+                turn_tools = core_tools(chat_state.tools)
 
             if _typeahead_enabled:
                 _typeahead.start()
@@ -602,7 +710,7 @@ def chat_loop():
             _printer = StreamPrinter() if _use_streaming else None
 
             if _use_streaming:
-                print(f"\n\033[1;36massistant:\033[0m")
+                print(_REPLY_HEADER)
 
             try:
                 reply, turn_usage = chat_turn(
@@ -610,12 +718,15 @@ def chat_loop():
                     provider,
                     raw_fn,
                     messages,
-                    chat_state.tools,
+                    turn_tools,
                     chat_state.tool_map,
                     builtin_clients,
                     max_tool_rounds=max_tool_rounds,
                     chat_state=chat_state,
                     on_token=_printer.feed if _printer else None,
+                    context=turn_context,
+                    history_start=window_from,
+                    tool_result_chars=tool_result_chars,
                 )
             except KeyboardInterrupt:
                 _typeahead.stop()
@@ -632,12 +743,15 @@ def chat_loop():
                 if _printer:
                     _printer.flush()
                 else:
-                    print(f"\n\033[1;36massistant:\033[0m\n{highlight(reply)}\n")
+                    print(_REPLY_HEADER)
+                    print(highlight(reply) + "\n")
             else:
                 if _printer:
                     _printer.flush()
                 print("\n\033[2m[no response]\033[0m\n")
 
+            turns_without_tools = 0 if turn_usage.get("tool_calls") else turns_without_tools + 1
+
             # Display token/cost info
             in_tok = turn_usage.get("input_tokens", 0)
             out_tok = turn_usage.get("output_tokens", 0)
@@ -684,6 +798,7 @@ def chat_loop():
                     messages.clear()
                     messages.append({"role": "system", "content": system_prompt})
                     current_conv.messages = messages
+                    history.reset(current_conv.id)
                     print(f"  \033[1;32m\u2713 Cleared {old_count} messages\033[0m")
                 elif _action[0] == "new_conversation":
                     _save_current()
@@ -705,21 +820,91 @@ def chat_loop():
                 print(f"\n\033[2mSession: {turns} turns, {total_in:,} in / {total_out:,} out tokens, ~${total_cost:.4f}\033[0m")
             else:
                 print(f"\n\033[2mSession: {turns} turns, {total_in:,} in / {total_out:,} out tokens, free\033[0m")
-        _summarize_and_save(messages, config, raw_fn, memory)
+        summary_threads.append(_summarize_in_background(messages, config, raw_fn, memory))
         sched.stop()
-        if readline:
-            try:
-                readline.write_history_file(history_file)
-            except OSError:
-                pass
+        if line_editor:
+            _save_history(line_editor, history_file, readline_start)
+        for thread in summary_threads:
+            thread.join()
         mcp_mod.close_all(mcp_clients)
 
 
+def _run_batch(config: dict, provider: str, raw_fn, source=None, use_api: bool = False) -> int:
+    """Answer newline-delimited prompts from *source* (default stdin).
+
+    Replies are printed in input order, separated by blank lines. Batch
+    prompts run without tools so they can safely share one process. With
+    *use_api*, OpenAI and Anthropic prompts go through the provider's
+    asynchronous batch endpoint (half price, up to 24h turnaround) instead
+    of concurrent synchronous calls.
+    """
+    prompts = [line.strip() for line in (source or sys.stdin) if line.strip()]
+    if not prompts:
+        return 0
+    model_name = config.get("chat_model", config.get("model", ""))
+    base_prompt = config.get("chat_system_prompt") or get_chat_prompt(provider, model_name)
+    system_prompt = _build_system_prompt(base_prompt, provider=provider, model=model_name)
+    requests = [
+        [{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}]
+        for prompt in prompts
+    ]
+
+    from .render import Spinner
+    if use_api:
+        from .batches import BATCH_FNS, DEFAULT_POLL_SECONDS
+        batch_fn = BATCH_FNS.get(provider)
+        if not batch_fn:
+            print(f"conch: --batch-api is not supported for {provider}", file=sys.stderr)
+            return 1
+        poll = get_int(config, "batch_poll_seconds", DEFAULT_POLL_SECONDS)
+        try:
+            with Spinner(f"Waiting for {provider} batch of {len(prompts)} prompts"):
+                replies = batch_fn(config, requests, poll_seconds=poll)
+        except Exception as e:
+            print(f"conch: batch failed: {e}", file=sys.stderr)
+            return 1
+    else:
+        def _ask(messages: list) -> str:
+            return raw_fn(config, messages, None).get("content", "")
+
+        workers = min(max(1, get_int(config, "batch_concurrency", 8)), len(prompts))
+        with Spinner(f"Running {len(prompts)} prompts"), ThreadPoolExecutor(max_workers=workers) as pool:
+            replies = list(pool.map(_ask, requests))
+
+    failures = 0
+    for i, reply in enumerate(replies):
+        if not reply or reply.startswith(("[API error:", "[Ollama error:")):
+            failures += 1
+            print(f"conch: prompt {i + 1} failed: {reply or '[no response]'}", file=sys.stderr)
+            continue
+        if i > failures:
+            print()
+        print(reply)
+    return 1 if failures else 0
+
+
 def main():
     if "--slack" in sys.argv:
         from .slack import main as slack_main
         slack_main()
         return
+    if "--batch" in sys.argv or "--batch-api" in sys.argv:
+        config = load_config()
+        provider = (config.get("provider") or "openai").lower()
+        raw_fn = RAW_FNS.get(provider)
+        if not raw_fn:
+            print(f"conch: unknown provider {provider}", file=sys.stderr)
+            sys.exit(1)
+        files = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+        use_api = "--batch-api" in sys.argv
+        if not files:
+            sys.exit(_run_batch(config, provider, raw_fn, use_api=use_api))
+        try:
+            with open(files[0], encoding="utf-8") as source:
+                sys.exit(_run_batch(config, provider, raw_fn, source, use_api=use_api))
+        except OSError as e:
+            print(f"conch: {e}", file=sys.stderr)
+            sys.exit(1)
     if len(sys.argv) > 1 and sys.argv[1] != "--slack":
         config = load_config()
         provider = (config.get("provider") or "openai").lower()
@@ -727,15 +912,27 @@ def main():
         if not raw_fn:
             print(f"conch: unknown provider {provider}", file=sys.stderr)
             sys.exit(1)
-        system_prompt = _build_system_prompt(config.get("chat_system_prompt", CHAT_SYSTEM_PROMPT), _detect_location(), provider, config.get("chat_model", ""))
-        user_text = " ".join(sys.argv[1:])
-        memory = MemoryStore()
-        mem_context = memory.build_context(user_text)
-        if mem_context:
-            system_prompt += "\n\n" + mem_context
-        builtin_clients = _make_builtin_clients(memory, interactive=True)
-        mcp_clients, chat_state = _load_runtime_tools(builtin_clients)
+        model_name = config.get("chat_model", config.get("model", ""))
+        base_prompt = config.get("chat_system_prompt") or get_chat_prompt(provider, model_name)
+        system_prompt = _build_system_prompt(base_prompt, _detect_location(), provider, model_name)
+        args = sys.argv[1:]
+        use_tools = "--no-tools" not in args
+        use_memory = "--no-memory" not in args
+        user_text = " ".join(arg for arg in args if arg not in ("--no-tools", "--no-memory"))
+        memory = MemoryStore() if use_tools or use_memory else None
+        mem_context = memory.build_context(user_text) if use_memory else ""
+        if use_tools:
+            builtin_clients = _make_builtin_clients(memory, interactive=True)
+            mcp_clients, chat_state = _load_runtime_tools(
+                builtin_clients,
+                use_cache=get_bool(config, "mcp_tool_cache", True),
+                use_daemon=get_bool(config, "mcp_daemon", False),
+            )
+        else:
+            builtin_clients, mcp_clients = {}, {}
+            chat_state = ToolRuntimeState(all_tools=[], tool_map={}, tools=[])
         messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_text}]
+        printer = StreamPrinter() if sys.stdout.isatty() else None
         try:
             reply, _usage = chat_turn(
                 config,
@@ -747,9 +944,14 @@ def main():
                 builtin_clients,
                 max_tool_rounds=MAX_TOOL_ROUNDS,
                 chat_state=chat_state,
+                on_token=printer.feed if printer else None,
+                context=mem_context,
             )
+            if printer:
+                printer.flush()
             if reply:
-                print(highlight(reply))
+                if not printer:
+                    print(highlight(reply))
             else:
                 print("[no response]", file=sys.stderr)
                 sys.exit(1)
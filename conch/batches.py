@@ -0,0 +1,171 @@
+"""Provider batch APIs for bulk, non-interactive prompts.
+
+OpenAI's Batch API and Anthropic's Message Batches API process requests
+asynchronously (within 24 hours) at half the synchronous price.  These
+helpers submit one batch, poll until it finishes and return the replies in
+input order.  Failed entries come back as "[API error: ...]" strings, the
+same shape the synchronous raw_* calls use.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from .fastjson import dumps, loads
+from .httppool import urlopen
+from .providers import resolve_config
+
+DEFAULT_POLL_SECONDS = 30
+
+_OPENAI_DONE = ("completed", "failed", "expired", "cancelled")
+
+
+def _multipart(fields: Dict[str, str], filename: str, content: bytes):
+    """Encode a multipart/form-data body with one file part."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    parts.append(
+        (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            "Content-Type: application/jsonl\r\n\r\n"
+        ).encode()
+    )
+    parts.append(content)
+    parts.append(f"\r\n--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def _get(url: str, headers: Dict[str, str], timeout: float = 60) -> bytes:
+    with urlopen(url, None, headers, method="GET", timeout=timeout) as response:
+        return response.read()
+
+
+def _post(url: str, body: bytes, headers: Dict[str, str], timeout: float = 60) -> bytes:
+    with urlopen(url, body, headers, timeout=timeout) as response:
+        return response.read()
+
+
+def _wait(poll: Callable[[], Optional[dict]], interval: float) -> dict:
+    while True:
+        status = poll()
+        if status is not None:
+            return status
+        time.sleep(interval)
+
+
+def run_openai_batch(
+    config: dict,
+    requests: List[List[dict]],
+    poll_seconds: float = DEFAULT_POLL_SECONDS,
+) -> List[str]:
+    """Answer each message list in *requests* through the OpenAI Batch API."""
+    cfg = resolve_config(config, "openai")
+    if not cfg.api_key:
+        raise RuntimeError("OPENAI_API_KEY not set")
+    auth = {"Authorization": f"Bearer {cfg.api_key}"}
+    lines = b"".join(
+        dumps({
+            "custom_id": f"req-{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {"model": cfg.model, "messages": messages, "temperature": cfg.temperature},
+        }) + b"\n"
+        for i, messages in enumerate(requests)
+    )
+    form, content_type = _multipart({"purpose": "batch"}, "conch-batch.jsonl", lines)
+    upload = loads(_post(f"{cfg.base_url}/files", form, {**auth, "Content-Type": content_type}))
+    batch = loads(_post(
+        f"{cfg.base_url}/batches",
+        dumps({
+            "input_file_id": upload["id"],
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h",
+        }),
+        {**auth, "Content-Type": "application/json"},
+    ))
+
+    def _poll() -> Optional[dict]:
+        status = loads(_get(f"{cfg.base_url}/batches/{batch['id']}", auth))
+        return status if status.get("status") in _OPENAI_DONE else None
+
+    status = _wait(_poll, poll_seconds)
+    replies = [f"[API error: batch {status.get('status')}]"] * len(requests)
+    for file_key in ("output_file_id", "error_file_id"):
+        file_id = status.get(file_key)
+        if not file_id:
+            continue
+        for line in _get(f"{cfg.base_url}/files/{file_id}/content", auth, timeout=300).splitlines():
+            if not line.strip():
+                continue
+            row = loads(line)
+            index = int(row["custom_id"].split("-", 1)[1])
+            response = row.get("response") or {}
+            if response.get("status_code") == 200:
+                replies[index] = response["body"]["choices"][0]["message"].get("content") or ""
+            else:
+                error = row.get("error") or response.get("body", {}).get("error") or {}
+                replies[index] = f"[API error: {error.get('message', 'request failed')}]"
+    return replies
+
+
+def run_anthropic_batch(
+    config: dict,
+    requests: List[List[dict]],
+    poll_seconds: float = DEFAULT_POLL_SECONDS,
+) -> List[str]:
+    """Answer each message list in *requests* through Anthropic Message Batches."""
+    cfg = resolve_config(config, "anthropic")
+    if not cfg.api_key:
+        raise RuntimeError("ANTHROPIC_API_KEY not set")
+    headers = {
+        "Content-Type": "application/json",
+        "x-api-key": cfg.api_key,
+        "anthropic-version": "2023-06-01",
+    }
+    entries = []
+    for i, messages in enumerate(requests):
+        system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+        params = {
+            "model": cfg.model,
+            "max_tokens": 16384,
+            "messages": [m for m in messages if m["role"] != "system"],
+        }
+        if system:
+            params["system"] = system
+        entries.append({"custom_id": f"req-{i}", "params": params})
+    batch = loads(_post(f"{cfg.base_url}/messages/batches", dumps({"requests": entries}), headers))
+
+    def _poll() -> Optional[dict]:
+        status = loads(_get(f"{cfg.base_url}/messages/batches/{batch['id']}", headers))
+        return status if status.get("processing_status") == "ended" else None
+
+    status = _wait(_poll, poll_seconds)
+    replies = ["[API error: no result]"] * len(requests)
+    if not status.get("results_url"):
+        return replies
+    for line in _get(status["results_url"], headers, timeout=300).splitlines():
+        if not line.strip():
+            continue
+        row = loads(line)
+        index = int(row["custom_id"].split("-", 1)[1])
+        result = row.get("result") or {}
+        if result.get("type") == "succeeded":
+            blocks = result["message"].get("content", [])
+            replies[index] = "".join([b["text"] for b in blocks if b.get("type") == "text" and "text" in b])
+        else:
+            error = result.get("error") or {}
+            error = (error.get("error") or error).get("message") or result.get("type", "failed")
+            replies[index] = f"[API error: {error}]"
+    return replies
+
+
+BATCH_FNS = {
+    "openai": run_openai_batch,
+    "anthropic": run_anthropic_batch,
+}
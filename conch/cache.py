@@ -0,0 +1,308 @@
+"""On-disk response cache keyed by the exact request content."""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .fastjson import dumps, loads
+
+try:
+    import numpy as np
+
+    _HAS_NUMPY = True
+except ImportError:
+    _HAS_NUMPY = False
+
+DEFAULT_TTL = 86400  # 24 hours
+
+# Response fields worth replaying; usage is dropped since a hit costs nothing.
+_CACHED_FIELDS = ("role", "content", "tool_calls", "_anthropic_content", "_model")
+
+# In-process LRU in front of the files: entry path -> (stored_at, entry).
+# Keyed by path so a different XDG_CACHE_HOME never sees another's entries.
+_MEMORY_MAX = 256
+_memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _cache_dir() -> Path:
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "conch"
+
+
+def response_key(
+    provider: str,
+    model: str,
+    messages: List[dict],
+    tools: bytes = b"",
+    temperature: float = 0.7,
+) -> str:
+    """Return a SHA-256 hex key for one provider request.
+
+    *tools* is the encoded tool list as sent, so a changed description or
+    schema misses the cache just like a changed tool name.
+    """
+    payload = {
+        "provider": provider,
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+    }
+    digest = hashlib.sha256(dumps(payload, sort_keys=True))
+    digest.update(b"\0" + tools)
+    return digest.hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    return _cache_dir() / key[:2] / f"{key}.json"
+
+
+def _cacheable(response: Dict[str, Any]) -> bool:
+    content = response.get("content")
+    return (
+        isinstance(content, str)
+        and bool(content)
+        and not content.startswith(("[API error:", "[Ollama error:"))
+        and not response.get("tool_calls")
+    )
+
+
+def _remember(path: Path, stored_at: float, entry: Dict[str, Any]) -> None:
+    with _memory_lock:
+        _memory[str(path)] = (stored_at, entry)
+        _memory.move_to_end(str(path))
+        while len(_memory) > _MEMORY_MAX:
+            _memory.popitem(last=False)
+
+
+def get(key: str, ttl: int = DEFAULT_TTL) -> Optional[Dict[str, Any]]:
+    """Return the cached response for *key*, or None if missing or stale.
+
+    Recent entries are answered from memory without touching the disk.
+    """
+    path = _entry_path(key)
+    with _memory_lock:
+        held = _memory.get(str(path))
+        if held is not None:
+            _memory.move_to_end(str(path))
+    if held is not None and time.time() - held[0] <= ttl:
+        return copy.deepcopy(held[1])
+    try:
+        stored_at = path.stat().st_mtime
+        if time.time() - stored_at > ttl:
+            return None
+        entry = loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    _remember(path, stored_at, entry)
+    return copy.deepcopy(entry)
+
+
+def put(key: str, response: Dict[str, Any]) -> Dict[str, Any]:
+    """Store a successful plain-text response and return it unchanged.
+
+    Error replies, empty replies and tool-call rounds are not cached.
+    """
+    if not _cacheable(response):
+        return response
+    entry = {field: response[field] for field in _CACHED_FIELDS if field in response}
+    path = _entry_path(key)
+    _remember(path, time.time(), copy.deepcopy(entry))
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(dumps(entry))
+        tmp.replace(path)
+    except (OSError, TypeError):
+        pass
+    return response
+
+
+# ---------------------------------------------------------------------------
+# Semantic cache: reuse replies to near-duplicate prompts
+# ---------------------------------------------------------------------------
+
+DEFAULT_SIMILARITY = 0.92
+DEFAULT_CONTEXT_SIMILARITY = 0.85
+_MAX_SEMANTIC_ROWS = 2000
+
+_semantic_rows: List[Dict[str, Any]] = []
+_semantic_mtime: Optional[float] = None
+# dim -> (row indices, int8 matrix of their vectors, float32 row scales);
+# rebuilt lazily whenever _semantic_rows is replaced.
+_semantic_matrices: Dict[int, Tuple[List[int], Any, Any]] = {}
+# Rows widened to int32 at a time when scoring; bounds the scratch memory.
+_SCORE_BLOCK_ROWS = 1024
+
+
+def _semantic_path() -> Path:
+    return _cache_dir() / "semantic.jsonl"
+
+
+def _unit(vec: List[float]) -> List[float]:
+    norm = sum(x * x for x in vec) ** 0.5
+    return [x / norm for x in vec] if norm else list(vec)
+
+
+def _quantize(unit: List[float]) -> Tuple[List[int], float]:
+    """Quantize a unit vector to int8 values plus one float scale.
+
+    ``unit[i] ~= ints[i] * scale``.  Small ints are shared objects in
+    CPython and serialize to a few bytes each, so rows cost a fraction of
+    the memory and disk space of float lists, and cosine scores move by
+    well under 0.01.
+    """
+    peak = max((abs(x) for x in unit), default=0.0)
+    if not peak:
+        return [0] * len(unit), 0.0
+    scale = peak / 127
+    return [round(x / scale) for x in unit], scale
+
+
+def _row_vector(row: Dict[str, Any], field: str) -> Tuple[Optional[list], float]:
+    """Return (values, scale) for a stored vector; older rows hold floats."""
+    return row.get(field), row.get(field + "_scale", 1.0)
+
+
+def _load_semantic_rows() -> List[Dict[str, Any]]:
+    """Return the semantic rows, re-reading the file only when it changed."""
+    global _semantic_rows, _semantic_mtime
+    path = _semantic_path()
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        _semantic_rows, _semantic_mtime = [], None
+        _semantic_matrices.clear()
+        return _semantic_rows
+    if mtime != _semantic_mtime:
+        rows = []
+        try:
+            with path.open("rb") as fh:
+                for line in fh:
+                    try:
+                        rows.append(loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        _semantic_rows, _semantic_mtime = rows[-_MAX_SEMANTIC_ROWS:], mtime
+        _semantic_matrices.clear()
+    return _semantic_rows
+
+
+def _cosine(unit_a: List[float], unit_b: Optional[list], scale: float = 1.0) -> float:
+    if not unit_b or len(unit_a) != len(unit_b):
+        return -1.0
+    return sum(a * b for a, b in zip(unit_a, unit_b)) * scale
+
+
+def _candidates(query: List[float], threshold: float) -> List[Tuple[float, Dict[str, Any]]]:
+    """Return (similarity, row) pairs with similarity >= *threshold*.
+
+    With NumPy the rows of matching dimension are stacked into one int8
+    matrix (cached until the rows change).  The query is quantized the same
+    way and the dot products are accumulated exactly in int32, a block of
+    rows at a time, so a lookup never holds a widened copy of the whole
+    matrix.  Without NumPy each row is scored in Python.
+    """
+    rows = _load_semantic_rows()
+    if not _HAS_NUMPY:
+        pairs = ((_cosine(query, *_row_vector(row, "vec")), row) for row in rows)
+        return [(sim, row) for sim, row in pairs if sim >= threshold]
+    dim = len(query)
+    if dim not in _semantic_matrices:
+        indices, values, scales = [], [], []
+        for i, row in enumerate(rows):
+            vec, scale = _row_vector(row, "vec")
+            if len(vec or ()) != dim:
+                continue
+            if "vec_scale" not in row:
+                vec, scale = _quantize(vec)
+            indices.append(i)
+            values.append(vec)
+            scales.append(scale)
+        matrix = np.array(values, dtype=np.int8).reshape(-1, dim)
+        _semantic_matrices[dim] = (indices, matrix, np.array(scales, dtype=np.float32))
+    indices, matrix, scales = _semantic_matrices[dim]
+    q_ints, q_scale = _quantize(query)
+    q_vec = np.array(q_ints, dtype=np.int32)
+    dots = np.empty(len(matrix), dtype=np.int64)
+    for lo in range(0, len(matrix), _SCORE_BLOCK_ROWS):
+        dots[lo:lo + _SCORE_BLOCK_ROWS] = matrix[lo:lo + _SCORE_BLOCK_ROWS].astype(np.int32) @ q_vec
+    sims = dots * (scales * q_scale)
+    return [(float(sims[j]), rows[indices[j]]) for j in np.flatnonzero(sims >= threshold)]
+
+
+def semantic_get(
+    vec: List[float],
+    model: str,
+    threshold: float = DEFAULT_SIMILARITY,
+    ttl: int = DEFAULT_TTL,
+    ctx_vec: Optional[List[float]] = None,
+    ctx_threshold: float = DEFAULT_CONTEXT_SIMILARITY,
+) -> Optional[Dict[str, Any]]:
+    """Return the cached reply whose prompt embedding is closest to *vec*.
+
+    Only rows for the same model, younger than *ttl*, with cosine similarity
+    of at least *threshold* qualify.  The preceding conversation must match
+    too: a row stored with context needs ``ctx_vec`` within *ctx_threshold*,
+    and a row stored without context only matches a context-free prompt.
+    This keeps follow-ups like "make it red" from reusing a reply that was
+    given in a different conversation.
+    """
+    query = _unit(vec)
+    query_ctx = _unit(ctx_vec) if ctx_vec else None
+    cutoff = time.time() - ttl
+    best, best_sim = None, threshold
+    for sim, row in _candidates(query, threshold):
+        if sim < best_sim or row.get("model") != model or row.get("ts", 0) < cutoff:
+            continue
+        stored_ctx, ctx_scale = _row_vector(row, "ctx")
+        if (query_ctx is None) != (stored_ctx is None):
+            continue
+        if query_ctx is not None and _cosine(query_ctx, stored_ctx, ctx_scale) < ctx_threshold:
+            continue
+        best, best_sim = row, sim
+    return best.get("reply") if best else None
+
+
+def semantic_put(
+    vec: List[float],
+    model: str,
+    response: Dict[str, Any],
+    ctx_vec: Optional[List[float]] = None,
+) -> None:
+    """Record a plain-text reply under its prompt (and context) embedding."""
+    global _semantic_rows, _semantic_mtime
+    if not _cacheable(response):
+        return
+    row: Dict[str, Any] = {"ts": time.time(), "model": model}
+    row["vec"], row["vec_scale"] = _quantize(_unit(vec))
+    row["ctx"] = None
+    if ctx_vec:
+        row["ctx"], row["ctx_scale"] = _quantize(_unit(ctx_vec))
+    row["reply"] = {field: response[field] for field in _CACHED_FIELDS if field in response}
+    rows = _load_semantic_rows()
+    path = _semantic_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if len(rows) >= _MAX_SEMANTIC_ROWS:
+            kept = rows[-(_MAX_SEMANTIC_ROWS // 2):] + [row]
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(b"".join(dumps(r) + b"\n" for r in kept))
+            tmp.replace(path)
+        else:
+            with path.open("ab") as fh:
+                fh.write(dumps(row) + b"\n")
+            kept = rows + [row]
+        _semantic_rows = kept
+        _semantic_mtime = path.stat().st_mtime
+        _semantic_matrices.clear()
+    except (OSError, TypeError):
+        pass
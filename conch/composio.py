@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
-import json
 import os
-import urllib.request
-import webbrowser
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Tuple
 
+from .fastjson import dumps, loads
+from .httppool import urlopen
+
 _BASE = "https://backend.composio.dev"
 _HEADERS_CACHE: Dict[str, str] = {}
+# app slug -> auth config id; only successful lookups are kept.
+_AUTH_CONFIG_CACHE: Dict[str, str] = {}
 
 
 def _headers() -> Dict[str, str]:
@@ -26,22 +30,14 @@ def _headers() -> Dict[str, str]:
 def _api_get(path: str, params: Optional[Dict[str, str]] = None) -> Any:
     url = _BASE + path
     if params:
-        qs = "&".join(f"{k}={urllib.request.quote(str(v))}" for k, v in params.items() if v)
-        url += "?" + qs
-    req = urllib.request.Request(url, headers=_headers())
-    with urllib.request.urlopen(req, timeout=15) as resp:
-        return json.loads(resp.read().decode())
+        url += "?" + urllib.parse.urlencode({k: v for k, v in params.items() if v}, quote_via=urllib.parse.quote)
+    with urlopen(url, headers=_headers(), method="GET", timeout=15) as resp:
+        return loads(resp.read())
 
 
 def _api_post(path: str, body: dict) -> Any:
-    req = urllib.request.Request(
-        _BASE + path,
-        data=json.dumps(body).encode(),
-        headers=_headers(),
-        method="POST",
-    )
-    with urllib.request.urlopen(req, timeout=15) as resp:
-        return json.loads(resp.read().decode())
+    with urlopen(_BASE + path, dumps(body), _headers(), timeout=15) as resp:
+        return loads(resp.read())
 
 
 def is_available() -> bool:
@@ -85,22 +81,10 @@ def check_connection(app_slug: str) -> Tuple[bool, str]:
         return False, f"Failed to check connection: {exc}"
 
 
-def connect(app_slug: str) -> Tuple[bool, str]:
-    """Initiate an OAuth connection for a Composio app.
-
-    1. Look up the auth config for the app
-    2. POST to create a connected account (initiates OAuth)
-    3. Open the browser to the redirect URL
-    """
-    if not is_available():
-        return False, "COMPOSIO_API_KEY not set"
-
-    # Check if already connected
-    connected, msg = check_connection(app_slug)
-    if connected:
-        return True, msg + ". Use /reload to refresh tools."
-
-    # Step 1: Find auth config for this app
+def _auth_config_id(app_slug: str) -> Optional[str]:
+    """Return the auth config id for *app_slug*, cached for the session."""
+    if app_slug in _AUTH_CONFIG_CACHE:
+        return _AUTH_CONFIG_CACHE[app_slug]
     auth_config_id = None
     try:
         data = _api_get("/api/v3/auth_configs", {
@@ -124,6 +108,33 @@ def connect(app_slug: str) -> Tuple[bool, str]:
         except Exception:
             pass
 
+    if auth_config_id:
+        _AUTH_CONFIG_CACHE[app_slug] = auth_config_id
+    return auth_config_id
+
+
+def connect(app_slug: str) -> Tuple[bool, str]:
+    """Initiate an OAuth connection for a Composio app.
+
+    1. Look up the auth config for the app
+    2. POST to create a connected account (initiates OAuth)
+    3. Open the browser to the redirect URL
+    """
+    if not is_available():
+        return False, "COMPOSIO_API_KEY not set"
+
+    # Check if already connected while looking up the auth config (step 1);
+    # the lookup is cached, so it isn't wasted if the app is connected.
+    pool = ThreadPoolExecutor(max_workers=1)
+    auth_future = pool.submit(_auth_config_id, app_slug)
+    # Never wait for the lookup on the way out: when the app is already
+    # connected it is left to finish in the background.
+    pool.shutdown(wait=False)
+    connected, msg = check_connection(app_slug)
+    if connected:
+        return True, msg + ". Use /reload to refresh tools."
+    auth_config_id = auth_future.result()
+
     if not auth_config_id:
         return False, (
             f"No auth config found for '{app_slug}'. "
@@ -155,6 +166,8 @@ def connect(app_slug: str) -> Tuple[bool, str]:
     )
     if redirect_url:
         try:
+            import webbrowser
+
             webbrowser.open(redirect_url)
         except Exception:
             return True, (
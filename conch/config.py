@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
 
 DEFAULT_CONFIG: Dict[str, str] = {
@@ -15,6 +15,23 @@ DEFAULT_CONFIG: Dict[str, str] = {
 }
 
 
+# Stamps of the config files last parsed, and the config they produced.
+_config_cache: Optional[Tuple[tuple, Dict[str, str]]] = None
+
+
+def _config_paths() -> Tuple[Path, Path]:
+    config_dir = Path(os.environ.get("XDG_CONFIG_HOME", Path.home() / ".config")) / "conch"
+    return config_dir / "config", Path.home() / ".conchrc"
+
+
+def _file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
 def _parse_config_file(path: Path) -> Dict[str, str]:
     data: Dict[str, str] = {}
     if not path.exists():
@@ -29,10 +46,22 @@ def _parse_config_file(path: Path) -> Dict[str, str]:
 
 
 def load_config() -> Dict[str, str]:
-    """Load config from the standard Conch locations."""
+    """Load config from the standard Conch locations.
+
+    The parsed result is reused until either file changes; callers get
+    their own copy, since slash commands update it in place.
+    """
+    global _config_cache
+    paths = _config_paths()
+    stamp = tuple((str(path), _file_stamp(path)) for path in paths)
+    if _config_cache is None or _config_cache[0] != stamp:
+        _config_cache = (stamp, _build_config(paths))
+    return dict(_config_cache[1])
+
+
+def _build_config(paths: Tuple[Path, Path]) -> Dict[str, str]:
     config = dict(DEFAULT_CONFIG)
-    config_dir = Path(os.environ.get("XDG_CONFIG_HOME", Path.home() / ".config")) / "conch"
-    for path in (config_dir / "config", Path.home() / ".conchrc"):
+    for path in paths:
         config.update(_parse_config_file(path))
 
     provider = config.get("provider", DEFAULT_CONFIG["provider"]).lower()
@@ -66,3 +95,9 @@ def get_int(cfg: dict, key: str, default: int = 0) -> int:
     except (TypeError, ValueError):
         return default
 
+
+def get_float(cfg: dict, key: str, default: float = 0.0) -> float:
+    try:
+        return float(cfg.get(key, default))
+    except (TypeError, ValueError):
+        return default
@@ -11,6 +11,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from .fastjson import dumps, loads
+
 
 SCHEMA_VERSION = 2
 
@@ -68,12 +70,12 @@ class Conversation:
         self.title = self.title or _extract_title(self.messages)
         _state_dir().mkdir(parents=True, exist_ok=True)
         tmp = self.path.with_suffix(".tmp")
-        tmp.write_text(json.dumps(self.to_dict(), indent=2))
+        tmp.write_bytes(dumps(self.to_dict(), indent=True))
         tmp.replace(self.path)
 
     @classmethod
     def load(cls, path: Path) -> "Conversation":
-        data = json.loads(path.read_text())
+        data = loads(path.read_bytes())
         if isinstance(data, list):
             messages = data
             return cls(
@@ -104,7 +106,7 @@ class ConversationManager:
 
     def _load_index(self) -> Dict[str, Any]:
         try:
-            data = json.loads(_index_path().read_text())
+            data = loads(_index_path().read_bytes())
             if isinstance(data, list):
                 return {"schema_version": 1, "conversations": data}
             if isinstance(data, dict):
@@ -118,7 +120,7 @@ class ConversationManager:
     def _save_index(self):
         _state_dir().mkdir(parents=True, exist_ok=True)
         tmp = _index_path().with_suffix(".tmp")
-        tmp.write_text(json.dumps(self._index, indent=2))
+        tmp.write_bytes(dumps(self._index, indent=True))
         tmp.replace(_index_path())
 
     def _upsert_index_entry(self, conv: Conversation):
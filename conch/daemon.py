@@ -0,0 +1,263 @@
+"""Background process that keeps MCP servers warm for one-shot commands.
+
+Every ``conch "..."`` invocation otherwise spawns each stdio MCP server and
+lists its tools before the first request can go out.  With
+``mcp_daemon=true`` the one-shot path asks this daemon for the tool list
+and forwards tool calls to it over a UNIX socket instead.  The LLM call,
+the built-in tools and shell confirmation still run in the calling
+process, in the user's working directory.
+
+The daemon is started on first use and exits after ``daemon_idle_seconds``
+(default 600) without requests or running calls.  Run
+``python -m conch.daemon`` to start it by hand.
+
+MCP servers are spawned by the daemon, so they see the working directory
+and environment of the command that started it, not those of later
+callers.  Servers that depend on either are better left off the daemon.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import fastjson
+from . import mcp as mcp_mod
+from .config import get_int, load_config
+
+DEFAULT_IDLE_SECONDS = 600
+
+
+def socket_path() -> Path:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "conch.sock"
+    return Path(os.environ.get("XDG_STATE_HOME", Path.home() / ".local/state")) / "conch" / "daemon.sock"
+
+
+def _config_mtime() -> float:
+    try:
+        return mcp_mod.CONFIG_PATH.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+class _Servers:
+    """MCP clients owned by the daemon, rebuilt when mcp.json changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mtime = -1.0
+        self._clients: Dict[str, Any] = {}
+        self._tool_map: Dict[str, Any] = {}
+        self._by_server: Dict[str, List[dict]] = {}
+
+    def _refresh(self) -> None:
+        mtime = _config_mtime()
+        if mtime == self._mtime:
+            return
+        mcp_mod.close_all(self._clients)
+        self._clients = mcp_mod.create_clients()
+        tools, self._tool_map = mcp_mod.collect_tools(self._clients)
+        self._by_server = {}
+        for tool in tools:
+            client = self._tool_map[tool["function"]["name"]]
+            self._by_server.setdefault(client.name, []).append(tool)
+        self._mtime = mtime
+
+    def tools(self) -> Dict[str, List[dict]]:
+        with self._lock:
+            self._refresh()
+            return self._by_server
+
+    def call(self, name: str, arguments: dict) -> dict:
+        with self._lock:
+            client = self._tool_map.get(name)
+        if client is None:
+            return {"content": [{"type": "text", "text": f"Unknown tool: {name}"}]}
+        return client.call_tool(name, arguments)
+
+    def close(self) -> None:
+        with self._lock:
+            mcp_mod.close_all(self._clients)
+            self._clients = {}
+
+
+class _Activity:
+    """When the daemon was last used, and how many requests are running."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = 0
+        self._last_used = time.monotonic()
+
+    def touch(self) -> None:
+        with self._lock:
+            self._last_used = time.monotonic()
+
+    @contextmanager
+    def request(self):
+        with self._lock:
+            self._running += 1
+        try:
+            yield
+        finally:
+            # Idle time counts from when a call finished, not when it began.
+            with self._lock:
+                self._running -= 1
+                self._last_used = time.monotonic()
+
+    def idle_for(self, seconds: float) -> bool:
+        with self._lock:
+            return not self._running and time.monotonic() - self._last_used >= seconds
+
+
+def _handle(conn: socket.socket, servers: _Servers, activity: _Activity) -> None:
+    with conn, conn.makefile("rb") as reader:
+        for line in reader:
+            with activity.request():
+                reply = _reply(line, servers)
+            conn.sendall(fastjson.dumps(reply) + b"\n")
+
+
+def _reply(line: bytes, servers: _Servers) -> Dict[str, Any]:
+    try:
+        request = fastjson.loads(line)
+        if request.get("method") == "tools":
+            return {"servers": servers.tools()}
+        if request.get("method") == "call":
+            return {"result": servers.call(request.get("name", ""), request.get("arguments") or {})}
+        return {"error": f"unknown method {request.get('method')!r}"}
+    except Exception as exc:
+        return {"error": str(exc)}
+
+
+def serve(path: Optional[Path] = None, idle_seconds: Optional[int] = None) -> None:
+    """Listen on *path* until it has been idle for *idle_seconds*.
+
+    Idle means no request has arrived or finished in that time and none is
+    still running, so a long tool call never has its server shut under it.
+    """
+    path = path or socket_path()
+    if idle_seconds is None:
+        idle_seconds = get_int(load_config(), "daemon_idle_seconds", DEFAULT_IDLE_SECONDS)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+        return  # another daemon is already serving this socket
+    except OSError:
+        pass
+    finally:
+        probe.close()
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    servers = _Servers()
+    activity = _Activity()
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.bind(str(path))
+        os.chmod(path, 0o600)
+        listener.listen()
+        listener.settimeout(1.0)
+        while not activity.idle_for(idle_seconds):
+            try:
+                conn, _ = listener.accept()
+            except socket.timeout:
+                continue
+            conn.settimeout(None)
+            activity.touch()
+            threading.Thread(target=_handle, args=(conn, servers, activity), daemon=True).start()
+    finally:
+        listener.close()
+        try:
+            path.unlink()
+        except OSError:
+            pass
+        servers.close()
+
+
+def _request(payload: dict) -> dict:
+    # One short-lived connection per request, so concurrent tool calls
+    # from the runtime's worker threads do not queue behind each other.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path()))
+        sock.sendall(fastjson.dumps(payload) + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("conch daemon closed the connection")
+    return fastjson.loads(line)
+
+
+class DaemonToolProxy:
+    """Stands in for one MCP server's client in a tool_map."""
+
+    def __init__(self, server_name: str):
+        self.name = server_name
+
+    def call_tool(self, tool_name: str, arguments: dict) -> dict:
+        try:
+            reply = _request({"method": "call", "name": tool_name, "arguments": arguments})
+        except (OSError, ValueError) as exc:
+            return {"content": [{"type": "text", "text": f"conch daemon error: {exc}"}]}
+        if "error" in reply:
+            return {"content": [{"type": "text", "text": f"conch daemon error: {reply['error']}"}]}
+        return reply.get("result", {})
+
+    def close(self):
+        return None
+
+
+def _spawn() -> None:
+    subprocess.Popen(
+        [sys.executable, "-m", "conch.daemon"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def load_tools(autostart: bool = True) -> Optional[Tuple[List[dict], Dict[str, Any]]]:
+    """Return (tools, tool_map) served by the daemon.
+
+    Returns None when no daemon is reachable, after starting one for next
+    time if *autostart* is set; the caller then loads MCP servers itself.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        reply = _request({"method": "tools"})
+    except OSError:
+        if autostart:
+            try:
+                _spawn()
+            except OSError:
+                pass
+        return None
+    except ValueError:
+        return None
+    if "servers" not in reply:
+        return None
+    tools: List[dict] = []
+    tool_map: Dict[str, Any] = {}
+    for server_name, server_tools in reply["servers"].items():
+        proxy = DaemonToolProxy(server_name)
+        for tool in server_tools:
+            tools.append(tool)
+            tool_map[tool["function"]["name"]] = proxy
+    return tools, tool_map
+
+
+if __name__ == "__main__":
+    serve()
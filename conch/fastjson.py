@@ -0,0 +1,34 @@
+"""JSON encode/decode helpers that use orjson when it is installed."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
+
+def dumps(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """Serialize *obj* to UTF-8 JSON bytes, compact unless *indent* is set."""
+    if _HAS_ORJSON:
+        option = (orjson.OPT_SORT_KEYS if sort_keys else 0) | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            # Non-str keys, lone surrogates, oversized ints -- let stdlib try.
+            pass
+    if indent:
+        return json.dumps(obj, indent=2, sort_keys=sort_keys).encode()
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys).encode()
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """Parse JSON from bytes or str without an intermediate decode."""
+    if _HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,269 @@
+"""Keep-alive HTTP connection pool shared by the provider adapters.
+
+urllib.request opens a fresh TCP (and TLS) connection for every request and
+sends ``Connection: close``.  Multi-turn chats hit the same API host over and
+over, so this module keeps idle ``http.client`` connections per host and
+hands them back out, skipping DNS, TCP and TLS setup on follow-up turns.
+"""
+
+from __future__ import annotations
+
+import http.client
+import io
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+from typing import Dict, List, Optional, Tuple
+
+# Enough idle connections per host for the runtime's concurrent tool
+# rounds and batch requests (both default to 8 workers).
+_MAX_IDLE_PER_HOST = 8
+# Provider load balancers drop idle keep-alive connections after about a
+# minute; past that, reusing one usually costs a failed send and a redial.
+_IDLE_EXPIRY = 55.0
+# Establishing TCP/TLS should be quick even when the reply is slow, so a
+# dead host fails fast instead of waiting out the full read timeout.
+DEFAULT_CONNECT_TIMEOUT = 10
+
+_PoolKey = Tuple[str, str, int]
+
+_pool: Dict[_PoolKey, List[http.client.HTTPConnection]] = {}
+_idle_since: Dict[http.client.HTTPConnection, float] = {}
+_pool_lock = threading.Lock()
+_ssl_context: Optional[ssl.SSLContext] = None
+
+
+def _get_ssl_context() -> ssl.SSLContext:
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+
+def _checkout(
+    key: _PoolKey, timeout: float, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+) -> Tuple[http.client.HTTPConnection, bool]:
+    """Return ``(connection, reused)`` for *key*, preferring an idle one."""
+    now = time.monotonic()
+    expired = []
+    conn = None
+    with _pool_lock:
+        idle = _pool.get(key) or []
+        while idle:
+            candidate = idle.pop()
+            if now - _idle_since.pop(candidate, now) < _IDLE_EXPIRY:
+                conn = candidate
+                break
+            expired.append(candidate)
+        # Everything older than the newest expired connection is older still.
+        if expired:
+            for stale in idle:
+                _idle_since.pop(stale, None)
+            expired.extend(idle)
+            idle.clear()
+    for stale in expired:
+        stale.close()
+    if conn is not None:
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+    return _new_connection(key, timeout, connect_timeout), False
+
+
+def _new_connection(
+    key: _PoolKey, timeout: float, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+) -> http.client.HTTPConnection:
+    """Open a connection with *connect_timeout*, then switch to *timeout*."""
+    scheme, host, port = key
+    dial_timeout = min(connect_timeout, timeout)
+    if scheme == "https":
+        conn = http.client.HTTPSConnection(
+            host, port, timeout=dial_timeout, context=_get_ssl_context()
+        )
+    else:
+        conn = http.client.HTTPConnection(host, port, timeout=dial_timeout)
+    conn.connect()
+    conn.timeout = timeout
+    conn.sock.settimeout(timeout)
+    return conn
+
+
+def _checkin(key: _PoolKey, conn: http.client.HTTPConnection) -> None:
+    with _pool_lock:
+        idle = _pool.setdefault(key, [])
+        if len(idle) < _MAX_IDLE_PER_HOST:
+            idle.append(conn)
+            _idle_since[conn] = time.monotonic()
+            return
+    conn.close()
+
+
+class PooledResponse:
+    """File-like wrapper that returns its connection to the pool on close.
+
+    The connection is only reused when the body was read to the end; a
+    stream abandoned half-way (e.g. after ``[DONE]``) closes the socket.
+    """
+
+    def __init__(self, key: _PoolKey, conn: http.client.HTTPConnection,
+                 response: http.client.HTTPResponse):
+        self._key = key
+        self._conn: Optional[http.client.HTTPConnection] = conn
+        self._response = response
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._response.read(amt)
+
+    def readline(self, limit: int = -1) -> bytes:
+        return self._response.readline(limit)
+
+    def __iter__(self):
+        return iter(self._response)
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        if self._response.isclosed() and not self._response.will_close:
+            _checkin(self._key, conn)
+        else:
+            self._response.close()
+            conn.close()
+
+    def __enter__(self) -> "PooledResponse":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _uses_proxy(scheme: str, host: str) -> bool:
+    import urllib.request
+
+    proxies = urllib.request.getproxies()
+    return scheme in proxies and not urllib.request.proxy_bypass(host)
+
+
+def _urllib_open(url, data, headers, method, timeout):
+    import urllib.request
+
+    req = urllib.request.Request(url, data=data, headers=headers or {}, method=method)
+    return urllib.request.urlopen(req, timeout=timeout)
+
+
+def prewarm(url: str, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT) -> None:
+    """Dial *url*'s host in the background unless a fresh idle connection exists.
+
+    Called while the user is still typing, so the next request skips DNS,
+    TCP and TLS setup even after the previous connection expired.  Failures
+    are ignored; the request itself will dial and report them.
+    """
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = parts.hostname or ""
+    if scheme not in ("http", "https") or not host or _uses_proxy(scheme, host):
+        return
+    key = (scheme, host, parts.port or (443 if scheme == "https" else 80))
+    now = time.monotonic()
+    with _pool_lock:
+        idle = _pool.get(key) or []
+        if idle and now - _idle_since.get(idle[-1], 0.0) < _IDLE_EXPIRY / 2:
+            return
+
+    def dial():
+        try:
+            conn = _new_connection(key, connect_timeout, connect_timeout)
+        except (OSError, http.client.HTTPException):
+            return
+        _checkin(key, conn)
+
+    threading.Thread(target=dial, daemon=True).start()
+
+
+def urlopen(
+    url: str,
+    data: Optional[bytes] = None,
+    headers: Optional[Dict[str, str]] = None,
+    method: str = "POST",
+    timeout: float = 60,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+):
+    """Send a request over a pooled connection and return the response.
+
+    Mirrors ``urllib.request.urlopen``: the result is a context manager that
+    supports ``read()`` and line iteration, and HTTP status codes >= 400 raise
+    ``urllib.error.HTTPError`` so callers' error strings stay unchanged.
+    Requests that must go through a configured proxy fall back to urllib.
+    *timeout* bounds each read; new connections must be established within
+    *connect_timeout* (urllib's fallback applies *timeout* to both).
+
+    Bodies always carry an explicit ``Content-Length`` and never an
+    ``Expect: 100-continue`` header, so a small POST goes out as one write
+    (http.client already sets ``TCP_NODELAY``) instead of waiting a round
+    trip for the server's go-ahead.
+    """
+    headers = {k: v for k, v in (headers or {}).items() if k.lower() != "expect"}
+    if data is not None:
+        headers["Content-Length"] = str(len(data))
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = parts.hostname or ""
+    if scheme not in ("http", "https") or _uses_proxy(scheme, host):
+        return _urllib_open(url, data, headers, method, timeout)
+
+    port = parts.port or (443 if scheme == "https" else 80)
+    key = (scheme, host, port)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+
+    conn, reused = _checkout(key, timeout, connect_timeout)
+    while True:
+        # Only a reused connection that fails before the server has answered
+        # anything is retried: the write itself failing, or the server
+        # closing without a status line.  Any other failure once the
+        # request is out may mean the server acted on it, so resending a
+        # POST (an MCP tools/call, say) could run it twice.
+        try:
+            conn.request(method, path, body=data, headers=headers)
+        except socket.timeout:
+            conn.close()
+            raise
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            conn.close()
+            if not reused:
+                raise
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            raise
+        else:
+            try:
+                response = conn.getresponse()
+                break
+            except http.client.RemoteDisconnected:
+                conn.close()
+                if not reused:
+                    raise
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                raise
+        # The server dropped an idle keep-alive connection; retry once on a
+        # fresh one.
+        conn, reused = _new_connection(key, timeout, connect_timeout), False
+
+    if response.status >= 400:
+        body = response.read()
+        pooled = PooledResponse(key, conn, response)
+        pooled.close()
+        raise urllib.error.HTTPError(
+            url, response.status, response.reason, response.headers, io.BytesIO(body)
+        )
+    return PooledResponse(key, conn, response)
+
@@ -1,12 +1,13 @@
 """LLM clients: OpenAI, Anthropic, Cerebras, Ollama. Return single command string."""
 import datetime
-import json
 import os
 import re
 import sys
 from typing import List, Optional, Tuple
 
 from .config import load_config, get_bool, get_int
+from .fastjson import dumps as _dumps, loads as _loads
+from .httppool import urlopen
 
 
 _SHELL_PREFIXES = (
@@ -21,27 +22,34 @@ _SHELL_PREFIXES = (
 )
 
 
+# A bare ``` fence is the same pattern with no language, so one regex
+# covers both kinds of block.
+_FENCE_RE = re.compile(r"```(?:bash|sh|zsh)?\s*\n?(.*?)```", re.DOTALL | re.IGNORECASE)
+_BACKTICK_RE = re.compile(r"`([^`]{4,})`")
+_PROMPT_CHARS_RE = re.compile(r"^\s*[$%]\s*")
+
+
 def _extract_from_fenced_blocks(text: str) -> str:
     """Pull a command out of ```bash ... ``` fenced blocks."""
-    for pattern in [r"```(?:bash|sh|zsh)?\s*\n?(.*?)```", r"```\n?(.*?)```"]:
-        m = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-        if m:
-            cmd = m.group(1).strip().splitlines()[0].strip()
-            if cmd:
-                return re.sub(r"^\s*[$%]\s*", "", cmd)
+    m = _FENCE_RE.search(text)
+    if m:
+        lines = m.group(1).strip().splitlines()
+        cmd = lines[0].strip() if lines else ""
+        if cmd:
+            return _PROMPT_CHARS_RE.sub("", cmd)
     return ""
 
 
 def _extract_from_backticks(text: str) -> str:
     """Pull a shell command from inline `backtick` snippets in reasoning text."""
-    backtick_cmds = re.findall(r"`([^`]{4,})`", text)
+    backtick_cmds = _BACKTICK_RE.findall(text)
     shell_cmds = [c for c in backtick_cmds if any(c.startswith(t) for t in _SHELL_PREFIXES)]
     return shell_cmds[-1] if shell_cmds else ""
 
 
 def _extract_first_line(text: str) -> str:
     """Take the first non-empty line, stripping prompt chars."""
-    text = re.sub(r"^\s*[$%]\s*", "", text)
+    text = _PROMPT_CHARS_RE.sub("", text)
     lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
     return lines[0] if lines else ""
 
@@ -74,7 +82,7 @@ def extract_command(text: str, provider: str = "") -> str:
         # Skip preamble lines like "Here is the command:" that aren't actual commands.
         lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
         for line in lines:
-            clean = re.sub(r"^\s*[$%]\s*", "", line)
+            clean = _PROMPT_CHARS_RE.sub("", line)
             if not clean:
                 continue
             # Skip lines that look like English prose rather than commands
@@ -127,13 +135,50 @@ DETECTED_TOOLS = [
 ]
 
 
+# (PATH, mtime_ns of each PATH dir) -> _detect_tools() text.  Installing
+# or removing a binary touches its directory, so the stamp catches it.
+_detected_tools_cache: Optional[Tuple[tuple, str]] = None
+
+
+def _path_stamp() -> tuple:
+    stamp = []
+    for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+        try:
+            stamp.append((directory, os.stat(directory).st_mtime_ns))
+        except OSError:
+            stamp.append((directory, None))
+    return tuple(stamp)
+
+
 def _detect_tools() -> str:
     """Detect which DevOps, security, and dev tools are installed."""
+    global _detected_tools_cache
+    stamp = _path_stamp()
+    if _detected_tools_cache is None or _detected_tools_cache[0] != stamp:
+        _detected_tools_cache = (stamp, _scan_tools(stamp))
+    return _detected_tools_cache[1]
+
+
+def _scan_tools(stamp: tuple) -> str:
     import shutil
+    # One listing per PATH dir narrows DETECTED_TOOLS to names that exist
+    # somewhere; only those go through shutil.which's executable check.
+    wanted = set(DETECTED_TOOLS)
+    present = set()
+    for directory, mtime in stamp:
+        if mtime is None or not directory:
+            continue
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            continue
+        if os.name == "nt":
+            entries = _strip_pathext(entries)
+        present.update(wanted.intersection(entries))
     available = []
     missing = []
     for tool in DETECTED_TOOLS:
-        if shutil.which(tool):
+        if tool in present and shutil.which(tool):
             available.append(tool)
         else:
             missing.append(tool)
@@ -145,6 +190,17 @@ def _detect_tools() -> str:
     return "\n".join(parts)
 
 
+def _strip_pathext(entries: List[str]) -> set:
+    """Map Windows file names such as ``git.exe`` to the command name ``git``."""
+    exts = {ext.lower() for ext in os.environ.get("PATHEXT", ".COM;.EXE;.BAT;.CMD").split(";") if ext}
+    names = set()
+    for entry in entries:
+        root, ext = os.path.splitext(entry)
+        if ext.lower() in exts:
+            names.add(root.lower())
+    return names
+
+
 def build_messages(config: dict, user_request: str, context: dict) -> Tuple[List[dict], str]:
     """Build OpenAI-style messages and system prompt."""
     from .prompts import get_ask_prompt
@@ -160,7 +216,7 @@ def build_messages(config: dict, user_request: str, context: dict) -> Tuple[List
         parts.append(f"(Environment: {context['os_shell']})")
     if context.get("history"):
         parts.append(f"(Recent commands:\n{context['history']})")
-    tools_info = _detect_tools()
+    tools_info = _detect_tools() if get_bool(config, "send_tool_inventory", True) else ""
     if tools_info:
         parts.append(f"({tools_info})")
     user_content = "\n".join(parts)
@@ -168,8 +224,6 @@ def build_messages(config: dict, user_request: str, context: dict) -> Tuple[List
 
 
 def call_cerebras(config: dict, messages: list) -> str:
-    import urllib.request
-
     api_key = os.environ.get(config.get("api_key_env", "CEREBRAS_API_KEY"), "").strip()
     if not api_key:
         print("conch: CEREBRAS_API_KEY not set", file=sys.stderr)
@@ -183,19 +237,14 @@ def call_cerebras(config: dict, messages: list) -> str:
         "max_completion_tokens": 2048,
         "clear_thinking": True,
     }
-    req = urllib.request.Request(
-        f"{base}/chat/completions",
-        data=json.dumps(body).encode(),
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-            "User-Agent": "conch/1.0",
-        },
-        method="POST",
-    )
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+        "User-Agent": "conch/1.0",
+    }
     try:
-        with urllib.request.urlopen(req, timeout=30) as r:
-            data = json.loads(r.read().decode())
+        with urlopen(f"{base}/chat/completions", _dumps(body), headers, timeout=30) as r:
+            data = _loads(r.read())
     except Exception as e:
         print(f"conch: API error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -207,8 +256,6 @@ def call_cerebras(config: dict, messages: list) -> str:
 
 
 def call_openai(config: dict, messages: list) -> str:
-    import urllib.request
-
     api_key = os.environ.get(config.get("api_key_env", "OPENAI_API_KEY"), "").strip()
     if not api_key:
         print("conch: OPENAI_API_KEY not set", file=sys.stderr)
@@ -220,18 +267,13 @@ def call_openai(config: dict, messages: list) -> str:
         "temperature": 0.2,
         "max_tokens": 2048,
     }
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(body).encode(),
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        method="POST",
-    )
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+    }
     try:
-        with urllib.request.urlopen(req, timeout=30) as r:
-            data = json.loads(r.read().decode())
+        with urlopen(url, _dumps(body), headers, timeout=30) as r:
+            data = _loads(r.read())
     except Exception as e:
         print(f"conch: API error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -240,8 +282,6 @@ def call_openai(config: dict, messages: list) -> str:
 
 
 def call_anthropic(config: dict, messages: list) -> str:
-    import urllib.request
-
     api_key = os.environ.get(config.get("api_key_env", "ANTHROPIC_API_KEY"), "").strip()
     if not api_key:
         print("conch: ANTHROPIC_API_KEY not set", file=sys.stderr)
@@ -255,50 +295,36 @@ def call_anthropic(config: dict, messages: list) -> str:
         "system": system,
         "messages": [{"role": "user", "content": user_content}],
     }
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(body).encode(),
-        headers={
-            "Content-Type": "application/json",
-            "x-api-key": api_key,
-            "anthropic-version": "2023-06-01",
-        },
-        method="POST",
-    )
+    headers = {
+        "Content-Type": "application/json",
+        "x-api-key": api_key,
+        "anthropic-version": "2023-06-01",
+    }
     try:
-        with urllib.request.urlopen(req, timeout=30) as r:
-            data = json.loads(r.read().decode())
+        with urlopen(url, _dumps(body), headers, timeout=30) as r:
+            data = _loads(r.read())
     except Exception as e:
         print(f"conch: API error: {e}", file=sys.stderr)
         sys.exit(1)
-    content = ""
-    for b in data.get("content", []):
-        if b.get("type") == "text":
-            content += b.get("text", "")
+    blocks = data.get("content") or []
+    content = "".join([b["text"] for b in blocks if b.get("type") == "text" and "text" in b])
     return extract_command(content, provider="anthropic")
 
 
 def call_ollama(config: dict, messages: list) -> str:
-    import urllib.request
-
     base = (config.get("base_url") or os.environ.get("OLLAMA_HOST", "http://localhost:11434")).rstrip("/")
     url = f"{base}/api/chat"
-    # Ollama wants prompt; we concatenate system + user
-    prompt = "\n\n".join(m["content"] for m in messages)
+    # /api/chat takes the system message as is, so the unchanged system
+    # prompt stays a reusable prefix for Ollama's KV cache.
     body = {
         "model": config.get("model", "llama3.2"),
-        "messages": [{"role": "user", "content": prompt}],
+        "messages": messages,
         "stream": False,
     }
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(body).encode(),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+    headers = {"Content-Type": "application/json"}
     try:
-        with urllib.request.urlopen(req, timeout=120) as r:
-            data = json.loads(r.read().decode())
+        with urlopen(url, _dumps(body), headers, timeout=120) as r:
+            data = _loads(r.read())
     except Exception as e:
         print(f"conch: Ollama error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -2,16 +2,18 @@
 
 from __future__ import annotations
 
-import json
+import hashlib
 import os
 import subprocess
+import threading
 import time
-import urllib.request
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from . import fastjson
+
 
 CONFIG_PATH = Path(os.environ.get("XDG_CONFIG_HOME", Path.home() / ".config")) / "conch" / "mcp.json"
 
@@ -37,23 +39,22 @@ class HttpMcpClient:
         self.name = client_name
         self.url = url.rstrip("/")
         self._next_request_id = 1
+        self._id_lock = threading.Lock()
 
     def _rpc(self, method: str, params: Optional[dict] = None) -> dict:
         """Send a JSON-RPC request to the MCP HTTP server."""
-        request_id = self._next_request_id
-        self._next_request_id += 1
+        with self._id_lock:
+            request_id = self._next_request_id
+            self._next_request_id += 1
         payload: Dict[str, Any] = {"jsonrpc": "2.0", "id": request_id, "method": method}
         if params is not None:
             payload["params"] = params
-        req = urllib.request.Request(
-            self.url,
-            data=json.dumps(payload).encode(),
-            headers={"Content-Type": "application/json", "User-Agent": "conch/1.0"},
-            method="POST",
-        )
+        from .httppool import urlopen
+
+        headers = {"Content-Type": "application/json", "User-Agent": "conch/1.0"}
         try:
-            with urllib.request.urlopen(req, timeout=30) as response:
-                return json.loads(response.read().decode())
+            with urlopen(self.url, fastjson.dumps(payload), headers, timeout=30) as response:
+                return fastjson.loads(response.read())
         except Exception as exc:
             return {"error": {"message": str(exc)}}
 
@@ -87,41 +88,102 @@ class HttpMcpClient:
 
 
 class StdioMcpClient:
-    def __init__(self, client_name: str, command: str, args: Optional[List[str]] = None):
+    """MCP client speaking JSON-RPC over a server subprocess's stdio.
+
+    With *lazy* the server is only spawned by the first request, so runs
+    that never call one of its tools don't start it at all.
+    """
+
+    def __init__(self, client_name: str, command: str, args: Optional[List[str]] = None, lazy: bool = False):
         self.name = client_name
-        self._proc = subprocess.Popen(
-            [command] + (args or []),
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
+        self._argv = [command] + (args or [])
+        self._proc: Optional[subprocess.Popen] = None
         self._next_request_id = 1
+        # A reader thread hands each reply to the future registered under
+        # its id, so concurrent tool calls to the same server overlap
+        # instead of queueing.  _lock guards the pending table and is never
+        # held across pipe I/O: the reader needs it to deliver a reply, and
+        # a server blocked on a full stdout stops reading stdin.  Requests
+        # are written whole, one at a time, under _write_lock.
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._closed = False
+        self._reader: Optional[threading.Thread] = None
+        if not lazy:
+            self._start()
+
+    def _start(self) -> None:
+        # Nothing reads the server's stderr, and a full pipe would block it;
+        # discard it, or append it to a log when CONCH_MCP_LOG is set.
+        log = None
+        if os.environ.get("CONCH_MCP_LOG"):
+            try:
+                _STATE_DIR.mkdir(parents=True, exist_ok=True)
+                log = open(_STATE_DIR / f"mcp-{self.name}.log", "ab")
+            except OSError:
+                log = None
+        try:
+            self._proc = subprocess.Popen(
+                self._argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=log or subprocess.DEVNULL,
+                text=True,
+            )
+        finally:
+            if log:
+                log.close()
+        self._reader = threading.Thread(target=self._read_replies, args=(self._proc.stdout,), daemon=True)
+        self._reader.start()
+
+    def _read_replies(self, stdout) -> None:
+        for line in stdout:
+            try:
+                data = fastjson.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(data, dict):
+                continue
+            with self._lock:
+                future = self._pending.pop(data.get("id"), None)
+            if future is not None:
+                future.set_result(data)
+        with self._lock:
+            self._closed = True
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_result({"error": {"message": "MCP server closed connection"}})
 
     def _send(self, method: str, params: Optional[dict] = None) -> dict:
-        if not self._proc.stdin or not self._proc.stdout:
-            return {"error": {"message": "stdio client not initialized"}}
-        request_id = self._next_request_id
-        self._next_request_id += 1
+        with self._lock:
+            if self._proc is None:
+                try:
+                    self._start()
+                except OSError as exc:
+                    return {"error": {"message": f"failed to start MCP server: {exc}"}}
+            if not self._proc.stdin or not self._proc.stdout:
+                return {"error": {"message": "stdio client not initialized"}}
+            if self._closed:
+                return {"error": {"message": "MCP server closed connection"}}
+            request_id = self._next_request_id
+            self._next_request_id += 1
+            future: Future = Future()
+            self._pending[request_id] = future
+            stdin = self._proc.stdin
         payload: Dict[str, Any] = {"jsonrpc": "2.0", "id": request_id, "method": method}
         if params is not None:
             payload["params"] = params
+        line = fastjson.dumps(payload).decode() + "\n"
         try:
-            self._proc.stdin.write(json.dumps(payload) + "\n")
-            self._proc.stdin.flush()
+            with self._write_lock:
+                stdin.write(line)
+                stdin.flush()
         except Exception as exc:
+            with self._lock:
+                self._pending.pop(request_id, None)
             return {"error": {"message": f"failed to send MCP request: {exc}"}}
-
-        while True:
-            line = self._proc.stdout.readline()
-            if not line:
-                return {"error": {"message": "MCP server closed connection"}}
-            try:
-                data = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if data.get("id") == request_id:
-                return data
+        return future.result()
 
     def list_tools(self) -> List[dict]:
         response = self._send("tools/list")
@@ -132,29 +194,45 @@ class StdioMcpClient:
         return response.get("result", {"content": [{"type": "text", "text": response.get("error", {}).get("message", "Unknown MCP error")}]} )
 
     def close(self):
+        if self._proc is None:
+            return
         self._proc.terminate()
         self._proc.wait(timeout=1)
+        if self._reader is not None:
+            self._reader.join(timeout=1)
+        for pipe in (self._proc.stdin, self._proc.stdout, self._proc.stderr):
+            try:
+                if pipe:
+                    pipe.close()
+            except OSError:
+                pass
 
 
 def _load_config() -> dict:
     try:
-        return json.loads(CONFIG_PATH.read_text())
-    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        return fastjson.loads(CONFIG_PATH.read_bytes())
+    except (FileNotFoundError, ValueError, OSError):
         return {"mcpServers": {}}
 
 
-def create_clients() -> Dict[str, Any]:
+def create_clients(lazy: bool = False) -> Dict[str, Any]:
+    """Build a client per configured server; *lazy* defers stdio spawns to first use."""
     clients: Dict[str, Any] = {}
     for name, cfg in _load_config().get("mcpServers", {}).items():
         if cfg.get("type") == "http" and cfg.get("url"):
             clients[name] = HttpMcpClient(name, cfg["url"])
         elif cfg.get("command"):
-            clients[name] = StdioMcpClient(name, cfg["command"], cfg.get("args", []))
+            clients[name] = StdioMcpClient(name, cfg["command"], cfg.get("args", []), lazy=lazy)
     return clients
 
 
 def collect_tools(clients: Dict[str, Any]) -> Tuple[List[dict], Dict[str, Any]]:
-    """Collect tools from all MCP clients in parallel."""
+    """Collect tools from all MCP clients in parallel.
+
+    Tools come back in configuration order rather than completion order, so
+    the tools block, and with it the provider's cached prompt prefix, stays
+    byte-identical from one run or reload to the next.
+    """
     tools: List[dict] = []
     tool_map: Dict[str, Any] = {}
     if not clients:
@@ -168,7 +246,7 @@ def collect_tools(clients: Dict[str, Any]) -> Tuple[List[dict], Dict[str, Any]]:
 
     with ThreadPoolExecutor(max_workers=max(len(clients), 1)) as pool:
         futures = [pool.submit(_load_one, n, c) for n, c in clients.items()]
-        for future in as_completed(futures):
+        for future in futures:
             name, client, client_tools = future.result()
             for tool in client_tools:
                 tools.append(tool)
@@ -176,23 +254,56 @@ def collect_tools(clients: Dict[str, Any]) -> Tuple[List[dict], Dict[str, Any]]:
     return tools, tool_map
 
 
-def load_cached_tools() -> Optional[List[dict]]:
-    """Load tool definitions from disk cache if still fresh."""
+def _config_digest() -> str:
+    """Hash of mcp.json, so editing the server list invalidates the tool cache."""
     try:
-        data = json.loads(_TOOL_CACHE_PATH.read_text())
-        if time.time() - data.get("ts", 0) < _CACHE_TTL:
-            return data.get("tools", [])
-    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        return hashlib.sha256(CONFIG_PATH.read_bytes()).hexdigest()
+    except OSError:
+        return ""
+
+
+def _read_tool_cache() -> Optional[dict]:
+    try:
+        data = fastjson.loads(_TOOL_CACHE_PATH.read_bytes())
+        if time.time() - data.get("ts", 0) < _CACHE_TTL and data.get("config", "") == _config_digest():
+            return data
+    except (FileNotFoundError, ValueError, OSError):
         pass
     return None
 
 
-def save_tool_cache(tools: List[dict]):
-    """Save tool definitions to disk cache."""
+def load_cached_tools() -> Optional[List[dict]]:
+    """Load tool definitions from disk cache if still fresh."""
+    data = _read_tool_cache()
+    return data.get("tools", []) if data is not None else None
+
+
+def load_cached_tool_map(clients: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Map cached tool names to *clients* without asking the servers.
+
+    Returns None when the cache is stale, predates server names, or names
+    a server that is no longer configured.
+    """
+    data = _read_tool_cache()
+    servers = data.get("servers") if data is not None else None
+    if not isinstance(servers, dict) or not set(servers.values()) <= set(clients):
+        return None
+    return {name: clients[server] for name, server in servers.items()}
+
+
+def save_tool_cache(tools: List[dict], tool_map: Optional[Dict[str, Any]] = None):
+    """Save tool definitions, and the server each came from, to disk cache."""
     try:
         _STATE_DIR.mkdir(parents=True, exist_ok=True)
         defs = [{"type": t.get("type", "function"), "function": t["function"]} for t in tools]
-        _TOOL_CACHE_PATH.write_text(json.dumps({"ts": time.time(), "tools": defs}))
+        data: Dict[str, Any] = {"ts": time.time(), "config": _config_digest(), "tools": defs}
+        if tool_map is not None:
+            data["servers"] = {
+                t["function"]["name"]: tool_map[t["function"]["name"]].name
+                for t in tools
+                if t["function"]["name"] in tool_map
+            }
+        _TOOL_CACHE_PATH.write_bytes(fastjson.dumps(data))
     except (OSError, TypeError):
         pass
 
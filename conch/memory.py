@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import heapq
 import json
 import os
+import threading
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+from .fastjson import dumps, loads
 
 
 def _state_dir() -> Path:
@@ -19,7 +23,11 @@ def _memory_path() -> Path:
 
 
 def _tokenize(text: str) -> set[str]:
-    return {part.lower() for part in text.replace("\n", " ").split() if part.strip()}
+    # str.split() already breaks on any whitespace and never yields empties.
+    return set(text.lower().split())
+
+
+_CONTEXT_CACHE_MAX = 64
 
 
 @dataclass
@@ -41,57 +49,133 @@ class MemoryEntry:
 class MemoryStore:
     def __init__(self):
         self._path = _memory_path()
-        self._entries = self._load()
+        # Read on first use, so sessions that never touch memory don't pay
+        # for parsing memory.json at startup.
+        self._loaded: Optional[List[Dict[str, str | int]]] = None
+        # Session summaries are saved from a worker thread. Reentrant so
+        # add() and forget() can trigger the first load while holding it.
+        self._lock = threading.RLock()
+        self._entry_tokens: Dict[str, set[str]] = {}
+        self._context_cache: Dict[Tuple[str, int], str] = {}
+        # Highest id handed out so far; found with one scan on the first add().
+        self._last_id: Optional[int] = None
+        # (entries list, token -> positions in it); forget() swaps in a new
+        # list, which retires the index, while add() extends it in place.
+        self._index: Optional[Tuple[List[Dict[str, str | int]], Dict[str, List[int]]]] = None
+
+    @property
+    def _entries(self) -> List[Dict[str, str | int]]:
+        entries = self._loaded
+        if entries is None:
+            with self._lock:
+                if self._loaded is None:
+                    self._loaded = self._load()
+                entries = self._loaded
+        return entries
+
+    @_entries.setter
+    def _entries(self, entries: List[Dict[str, str | int]]):
+        self._loaded = entries
 
     def _load(self) -> List[Dict[str, str | int]]:
         try:
-            return json.loads(self._path.read_text())
+            return loads(self._path.read_bytes())
         except (FileNotFoundError, json.JSONDecodeError, OSError):
             return []
 
     def _save(self):
         self._path.parent.mkdir(parents=True, exist_ok=True)
         tmp = self._path.with_suffix(".tmp")
-        tmp.write_text(json.dumps(self._entries, indent=2))
+        with open(tmp, "wb") as handle:
+            handle.write(dumps(self._entries, indent=True))
+            # Flushed to disk before the rename so a crash can't leave an
+            # empty memory.json in place of the old one.
+            handle.flush()
+            os.fsync(handle.fileno())
         tmp.replace(self._path)
 
     def get_all(self) -> List[Dict[str, str | int]]:
         return list(self._entries)
 
     def add(self, content: str, source: str = "user") -> Dict[str, str | int]:
-        new_id = max((int(item["id"]) for item in self._entries), default=0) + 1
-        entry = MemoryEntry(
-            id=new_id,
-            content=content.strip(),
-            created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            source=source,
-        ).as_dict()
-        self._entries.append(entry)
-        self._save()
+        with self._lock:
+            if self._last_id is None:
+                self._last_id = max((int(item["id"]) for item in self._entries), default=0)
+            self._last_id = new_id = self._last_id + 1
+            entry = MemoryEntry(
+                id=new_id,
+                content=content.strip(),
+                created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                source=source,
+            ).as_dict()
+            self._entries.append(entry)
+            if self._index is not None and self._index[0] is self._entries:
+                for token in self._content_tokens(str(entry["content"])):
+                    self._index[1].setdefault(token, []).append(len(self._entries) - 1)
+            self._context_cache.clear()
+            self._save()
         return entry
 
     def forget(self, entry_id: int) -> bool:
-        before = len(self._entries)
-        self._entries = [entry for entry in self._entries if int(entry["id"]) != entry_id]
-        if len(self._entries) == before:
-            return False
-        self._save()
+        with self._lock:
+            before = len(self._entries)
+            self._entries = [entry for entry in self._entries if int(entry["id"]) != entry_id]
+            if len(self._entries) == before:
+                return False
+            remaining = {str(entry["content"]) for entry in self._entries}
+            self._entry_tokens = {
+                content: tokens for content, tokens in self._entry_tokens.items() if content in remaining
+            }
+            self._context_cache.clear()
+            self._save()
         return True
 
     def build_context(self, query: str, limit: int = 5) -> str:
+        key = (query, limit)
+        # Held throughout so a summary added from the worker thread can't
+        # clear the cache between building a context and storing it.
+        with self._lock:
+            cached = self._context_cache.get(key)
+            if cached is None:
+                cached = self._build_context(query, limit)
+                if len(self._context_cache) >= _CONTEXT_CACHE_MAX:
+                    self._context_cache.clear()
+                self._context_cache[key] = cached
+        return cached
+
+    def _content_tokens(self, content: str) -> set[str]:
+        tokens = self._entry_tokens.get(content)
+        if tokens is None:
+            tokens = self._entry_tokens[content] = _tokenize(content)
+        return tokens
+
+    def _postings(self) -> Tuple[List[Dict[str, str | int]], Dict[str, List[int]]]:
+        index = self._index
+        if index is None or index[0] is not self._entries:
+            entries = self._entries
+            postings: Dict[str, List[int]] = {}
+            for position, entry in enumerate(entries):
+                for token in self._content_tokens(str(entry["content"])):
+                    postings.setdefault(token, []).append(position)
+            index = self._index = (entries, postings)
+        return index
+
+    def _build_context(self, query: str, limit: int) -> str:
         q_tokens = _tokenize(query)
         if not q_tokens:
             return ""
-        scored: List[tuple[int, Dict[str, str | int]]] = []
-        for entry in self._entries:
-            score = len(q_tokens & _tokenize(str(entry["content"])))
-            if score:
-                scored.append((score, entry))
-        if not scored:
+        # Only entries sharing a token with the query are visited.
+        entries, postings = self._postings()
+        counts: Dict[int, int] = {}
+        for token in q_tokens:
+            for position in postings.get(token, ()):
+                counts[position] = counts.get(position, 0) + 1
+        if not counts:
             return ""
-        scored.sort(key=lambda item: item[0], reverse=True)
+        # Ties go to the earlier entry, as the stable sort this replaces did.
+        top = heapq.nlargest(limit, counts, key=lambda position: (counts[position], -position))
         lines = ["Relevant remembered context:"]
-        for _, entry in scored[:limit]:
-            lines.append(f"- {entry['content']}")
+        for position in top:
+            lines.append(f"- {entries[position]['content']}")
         return "\n".join(lines)
 
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import datetime
+
 
 # ---------------------------------------------------------------------------
 # ASK mode -- one-shot command generation
@@ -98,3 +100,15 @@ def get_ask_prompt(provider: str, model: str = "") -> str:
 def get_chat_prompt(provider: str, model: str = "") -> str:
     """Return the chat-mode system prompt for the given provider/model."""
     return CHAT_PROMPTS.get(provider, CHAT_PROMPTS.get("openai", _CHAT_BASE))
+
+
+def build_system_prompt(base_prompt: str, location: str = "", provider: str = "", model: str = "") -> str:
+    """Append the current time, location and active model to *base_prompt*."""
+    now = datetime.datetime.now().astimezone()
+    parts = [f"Current date and time: {now.strftime('%A, %B %d, %Y %I:%M %p')} (timezone: {now.tzname()})."]
+    if location:
+        parts.append(f"User location: {location}.")
+    if provider and model:
+        parts.append(f"You are currently running as {provider}/{model}.")
+    parts.append("Use this for any time-sensitive or location-relevant requests.")
+    return base_prompt + "\n\n" + " ".join(parts)
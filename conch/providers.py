@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
-import json
 import os
-import urllib.request
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import get_float
+from .fastjson import dumps as _dumps, loads as _loads
+from .httppool import prewarm as _prewarm, urlopen as _urlopen
 
 
 KNOWN_MODELS = {
@@ -41,6 +44,8 @@ KNOWN_MODELS = {
     ],
 }
 
+_MODEL_TO_PROVIDER = {model: provider for provider, models in KNOWN_MODELS.items() for model in models}
+
 DEFAULT_API_KEY_ENVS = {
     "cerebras": "CEREBRAS_API_KEY",
     "openai": "OPENAI_API_KEY",
@@ -95,6 +100,178 @@ def _normalize_usage(data: dict, provider: str) -> dict:
     return {"input_tokens": 0, "output_tokens": 0}
 
 
+# provider -> (default key env, default model, default base URL, base URL env
+# override or None when the URL is fixed)
+_PROVIDER_ENDPOINTS = {
+    "cerebras": ("CEREBRAS_API_KEY", "zai-glm-4.7", "https://api.cerebras.ai/v1", "CEREBRAS_BASE_URL"),
+    "openai": ("OPENAI_API_KEY", "gpt-4o-mini", "https://api.openai.com/v1", None),
+    "anthropic": ("ANTHROPIC_API_KEY", "claude-sonnet-4-6", "https://api.anthropic.com/v1", None),
+    "ollama": ("", "llama3.3", "http://localhost:11434", "OLLAMA_HOST"),
+}
+
+
+DEFAULT_TEMPERATURE = 0.7
+
+# env var name -> stripped key; keys are fixed for the life of the process,
+# so only non-empty values are remembered (a key exported later still works).
+_API_KEYS: Dict[str, str] = {}
+
+
+def api_key_for(env_name: str) -> str:
+    """Return the stripped API key stored in *env_name*, or "" if unset."""
+    if not env_name:
+        return ""
+    key = _API_KEYS.get(env_name)
+    if key is None:
+        key = os.environ.get(env_name, "").strip()
+        if key:
+            _API_KEYS[env_name] = key
+    return key
+
+
+@dataclass(frozen=True)
+class ResolvedConfig:
+    """Settings one provider call needs, resolved from the config dict."""
+
+    provider: str
+    model: str
+    api_key: str
+    base_url: str
+    temperature: float = DEFAULT_TEMPERATURE
+
+
+def resolve_config(config: dict, provider: str) -> ResolvedConfig:
+    """Resolve model, API key and endpoint for *provider* in one place.
+
+    ``base_url`` from the config only applies to providers whose endpoint
+    is configurable (Cerebras, Ollama).
+    """
+    key_env_default, model_default, url_default, url_env = _PROVIDER_ENDPOINTS[provider]
+    key_env = config.get("api_key_env", key_env_default)
+    base_url = url_default
+    if url_env:
+        base_url = config.get("base_url") or os.environ.get(url_env, url_default)
+    return ResolvedConfig(
+        provider=provider,
+        model=config.get("chat_model", config.get("model", model_default)),
+        api_key=api_key_for(key_env),
+        base_url=base_url.rstrip("/"),
+        temperature=get_float(config, "temperature", DEFAULT_TEMPERATURE),
+    )
+
+
+def prewarm_connection(config: dict, provider: str, done: str = "") -> str:
+    """Open a keep-alive connection to *provider*'s API ahead of the next call.
+
+    Nothing is dialled when the provider needs an API key and has none, or
+    when *done*, the value the previous call returned, already names this
+    provider and endpoint.  Returns the value to pass as *done* next time.
+    """
+    if provider not in _PROVIDER_ENDPOINTS:
+        return done
+    cfg = resolve_config(config, provider)
+    if _PROVIDER_ENDPOINTS[provider][0] and not cfg.api_key:
+        return done
+    target = f"{provider} {cfg.base_url}"
+    if target != done:
+        _prewarm(cfg.base_url)
+    return target
+
+
+# Encoded system prompts, so tool rounds within a turn don't re-serialize
+# the same multi-kilobyte string for every request.
+_SYSTEM_BYTES_CACHE: Dict[str, bytes] = {}
+_SYSTEM_BYTES_CACHE_MAX = 8
+
+
+def _encoded_system(text: str) -> bytes:
+    encoded = _SYSTEM_BYTES_CACHE.get(text)
+    if encoded is None:
+        if len(_SYSTEM_BYTES_CACHE) >= _SYSTEM_BYTES_CACHE_MAX:
+            _SYSTEM_BYTES_CACHE.clear()
+        encoded = _SYSTEM_BYTES_CACHE[text] = _dumps(text)
+    return encoded
+
+
+# Encoded tool lists keyed by (id(tools), anthropic shape). Tool lists are
+# replaced rather than mutated when tools are toggled or reloaded, so the
+# list's identity (checked against the held reference and its length) marks
+# an unchanged list; holding the reference keeps the id from being reused.
+_TOOLS_BYTES_CACHE: Dict[tuple, tuple] = {}
+_TOOLS_BYTES_CACHE_MAX = 8
+
+
+def _anthropic_tool(tool: dict) -> dict:
+    fn = tool["function"]
+    return {
+        "name": fn["name"],
+        "description": fn.get("description", ""),
+        "input_schema": fn.get("parameters", {"type": "object", "properties": {}}),
+    }
+
+
+def _encoded_tools(tools: list, anthropic: bool = False) -> bytes:
+    """Return the JSON bytes for *tools*, in Anthropic's shape if asked."""
+    key = (id(tools), anthropic)
+    cached = _TOOLS_BYTES_CACHE.get(key)
+    if cached is not None and cached[0] is tools and cached[1] == len(tools):
+        return cached[2]
+    encoded = _dumps([_anthropic_tool(t) for t in tools] if anthropic else tools)
+    if len(_TOOLS_BYTES_CACHE) >= _TOOLS_BYTES_CACHE_MAX:
+        _TOOLS_BYTES_CACHE.clear()
+    _TOOLS_BYTES_CACHE[key] = (tools, len(tools), encoded)
+    return encoded
+
+
+def _encode_messages(messages: List[dict]) -> bytes:
+    first = messages[0] if messages else None
+    if (
+        first is None
+        or first.get("role") != "system"
+        or len(first) != 2
+        or not isinstance(first.get("content"), str)
+    ):
+        return _dumps(messages)
+    head = b'{"role":"system","content":' + _encoded_system(first["content"]) + b"}"
+    if len(messages) == 1:
+        return b"[" + head + b"]"
+    return b"[" + head + b"," + _dumps(messages[1:])[1:]
+
+
+def _encode_body(
+    body: Dict[str, Any], cache_system: bool = False, anthropic_tools: bool = False
+) -> bytes:
+    """JSON-encode a request body, splicing in cached system prompt and tools bytes.
+
+    Handles both the OpenAI-style leading system message and Anthropic's
+    top-level ``system`` string.  With *cache_system*, the Anthropic system
+    prompt is sent as a text block carrying an ephemeral ``cache_control``
+    breakpoint so repeat turns are billed at the cached-input rate; an
+    empty system prompt is omitted.  ``tools`` is given in OpenAI shape and
+    converted to Anthropic's when *anthropic_tools* is set.
+    """
+    spliced = ["messages"]
+    if isinstance(body.get("system"), str):
+        spliced.append("system")
+    if isinstance(body.get("tools"), list):
+        spliced.append("tools")
+    rest = {key: value for key, value in body.items() if key not in spliced}
+    parts = [_dumps(rest)[1:-1]] if rest else []
+    if "tools" in spliced:
+        parts.append(b'"tools":' + _encoded_tools(body["tools"], anthropic=anthropic_tools))
+    if "system" in spliced:
+        if not cache_system:
+            parts.append(b'"system":' + _encoded_system(body["system"]))
+        elif body["system"]:
+            parts.append(
+                b'"system":[{"type":"text","text":' + _encoded_system(body["system"])
+                + b',"cache_control":{"type":"ephemeral"}}]'
+            )
+    if "messages" in body:
+        parts.append(b'"messages":' + _encode_messages(body["messages"]))
+    return b"{" + b",".join(parts) + b"}"
+
+
 CROSS_PROVIDER_FALLBACK_ORDER = ["cerebras", "anthropic", "openai", "ollama"]
 
 
@@ -146,33 +323,31 @@ def get_fallback_model(provider: str) -> str:
 
 
 def raw_cerebras(config: dict, messages: List[dict], tools: Optional[List[dict]] = None) -> dict:
-    api_key = os.environ.get(config.get("api_key_env", "CEREBRAS_API_KEY"), "").strip()
-    if not api_key:
+    cfg = resolve_config(config, "cerebras")
+    if not cfg.api_key:
         return {"content": "", "tool_calls": None}
-    base_url = (config.get("base_url") or os.environ.get("CEREBRAS_BASE_URL", "https://api.cerebras.ai/v1")).rstrip("/")
     body: Dict[str, Any] = {
-        "model": config.get("chat_model", config.get("model", "zai-glm-4.7")),
+        "model": cfg.model,
         "messages": messages,
-        "temperature": 0.7,
+        "temperature": cfg.temperature,
         "max_completion_tokens": 16384,
         # Preserve prior thinking/tool context for agentic flows.
         "clear_thinking": False,
     }
     if tools:
         body["tools"] = tools
-    req = urllib.request.Request(
-        f"{base_url}/chat/completions",
-        data=json.dumps(body).encode(),
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-            "User-Agent": "conch/1.0",
-        },
-        method="POST",
-    )
     try:
-        with urllib.request.urlopen(req, timeout=60) as response:
-            data = json.loads(response.read().decode())
+        with _urlopen(
+            f"{cfg.base_url}/chat/completions",
+            _encode_body(body),
+            {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {cfg.api_key}",
+                "User-Agent": "conch/1.0",
+            },
+            timeout=60,
+        ) as response:
+            data = _loads(response.read())
     except Exception as exc:
         return {"content": f"[API error: {exc}]", "tool_calls": None}
     message = (data.get("choices") or [{}])[0].get("message", {})
@@ -189,29 +364,29 @@ def raw_cerebras(config: dict, messages: List[dict], tools: Optional[List[dict]]
 
 
 def raw_openai(config: dict, messages: List[dict], tools: Optional[List[dict]] = None) -> dict:
-    api_key = os.environ.get(config.get("api_key_env", "OPENAI_API_KEY"), "").strip()
-    if not api_key:
+    cfg = resolve_config(config, "openai")
+    if not cfg.api_key:
         return {"content": "", "tool_calls": None}
     body: Dict[str, Any] = {
-        "model": config.get("chat_model", config.get("model", "gpt-4o-mini")),
+        "model": cfg.model,
         "messages": messages,
-        "temperature": 0.7,
+        "temperature": cfg.temperature,
         "max_tokens": 16384,
+        "prompt_cache_key": config.get("prompt_cache_key") or "conch",
     }
     if tools:
         body["tools"] = tools
-    req = urllib.request.Request(
-        "https://api.openai.com/v1/chat/completions",
-        data=json.dumps(body).encode(),
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        method="POST",
-    )
     try:
-        with urllib.request.urlopen(req, timeout=60) as response:
-            data = json.loads(response.read().decode())
+        with _urlopen(
+            f"{cfg.base_url}/chat/completions",
+            _encode_body(body),
+            {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {cfg.api_key}",
+            },
+            timeout=60,
+        ) as response:
+            data = _loads(response.read())
     except Exception as exc:
         return {"content": f"[API error: {exc}]", "tool_calls": None}
     message = (data.get("choices") or [{}])[0].get("message", {})
@@ -225,8 +400,8 @@ def raw_openai(config: dict, messages: List[dict], tools: Optional[List[dict]] =
 
 
 def raw_anthropic(config: dict, messages: List[dict], tools: Optional[List[dict]] = None) -> dict:
-    api_key = os.environ.get(config.get("api_key_env", "ANTHROPIC_API_KEY"), "").strip()
-    if not api_key:
+    cfg = resolve_config(config, "anthropic")
+    if not cfg.api_key:
         return {"content": "", "tool_calls": None}
     system = ""
     user_messages: List[dict] = []
@@ -236,105 +411,150 @@ def raw_anthropic(config: dict, messages: List[dict], tools: Optional[List[dict]
         else:
             user_messages.append(message)
     body: Dict[str, Any] = {
-        "model": config.get("chat_model", config.get("model", "claude-sonnet-4-6")),
+        "model": cfg.model,
         "max_tokens": 16384,
         "system": system,
         "messages": user_messages,
     }
     if tools:
-        body["tools"] = [
-            {
-                "name": tool["function"]["name"],
-                "description": tool["function"].get("description", ""),
-                "input_schema": tool["function"].get("parameters", {"type": "object", "properties": {}}),
-            }
-            for tool in tools
-        ]
-    req = urllib.request.Request(
-        "https://api.anthropic.com/v1/messages",
-        data=json.dumps(body).encode(),
-        headers={
-            "Content-Type": "application/json",
-            "x-api-key": api_key,
-            "anthropic-version": "2023-06-01",
-        },
-        method="POST",
-    )
+        body["tools"] = tools
     try:
-        with urllib.request.urlopen(req, timeout=60) as response:
-            data = json.loads(response.read().decode())
+        with _urlopen(
+            f"{cfg.base_url}/messages",
+            _encode_body(body, cache_system=True, anthropic_tools=True),
+            {
+                "Content-Type": "application/json",
+                "x-api-key": cfg.api_key,
+                "anthropic-version": "2023-06-01",
+            },
+            timeout=60,
+        ) as response:
+            data = _loads(response.read())
     except Exception as exc:
         return {"content": f"[API error: {exc}]", "tool_calls": None}
 
     text_parts: List[str] = []
     tool_calls: List[dict] = []
+    tool_args: List[dict] = []
     raw_content = data.get("content", [])
     for block in raw_content:
-        if block.get("type") == "text":
+        block_type = block.get("type")
+        if block_type == "text":
             text_parts.append(block.get("text", ""))
-        elif block.get("type") == "tool_use":
+        elif block_type == "tool_use":
+            tool_args.append(block.get("input", {}))
             tool_calls.append({
                 "id": block["id"],
                 "type": "function",
                 "function": {
                     "name": block["name"],
-                    "arguments": json.dumps(block.get("input", {})),
+                    "arguments": _dumps(block.get("input", {})).decode(),
                 },
             })
     return {
         "role": "assistant",
         "content": "\n".join(text_parts).strip(),
         "tool_calls": tool_calls if tool_calls else None,
+        "_tool_args": tool_args,
         "_anthropic_content": raw_content,
         "_usage": _normalize_usage(data, "anthropic"),
         "_model": body["model"],
     }
 
 
+def _ollama_tool_calls(raw_tool_calls: Optional[List[dict]]) -> Tuple[Optional[List[dict]], List[dict]]:
+    """Convert Ollama tool calls to OpenAI shape.
+
+    Ollama returns arguments as an object, but the OpenAI shape needs a
+    JSON string; the original dicts come back alongside so the runtime
+    does not have to parse that string again.
+    """
+    if not raw_tool_calls:
+        return None, []
+    tool_calls: List[dict] = []
+    tool_args: List[dict] = []
+    for i, tool_call in enumerate(raw_tool_calls):
+        fn = tool_call.get("function", {})
+        arguments = fn.get("arguments", {})
+        tool_args.append(arguments)
+        tool_calls.append({
+            "id": f"ollama_{i}",
+            "type": "function",
+            "function": {
+                "name": fn.get("name", ""),
+                "arguments": _dumps(arguments).decode(),
+            },
+        })
+    return tool_calls, tool_args
+
+
 def raw_ollama(config: dict, messages: List[dict], tools: Optional[List[dict]] = None) -> dict:
-    base_url = (config.get("base_url") or os.environ.get("OLLAMA_HOST", "http://localhost:11434")).rstrip("/")
+    cfg = resolve_config(config, "ollama")
     body: Dict[str, Any] = {
-        "model": config.get("chat_model", config.get("model", "llama3.3")),
+        "model": cfg.model,
         "messages": messages,
         "stream": False,
     }
     if tools:
         body["tools"] = tools
-    req = urllib.request.Request(
-        f"{base_url}/api/chat",
-        data=json.dumps(body).encode(),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
     try:
-        with urllib.request.urlopen(req, timeout=120) as response:
-            data = json.loads(response.read().decode())
+        with _urlopen(
+            f"{cfg.base_url}/api/chat",
+            _encode_body(body),
+            {"Content-Type": "application/json"},
+            timeout=120,
+        ) as response:
+            data = _loads(response.read())
     except Exception as exc:
         return {"content": f"[Ollama error: {exc}]", "tool_calls": None}
     message = data.get("message", {})
-    raw_tool_calls = message.get("tool_calls")
-    tool_calls = None
-    if raw_tool_calls:
-        tool_calls = []
-        for i, tool_call in enumerate(raw_tool_calls):
-            fn = tool_call.get("function", {})
-            tool_calls.append({
-                "id": f"ollama_{i}",
-                "type": "function",
-                "function": {
-                    "name": fn.get("name", ""),
-                    "arguments": json.dumps(fn.get("arguments", {})),
-                },
-            })
+    tool_calls, tool_args = _ollama_tool_calls(message.get("tool_calls"))
     return {
         "role": "assistant",
         "content": message.get("content", "").strip(),
         "tool_calls": tool_calls,
+        "_tool_args": tool_args,
         "_usage": _normalize_usage(data, "ollama"),
         "_model": body["model"],
     }
 
 
+EMBEDDING_MODELS = {
+    "openai": "text-embedding-3-small",
+    "ollama": "nomic-embed-text",
+}
+
+
+def embed_texts(config: dict, texts: List[str]) -> Optional[List[List[float]]]:
+    """Return one embedding vector per text, or None if no backend is usable.
+
+    Ollama embeds locally; every other provider uses the OpenAI embeddings
+    endpoint when an OpenAI key is available. All texts go in one request.
+    """
+    provider = config.get("provider", "")
+    try:
+        if provider == "ollama":
+            base_url = resolve_config(config, "ollama").base_url
+            body = {"model": config.get("embedding_model") or EMBEDDING_MODELS["ollama"], "input": texts}
+            with _urlopen(f"{base_url}/api/embed", _dumps(body), {"Content-Type": "application/json"}, timeout=30) as response:
+                return _loads(response.read())["embeddings"]
+        key_env = config.get("api_key_env") if provider == "openai" else DEFAULT_API_KEY_ENVS["openai"]
+        api_key = api_key_for(key_env or "")
+        if not api_key:
+            return None
+        body = {"model": config.get("embedding_model") or EMBEDDING_MODELS["openai"], "input": texts}
+        with _urlopen(
+            "https://api.openai.com/v1/embeddings",
+            _dumps(body),
+            {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"},
+            timeout=30,
+        ) as response:
+            rows = _loads(response.read())["data"]
+        return [row["embedding"] for row in sorted(rows, key=lambda row: row.get("index", 0))]
+    except Exception:
+        return None
+
+
 RAW_FNS = {
     "cerebras": raw_cerebras,
     "openai": raw_openai,
@@ -348,22 +568,32 @@ RAW_FNS = {
 # ---------------------------------------------------------------------------
 
 def _iter_sse(response):
-    """Yield parsed JSON payloads from an SSE response stream."""
+    """Yield parsed JSON payloads from an SSE response stream.
+
+    Lines stay as bytes: only ``data:`` lines are sliced and handed to the
+    JSON parser, so comments, ``event:`` lines and blank separators are
+    skipped without a decode.
+    """
     for raw_line in response:
-        line = raw_line.decode("utf-8", errors="replace").strip()
-        if not line or line.startswith(":"):
+        if not raw_line.startswith(b"data:"):
             continue
-        if not line.startswith("data: "):
-            continue
-        payload = line[6:]
-        if payload.strip() == "[DONE]":
+        payload = raw_line[5:].strip()
+        if payload == b"[DONE]":
             return
         try:
-            yield json.loads(payload)
-        except json.JSONDecodeError:
+            yield _loads(payload)
+        except ValueError:
             continue
 
 
+def _openai_tool_call(info: dict) -> dict:
+    return {
+        "id": info["id"],
+        "type": "function",
+        "function": {"name": info["name"], "arguments": "".join(info["arguments"])},
+    }
+
+
 def _stream_openai_compat(
     url: str,
     headers: dict,
@@ -371,22 +601,28 @@ def _stream_openai_compat(
     model: str,
     provider: str,
     on_token,
+    on_tool_call=None,
 ) -> dict:
-    """Shared streaming implementation for OpenAI-compatible APIs."""
-    body["stream"] = True
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(body).encode(),
-        headers=headers,
-        method="POST",
-    )
+    """Shared streaming implementation for OpenAI-compatible APIs.
 
+    Tool calls arrive one after another, so a call is complete once a delta
+    for a later index (or the finish reason) shows up; *on_tool_call* gets
+    each one at that point, as stream_anthropic does.
+    """
+    body["stream"] = True
     content_parts: list[str] = []
     tool_calls_acc: dict[int, dict] = {}
+    dispatched: set[int] = set()
     usage = {"input_tokens": 0, "output_tokens": 0}
 
+    def _dispatch(below: Optional[int] = None) -> None:
+        for i in sorted(tool_calls_acc):
+            if (below is None or i < below) and i not in dispatched:
+                dispatched.add(i)
+                on_tool_call(_openai_tool_call(tool_calls_acc[i]))
+
     try:
-        with urllib.request.urlopen(req, timeout=120) as response:
+        with _urlopen(url, _encode_body(body), headers, timeout=120) as response:
             for chunk in _iter_sse(response):
                 choice = (chunk.get("choices") or [{}])[0]
                 delta = choice.get("delta", {})
@@ -403,14 +639,19 @@ def _stream_openai_compat(
                 for tc in delta.get("tool_calls", []):
                     idx = tc.get("index", 0)
                     if idx not in tool_calls_acc:
-                        tool_calls_acc[idx] = {"id": "", "name": "", "arguments": ""}
+                        if on_tool_call:
+                            _dispatch(below=idx)
+                        tool_calls_acc[idx] = {"id": "", "name": "", "arguments": []}
                     if tc.get("id"):
                         tool_calls_acc[idx]["id"] = tc["id"]
                     fn = tc.get("function", {})
                     if fn.get("name"):
                         tool_calls_acc[idx]["name"] = fn["name"]
                     if fn.get("arguments") is not None:
-                        tool_calls_acc[idx]["arguments"] += fn["arguments"]
+                        tool_calls_acc[idx]["arguments"].append(fn["arguments"])
+
+                if on_tool_call and choice.get("finish_reason"):
+                    _dispatch()
 
                 if chunk.get("usage"):
                     u = chunk["usage"]
@@ -422,14 +663,7 @@ def _stream_openai_compat(
     full_text = "".join(content_parts).strip()
     tool_calls = None
     if tool_calls_acc:
-        tool_calls = [
-            {
-                "id": info["id"],
-                "type": "function",
-                "function": {"name": info["name"], "arguments": info["arguments"]},
-            }
-            for info in [tool_calls_acc[i] for i in sorted(tool_calls_acc)]
-        ]
+        tool_calls = [_openai_tool_call(tool_calls_acc[i]) for i in sorted(tool_calls_acc)]
 
     return {
         "role": "assistant",
@@ -441,79 +675,77 @@ def _stream_openai_compat(
 
 
 def stream_cerebras(
-    config: dict, messages: list, tools=None, on_token=None
+    config: dict, messages: list, tools=None, on_token=None, on_tool_call=None
 ) -> dict:
-    api_key = os.environ.get(
-        config.get("api_key_env", "CEREBRAS_API_KEY"), ""
-    ).strip()
-    if not api_key:
+    cfg = resolve_config(config, "cerebras")
+    if not cfg.api_key:
         return {"content": "", "tool_calls": None}
-    base_url = (
-        config.get("base_url")
-        or os.environ.get("CEREBRAS_BASE_URL", "https://api.cerebras.ai/v1")
-    ).rstrip("/")
-    model = config.get("chat_model", config.get("model", "zai-glm-4.7"))
+    model = cfg.model
     body: Dict[str, Any] = {
         "model": model,
         "messages": messages,
-        "temperature": 0.7,
+        "temperature": cfg.temperature,
         "max_completion_tokens": 16384,
         "clear_thinking": False,
     }
     if tools:
         body["tools"] = tools
     return _stream_openai_compat(
-        f"{base_url}/chat/completions",
+        f"{cfg.base_url}/chat/completions",
         {
             "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
+            "Authorization": f"Bearer {cfg.api_key}",
             "User-Agent": "conch/1.0",
         },
         body,
         model,
         "cerebras",
         on_token,
+        on_tool_call,
     )
 
 
 def stream_openai(
-    config: dict, messages: list, tools=None, on_token=None
+    config: dict, messages: list, tools=None, on_token=None, on_tool_call=None
 ) -> dict:
-    api_key = os.environ.get(
-        config.get("api_key_env", "OPENAI_API_KEY"), ""
-    ).strip()
-    if not api_key:
+    cfg = resolve_config(config, "openai")
+    if not cfg.api_key:
         return {"content": "", "tool_calls": None}
-    model = config.get("chat_model", config.get("model", "gpt-4o-mini"))
+    model = cfg.model
     body: Dict[str, Any] = {
         "model": model,
         "messages": messages,
-        "temperature": 0.7,
+        "temperature": cfg.temperature,
         "max_tokens": 16384,
         "stream_options": {"include_usage": True},
+        "prompt_cache_key": config.get("prompt_cache_key") or "conch",
     }
     if tools:
         body["tools"] = tools
     return _stream_openai_compat(
-        "https://api.openai.com/v1/chat/completions",
+        f"{cfg.base_url}/chat/completions",
         {
             "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
+            "Authorization": f"Bearer {cfg.api_key}",
         },
         body,
         model,
         "openai",
         on_token,
+        on_tool_call,
     )
 
 
 def stream_anthropic(
-    config: dict, messages: list, tools=None, on_token=None
+    config: dict, messages: list, tools=None, on_token=None, on_tool_call=None
 ) -> dict:
-    api_key = os.environ.get(
-        config.get("api_key_env", "ANTHROPIC_API_KEY"), ""
-    ).strip()
-    if not api_key:
+    """Stream a reply from the Anthropic Messages API.
+
+    When *on_tool_call* is given it receives each tool call (OpenAI shape)
+    as soon as its block closes, before the rest of the reply arrives.
+    """
+    cfg = resolve_config(config, "anthropic")
+    if not cfg.api_key:
         return {"content": "", "tool_calls": None}
 
     system = ""
@@ -524,7 +756,7 @@ def stream_anthropic(
         else:
             user_messages.append(msg)
 
-    model = config.get("chat_model", config.get("model", "claude-sonnet-4-6"))
+    model = cfg.model
     body: Dict[str, Any] = {
         "model": model,
         "max_tokens": 16384,
@@ -533,27 +765,7 @@ def stream_anthropic(
         "stream": True,
     }
     if tools:
-        body["tools"] = [
-            {
-                "name": t["function"]["name"],
-                "description": t["function"].get("description", ""),
-                "input_schema": t["function"].get(
-                    "parameters", {"type": "object", "properties": {}}
-                ),
-            }
-            for t in tools
-        ]
-
-    req = urllib.request.Request(
-        "https://api.anthropic.com/v1/messages",
-        data=json.dumps(body).encode(),
-        headers={
-            "Content-Type": "application/json",
-            "x-api-key": api_key,
-            "anthropic-version": "2023-06-01",
-        },
-        method="POST",
-    )
+        body["tools"] = tools
 
     text_parts: list[str] = []
     anthropic_content: list[dict] = []
@@ -561,22 +773,21 @@ def stream_anthropic(
     cur_block_type: Optional[str] = None
     cur_block_meta: dict = {}
     cur_text: list[str] = []
-    cur_json = ""
+    cur_json: list[str] = []
     usage = {"input_tokens": 0, "output_tokens": 0}
 
     try:
-        with urllib.request.urlopen(req, timeout=120) as response:
-            for raw_line in response:
-                line = raw_line.decode("utf-8", errors="replace").strip()
-                if not line or line.startswith(":"):
-                    continue
-                if not line.startswith("data: "):
-                    continue
-                try:
-                    data = json.loads(line[6:])
-                except json.JSONDecodeError:
-                    continue
-
+        with _urlopen(
+            f"{cfg.base_url}/messages",
+            _encode_body(body, cache_system=True, anthropic_tools=True),
+            {
+                "Content-Type": "application/json",
+                "x-api-key": cfg.api_key,
+                "anthropic-version": "2023-06-01",
+            },
+            timeout=120,
+        ) as response:
+            for data in _iter_sse(response):
                 etype = data.get("type")
 
                 if etype == "error":
@@ -595,7 +806,7 @@ def stream_anthropic(
                     cur_block_type = block.get("type")
                     cur_block_meta = block
                     cur_text = []
-                    cur_json = ""
+                    cur_json = []
 
                 elif etype == "content_block_delta":
                     delta = data.get("delta", {})
@@ -606,7 +817,7 @@ def stream_anthropic(
                         if on_token:
                             on_token(t)
                     elif delta.get("type") == "input_json_delta":
-                        cur_json += delta.get("partial_json", "")
+                        cur_json.append(delta.get("partial_json", ""))
 
                 elif etype == "content_block_stop":
                     if cur_block_type == "text":
@@ -614,9 +825,10 @@ def stream_anthropic(
                             {"type": "text", "text": "".join(cur_text)}
                         )
                     elif cur_block_type == "tool_use":
+                        raw_json = "".join(cur_json)
                         try:
-                            inp = json.loads(cur_json) if cur_json else {}
-                        except json.JSONDecodeError:
+                            inp = _loads(raw_json) if raw_json else {}
+                        except ValueError:
                             inp = {}
                         anthropic_content.append({
                             "type": "tool_use",
@@ -629,9 +841,11 @@ def stream_anthropic(
                             "type": "function",
                             "function": {
                                 "name": cur_block_meta.get("name", ""),
-                                "arguments": json.dumps(inp),
+                                "arguments": _dumps(inp).decode(),
                             },
                         })
+                        if on_tool_call:
+                            on_tool_call(tool_calls[-1])
                     cur_block_type = None
 
                 elif etype == "message_delta":
@@ -648,6 +862,7 @@ def stream_anthropic(
         "role": "assistant",
         "content": full_text,
         "tool_calls": tool_calls if tool_calls else None,
+        "_tool_args": [block["input"] for block in anthropic_content if block.get("type") == "tool_use"],
         "_anthropic_content": anthropic_content,
         "_usage": usage,
         "_model": model,
@@ -657,11 +872,8 @@ def stream_anthropic(
 def stream_ollama(
     config: dict, messages: list, tools=None, on_token=None
 ) -> dict:
-    base_url = (
-        config.get("base_url")
-        or os.environ.get("OLLAMA_HOST", "http://localhost:11434")
-    ).rstrip("/")
-    model = config.get("chat_model", config.get("model", "llama3.3"))
+    cfg = resolve_config(config, "ollama")
+    model = cfg.model
     body: Dict[str, Any] = {
         "model": model,
         "messages": messages,
@@ -670,25 +882,23 @@ def stream_ollama(
     if tools:
         body["tools"] = tools
 
-    req = urllib.request.Request(
-        f"{base_url}/api/chat",
-        data=json.dumps(body).encode(),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-
     content_parts: list[str] = []
     final_data: dict = {}
 
     try:
-        with urllib.request.urlopen(req, timeout=120) as response:
+        with _urlopen(
+            f"{cfg.base_url}/api/chat",
+            _encode_body(body),
+            {"Content-Type": "application/json"},
+            timeout=120,
+        ) as response:
             for raw_line in response:
-                line = raw_line.decode("utf-8", errors="replace").strip()
+                line = raw_line.strip()
                 if not line:
                     continue
                 try:
-                    data = json.loads(line)
-                except json.JSONDecodeError:
+                    data = _loads(line)
+                except ValueError:
                     continue
 
                 msg = data.get("message", {})
@@ -704,25 +914,13 @@ def stream_ollama(
         return {"content": f"[Ollama error: {exc}]", "tool_calls": None}
 
     full_text = "".join(content_parts).strip()
-    raw_tool_calls = final_data.get("message", {}).get("tool_calls")
-    tool_calls = None
-    if raw_tool_calls:
-        tool_calls = []
-        for i, tc in enumerate(raw_tool_calls):
-            fn = tc.get("function", {})
-            tool_calls.append({
-                "id": f"ollama_{i}",
-                "type": "function",
-                "function": {
-                    "name": fn.get("name", ""),
-                    "arguments": json.dumps(fn.get("arguments", {})),
-                },
-            })
+    tool_calls, tool_args = _ollama_tool_calls(final_data.get("message", {}).get("tool_calls"))
 
     return {
         "role": "assistant",
         "content": full_text,
         "tool_calls": tool_calls,
+        "_tool_args": tool_args,
         "_usage": _normalize_usage(final_data, "ollama"),
         "_model": model,
     }
@@ -5,7 +5,6 @@ Data sourced from https://github.com/public-apis/public-apis
 
 from __future__ import annotations
 
-import json
 import os
 import re
 import time
@@ -14,6 +13,8 @@ import urllib.parse
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from . import fastjson
+
 _STATE_DIR = Path(
     os.environ.get("XDG_STATE_HOME", Path.home() / ".local/state")
 ) / "conch"
@@ -91,7 +92,7 @@ def _fetch_catalog() -> List[Dict[str, Any]]:
     # Cache to disk
     try:
         _STATE_DIR.mkdir(parents=True, exist_ok=True)
-        _CACHE_PATH.write_text(json.dumps({
+        _CACHE_PATH.write_bytes(fastjson.dumps({
             "ts": time.time(),
             "entries": entries,
         }))
@@ -104,10 +105,10 @@ def _fetch_catalog() -> List[Dict[str, Any]]:
 def _load_from_cache() -> Optional[List[Dict[str, Any]]]:
     """Load catalog from disk cache if still fresh."""
     try:
-        data = json.loads(_CACHE_PATH.read_text())
+        data = fastjson.loads(_CACHE_PATH.read_bytes())
         if time.time() - data.get("ts", 0) < _CACHE_TTL:
             return data.get("entries", [])
-    except (FileNotFoundError, json.JSONDecodeError, OSError):
+    except (FileNotFoundError, ValueError, OSError):
         pass
     return None
 
@@ -201,7 +202,7 @@ def call_api(
         url = url + sep + qs
         data = None
     elif method.upper() == "POST" and params:
-        data = json.dumps(params).encode()
+        data = fastjson.dumps(params)
         req_headers["Content-Type"] = "application/json"
     else:
         data = None
@@ -7,7 +7,6 @@ import os
 import re
 import sys
 import threading
-import time
 
 # Enable ANSI escape codes on Windows 10+ cmd.exe
 if os.name == "nt":
@@ -18,52 +17,84 @@ if os.name == "nt":
     except Exception:
         pass
 
-try:
-    from pygments import highlight as _pyg_highlight
-    from pygments.lexers import get_lexer_by_name, TextLexer
-    from pygments.formatters import Terminal256Formatter
+_CODE_BORDER = "\033[2m" + "\u2500" * 44 + "\033[0m"
+_INDENTED_BORDER = "  " + _CODE_BORDER
+_BULLET = "\033[36m\u2022\033[0m "
 
-    _HAS_PYGMENTS = True
-except ImportError:
-    _HAS_PYGMENTS = False
+# Pygments is imported on the first code block that needs it, so piped
+# output and replies without code never pay for the import.
+_pygments = None  # None = not tried yet, False = unavailable
 
-_CODE_BORDER = "\033[2m" + "\u2500" * 44 + "\033[0m"
+
+def _load_pygments():
+    global _pygments
+    if _pygments is None:
+        try:
+            from pygments import highlight as pyg_highlight
+            from pygments.lexers import get_lexer_by_name, TextLexer
+            from pygments.formatters import Terminal256Formatter
+
+            _pygments = (pyg_highlight, get_lexer_by_name, TextLexer, Terminal256Formatter(style="monokai"))
+        except ImportError:
+            _pygments = False
+    return _pygments
 
 
 def _highlight_code(code: str, lang: str) -> str:
-    if _HAS_PYGMENTS:
+    pygments = _load_pygments()
+    if pygments:
+        pyg_highlight, get_lexer_by_name, TextLexer, formatter = pygments
         try:
             lexer = get_lexer_by_name(lang) if lang else TextLexer()
         except Exception:
             lexer = TextLexer()
-        return _pyg_highlight(
-            code, lexer, Terminal256Formatter(style="monokai")
-        ).rstrip("\n")
+        return pyg_highlight(code, lexer, formatter).rstrip("\n")
     return "\033[2m" + code + "\033[0m"
 
 
+_RULE_RE = re.compile(r"^[-*_]{3,}\s*$")
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_CODE_RE = re.compile(r"`([^`]+)`")
+_ITALIC_RE = re.compile(r"(?<!\*)\*([^*]+)\*(?!\*)")
+_BULLET_RE = re.compile(r"^(\s*)[-*]\s")
+_NUMBERED_RE = re.compile(r"^(\s*)(\d+\.)(?=\s)")
+
+
 def _format_line(line: str) -> str:
-    """Apply inline markdown formatting to a single line."""
+    """Apply inline markdown formatting to a single line.
+
+    Each pass is skipped when its marker character is absent, and the
+    line-level patterns are only tried when the first character could
+    start one, so plain prose lines never reach the regex engine.
+    """
     if line.startswith("### "):
         return "\033[1;35m" + line[4:] + "\033[0m"
     if line.startswith("## "):
         return "\033[1;34m" + line[3:] + "\033[0m"
     if line.startswith("# "):
         return "\033[1;33m" + line[2:] + "\033[0m"
-    if re.match(r"^[-*_]{3,}\s*$", line):
+    first = line[:1]
+    if first and first in "-*_" and _RULE_RE.match(line):
         return _CODE_BORDER
 
     out = line
-    out = re.sub(r"\*\*(.+?)\*\*", "\033[1m" + r"\1" + "\033[22m", out)
-    out = re.sub(r"`([^`]+)`", "\033[36m" + r"\1" + "\033[0m", out)
-    out = re.sub(
-        r"(?<!\*)\*([^*]+)\*(?!\*)", "\033[3m" + r"\1" + "\033[23m", out
-    )
-
-    if re.match(r"^\s*[-*]\s", out):
-        out = re.sub(r"^(\s*)[-*]\s", r"\1" + "\033[36m\u2022\033[0m ", out)
-    elif re.match(r"^\s*\d+\.\s", out):
-        out = re.sub(r"^(\s*)(\d+\.)", r"\1" + "\033[36m" + r"\2" + "\033[0m", out)
+    if "**" in out:
+        out = _BOLD_RE.sub("\033[1m" + r"\1" + "\033[22m", out)
+    if "`" in out:
+        out = _CODE_RE.sub("\033[36m" + r"\1" + "\033[0m", out)
+    if "*" in out:
+        out = _ITALIC_RE.sub("\033[3m" + r"\1" + "\033[23m", out)
+
+    first = out[:1]
+    if not first or not (first.isspace() or first.isdigit() or first in "-*"):
+        return out
+    bullet = _BULLET_RE.match(out)
+    if bullet:
+        out = bullet.group(1) + _BULLET + out[bullet.end():]
+    else:
+        numbered = _NUMBERED_RE.match(out)
+        if numbered:
+            out = numbered.group(1) + "\033[36m" + numbered.group(2) + "\033[0m" + out[numbered.end():]
     return out
 
 
@@ -88,20 +119,18 @@ def highlight(text: str) -> str:
             if line.startswith("```"):
                 in_code = False
                 code = "\n".join(code_buf)
-                output.append("  " + _CODE_BORDER)
-                for hl_line in _highlight_code(code, code_lang).split("\n"):
-                    output.append("  " + hl_line)
-                output.append("  " + _CODE_BORDER)
+                output.append(_INDENTED_BORDER)
+                output.extend("  " + hl_line for hl_line in _highlight_code(code, code_lang).split("\n"))
+                output.append(_INDENTED_BORDER)
                 continue
             code_buf.append(line)
             continue
         output.append(_format_line(line))
 
     if in_code:
-        output.append("  " + _CODE_BORDER)
-        for raw_line in code_buf:
-            output.append("  " + raw_line)
-        output.append("  " + _CODE_BORDER)
+        output.append(_INDENTED_BORDER)
+        output.extend("  " + raw_line for raw_line in code_buf)
+        output.append(_INDENTED_BORDER)
 
     return "\n".join(output)
 
@@ -169,7 +198,7 @@ class StreamPrinter:
         if self._in_code:
             code = "\n".join(self._code_buf)
             sys.stdout.write("\n  " + _highlight_code(code, self._code_lang))
-            sys.stdout.write("\n  " + _CODE_BORDER)
+            sys.stdout.write("\n" + _INDENTED_BORDER)
             self._in_code = False
         sys.stdout.write("\n")
         sys.stdout.flush()
@@ -190,16 +219,15 @@ class StreamPrinter:
                 line[3:].strip().split()[0] if line[3:].strip() else ""
             )
             self._code_buf = []
-            sys.stdout.write("  " + _CODE_BORDER)
+            sys.stdout.write(_INDENTED_BORDER)
             return
 
         if self._in_code:
             if line.startswith("```"):
                 self._in_code = False
                 code = "\n".join(self._code_buf)
-                for hl_line in _highlight_code(code, self._code_lang).split("\n"):
-                    sys.stdout.write("\n  " + hl_line)
-                sys.stdout.write("\n  " + _CODE_BORDER)
+                highlighted = _highlight_code(code, self._code_lang)
+                sys.stdout.write("\n  " + highlighted.replace("\n", "\n  ") + "\n" + _INDENTED_BORDER)
                 return
             self._code_buf.append(line)
             return
@@ -210,6 +238,8 @@ class StreamPrinter:
 class Spinner:
     """Minimal terminal spinner used while waiting on remote work."""
 
+    _FRAMES = "\u280b\u2819\u2839\u2838\u283c\u2834\u2826\u2827\u2807\u280f"
+
     def __init__(self, label: str):
         self.label = label
         self._stop = threading.Event()
@@ -219,16 +249,20 @@ class Spinner:
         if not sys.stderr.isatty():
             return self
 
+        # The label is drawn once after the first glyph; later frames return
+        # to column 0 and repaint only the glyph, a dozen bytes a tick.
+        glyphs = ["\r\033[36m" + frame + "\033[0m" for frame in self._FRAMES]
+        first = glyphs[0] + " \033[2m" + self.label + "\033[0m  "
+        frames = itertools.chain([first], itertools.cycle(glyphs[1:] + glyphs[:1]))
+
         def _run():
-            for frame in itertools.cycle("\u280b\u2819\u2839\u2838\u283c\u2834\u2826\u2827\u2807\u280f"):
-                if self._stop.is_set():
-                    break
-                sys.stderr.write(
-                    "\r\033[36m" + frame + "\033[0m \033[2m"
-                    + self.label + "\033[0m  "
-                )
+            # Waiting on the stop event instead of sleeping lets __exit__
+            # return as soon as the work is done, not up to a frame later.
+            for frame in frames:
+                sys.stderr.write(frame)
                 sys.stderr.flush()
-                time.sleep(0.08)
+                if self._stop.wait(0.08):
+                    break
 
         self._thread = threading.Thread(target=_run, daemon=True)
         self._thread.start()
@@ -238,6 +272,7 @@ class Spinner:
         if self._thread:
             self._stop.set()
             self._thread.join(timeout=0.2)
-            sys.stderr.write("\r               \r")
+            width = max(15, len(self.label) + 4)
+            sys.stderr.write("\r" + " " * width + "\r")
             sys.stderr.flush()
         return False
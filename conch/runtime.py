@@ -6,10 +6,15 @@ import ast
 import re
 import json
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Dict, List, Optional
 
+from . import cache as response_cache
+from . import fastjson
 from . import mcp as mcp_mod
+from .config import get_bool, get_float, get_int
 from .render import Spinner
 
 
@@ -20,6 +25,27 @@ CONTEXT_LIMITS = {
     "ollama": 28000,
 }
 
+DEFAULT_MAX_TURNS = 20  # user turns kept in history; max_turns=0 disables
+DEFAULT_HISTORY_TOOL_CHARS = 2000  # tool output kept from earlier turns; 0 disables
+SUMMARY_KEEP_TURNS = 4  # recent turns left verbatim when history is summarized
+
+
+# id(tools) -> (tools, len(tools), serialized length); the tools list is
+# reused across turns, so its size is measured once rather than per call.
+_TOOLS_CHARS_CACHE: Dict[int, tuple] = {}
+_TOOLS_CHARS_CACHE_MAX = 8
+
+
+def _tools_chars(tools: List[dict]) -> int:
+    cached = _TOOLS_CHARS_CACHE.get(id(tools))
+    if cached is not None and cached[0] is tools and cached[1] == len(tools):
+        return cached[2]
+    chars = len(json.dumps(tools))
+    if len(_TOOLS_CHARS_CACHE) >= _TOOLS_CHARS_CACHE_MAX:
+        _TOOLS_CHARS_CACHE.clear()
+    _TOOLS_CHARS_CACHE[id(tools)] = (tools, len(tools), chars)
+    return chars
+
 
 def estimate_tokens(messages: List[dict], tools: Optional[List[dict]] = None) -> int:
     total = 0
@@ -31,7 +57,7 @@ def estimate_tokens(messages: List[dict], tools: Optional[List[dict]] = None) ->
             for block in content:
                 total += len(json.dumps(block)) if isinstance(block, dict) else len(str(block))
     if tools:
-        total += len(json.dumps(tools))
+        total += _tools_chars(tools)
     return int(total / CHARS_PER_TOKEN)
 
 
@@ -74,6 +100,224 @@ def compress_context(messages: List[dict], tools: Optional[List[dict]], provider
     return [system, note] + [summarize_message(message) for message in recent]
 
 
+def window_start(messages: List[dict], max_turns: int) -> int:
+    """Index of the first message in the last *max_turns* user turns.
+
+    A turn starts at a plain-text user message and runs up to the next one,
+    so tool calls are never separated from their results.  When nothing
+    needs cutting this is the index just past the leading system message.
+    """
+    head = 1 if messages and messages[0].get("role") == "system" else 0
+    if max_turns <= 0:
+        return head
+    starts = [
+        i for i, message in enumerate(messages)
+        if message.get("role") == "user" and isinstance(message.get("content"), str)
+    ]
+    if len(starts) <= max_turns:
+        return head
+    return max(head, starts[-max_turns])
+
+
+def history_view(messages: List[dict], start: int = 0, tool_result_chars: int = 0) -> List[dict]:
+    """Return what to send of *messages*: the system message, then *start* on.
+
+    Tool output from before the newest user prompt is shortened to
+    *tool_result_chars* (see trim_tool_results).  *messages* itself is left
+    whole, so the saved conversation keeps every turn and all tool output;
+    it is returned as is when nothing is cut.  *start* never passes the
+    newest user prompt.
+    """
+    head = 1 if messages and messages[0].get("role") == "system" else 0
+    if start <= head and tool_result_chars <= 0:
+        return messages
+    prompt = _latest_prompt(messages)
+    if prompt is None:
+        prompt = len(messages)
+    start = min(max(start, head), prompt)
+    return messages[:head] + trim_tool_results(messages[start:prompt], tool_result_chars) + messages[prompt:]
+
+
+def _latest_prompt(messages: List[dict]) -> Optional[int]:
+    for i in range(len(messages) - 1, -1, -1):
+        message = messages[i]
+        if message.get("role") == "user" and isinstance(message.get("content"), str):
+            return i
+    return None
+
+
+def compact_json_text(text: str) -> str:
+    """Re-serialize pretty-printed JSON tool output without whitespace.
+
+    Many MCP servers return indented JSON; the indentation is resent with
+    every later request and counts against the truncation limit.  Text
+    that is not JSON, or would not get shorter, is returned unchanged.
+    """
+    stripped = text.strip()
+    if not stripped or stripped[0] not in "{[" or not ("\n" in stripped or ": " in stripped or ", " in stripped):
+        return text
+    try:
+        compact = fastjson.dumps(fastjson.loads(stripped)).decode()
+    except (ValueError, TypeError):
+        return text
+    return compact if len(compact) < len(text) else text
+
+
+def _trim_text(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    head = max_chars // 4
+    return text[:head] + "\n...[trimmed]...\n" + text[-(max_chars - head):]
+
+
+def trim_tool_results(messages: List[dict], max_chars: int) -> List[dict]:
+    """Return *messages* with tool output shortened to about *max_chars* each.
+
+    Meant for turns that are already answered: the model has read the
+    full output once, so resending the head and the tail is enough.
+    Shortened messages are copies; *messages* itself is not modified.
+    """
+    if max_chars <= 0:
+        return messages
+    trimmed = []
+    for message in messages:
+        content = message.get("content")
+        if message.get("role") == "tool" and isinstance(content, str) and len(content) > max_chars:
+            message = dict(message, content=_trim_text(content, max_chars))
+        elif message.get("role") == "user" and isinstance(content, list):
+            blocks = [
+                dict(block, content=_trim_text(block["content"], max_chars))
+                if isinstance(block, dict) and block.get("type") == "tool_result"
+                and isinstance(block.get("content"), str) and len(block["content"]) > max_chars
+                else block
+                for block in content
+            ]
+            if any(new is not old for new, old in zip(blocks, content)):
+                message = dict(message, content=blocks)
+        trimmed.append(message)
+    return trimmed
+
+
+class HistorySummarizer:
+    """Running summary of turns that were dropped from the history window.
+
+    Dropped turns are summarized on a worker thread; the summary is picked
+    up by a later turn and sent as turn context.  A summary belongs
+    to one conversation and is discarded when another one becomes current.
+    """
+
+    def __init__(self):
+        self.summary = ""
+        self._conv_id = ""
+        self._thread: Optional[threading.Thread] = None
+        self._result: List[str] = []
+        self._backlog: List[dict] = []
+        self._config: dict = {}
+        self._raw_fn = None
+        # Index up to which the conversation has been handed over.
+        self._start = 0
+
+    def reset(self, conv_id: str = "") -> None:
+        self.summary = ""
+        self._conv_id = conv_id
+        self._result = []
+        self._backlog = []
+        self._start = 0
+
+    def add(self, conv_id: str, dropped: List[dict], config: dict, raw_fn) -> None:
+        if conv_id != self._conv_id:
+            self.reset(conv_id)
+        self._backlog.extend(dropped)
+        self._config, self._raw_fn = dict(config), raw_fn
+        self._poll()
+
+    def advance(self, conv_id: str, messages: List[dict], start: int, config: dict, raw_fn) -> int:
+        """Summarize the messages before *start* not handed over yet.
+
+        Returns the index to send *messages* from.  It never moves back, so
+        turns folded into the summary are not also sent verbatim.
+        """
+        if conv_id != self._conv_id:
+            self.reset(conv_id)
+        begin = max(self._start, 1 if messages and messages[0].get("role") == "system" else 0)
+        if start > begin:
+            self.add(conv_id, messages[begin:start], config, raw_fn)
+            self._start = start
+        return max(start, self._start)
+
+    def current(self, conv_id: str) -> str:
+        if conv_id != self._conv_id:
+            self.reset(conv_id)
+            return ""
+        self._poll()
+        return self.summary
+
+    def join(self) -> None:
+        if self._thread:
+            self._thread.join()
+        self._poll()
+
+    def _poll(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        if self._thread:
+            self._thread = None
+            if self._result and self._result[0]:
+                self.summary = self._result[0]
+        if not self._backlog:
+            return
+        lines = []
+        for message in self._backlog:
+            if message.get("role") in ("user", "assistant") and isinstance(message.get("content"), str):
+                lines.append(f"{message['role']}: {message['content'][:1000]}")
+        self._backlog = []
+        if not lines:
+            return
+        self._result = result = []
+        previous = self.summary
+        self._thread = threading.Thread(
+            target=self._summarize,
+            args=(previous, "\n".join(lines), self._config, self._raw_fn, result),
+            daemon=True,
+        )
+        self._thread.start()
+
+    @staticmethod
+    def _summarize(previous: str, transcript: str, config: dict, raw_fn, result: List[str]) -> None:
+        prompt = "Summarize the earlier part of this conversation in a few concise bullet points, keeping names, numbers and decisions."
+        if previous:
+            prompt += f"\n\nSummary so far:\n{previous}"
+        try:
+            response = raw_fn(config, [
+                {"role": "system", "content": "You summarize conversations concisely."},
+                {"role": "user", "content": f"{prompt}\n\nTranscript:\n{transcript}"},
+            ], None)
+        except Exception:
+            return
+        content = response.get("content", "")
+        if isinstance(content, str) and content.strip() and not content.startswith("[API error:"):
+            result.append("Summary of earlier conversation:\n" + content.strip())
+
+
+def with_turn_context(messages: List[dict], context: str) -> List[dict]:
+    """Return *messages* with *context* prefixed to the latest user turn.
+
+    Recalled memories and the history summary change from turn to turn.
+    Carried in the system prompt they would change the very start of every
+    request and defeat provider prompt caching, so they ride on the newest
+    user message instead.  *messages* itself is not modified.
+    """
+    if not context:
+        return messages
+    for i in range(len(messages) - 1, -1, -1):
+        message = messages[i]
+        if message.get("role") == "user" and isinstance(message.get("content"), str):
+            sent = list(messages)
+            sent[i] = {**message, "content": f"{context}\n\n{message['content']}"}
+            return sent
+    return messages
+
+
 def append_results_openai(messages: List[dict], response: dict, results: List[dict]):
     assistant_message: Dict[str, Any] = {"role": "assistant", "content": response.get("content") or None}
     if response.get("tool_calls"):
@@ -160,8 +404,8 @@ def extract_textual_tool_use_blocks(text: str) -> Optional[List[dict]]:
                         args_str = chunk[start:end]
                     break
             try:
-                tool_input = json.loads(args_str) if args_str.strip() else {}
-            except (json.JSONDecodeError, ValueError):
+                tool_input = fastjson.loads(args_str) if args_str.strip() else {}
+            except ValueError:
                 tool_input = {}
             if not isinstance(tool_input, dict):
                 tool_input = {}
@@ -201,8 +445,8 @@ def extract_textual_tool_use_blocks(text: str) -> Optional[List[dict]]:
             tool_input = block.get("input", {})
             if isinstance(tool_input, str):
                 try:
-                    tool_input = json.loads(tool_input)
-                except json.JSONDecodeError:
+                    tool_input = fastjson.loads(tool_input)
+                except ValueError:
                     tool_input = {}
             if not isinstance(tool_input, dict):
                 tool_input = {}
@@ -353,6 +597,206 @@ def normalize_messages_on_switch(messages: list, new_provider: str):
     messages.extend(cleaned)
 
 
+def _cache_lookup(config: dict, provider: str, messages: List[dict], tools) -> tuple:
+    """Return ``(cached_response, pending)`` for one provider round.
+
+    *pending* records what ``_cache_store`` needs to remember a fresh reply.
+    The semantic layer only applies to rounds that end in a user prompt.
+    """
+    if not get_bool(config, "cache_enabled", True):
+        return None, {}
+    model = config.get("chat_model", config.get("model", ""))
+    ttl = get_int(config, "cache_ttl_seconds", response_cache.DEFAULT_TTL)
+    from .providers import _encoded_tools, resolve_config
+    key = response_cache.response_key(
+        provider,
+        model,
+        messages,
+        _encoded_tools(tools) if tools else b"",
+        resolve_config(config, provider).temperature,
+    )
+    pending: Dict[str, Any] = {"key": key}
+    hit = response_cache.get(pending["key"], ttl)
+    if hit is not None:
+        return hit, {}
+    last = messages[-1] if messages else {}
+    if (
+        get_bool(config, "semantic_cache", False)
+        and last.get("role") == "user"
+        and isinstance(last.get("content"), str)
+    ):
+        from .providers import embed_texts
+        context = _semantic_context(messages)
+        vecs = embed_texts(config, [last["content"], context] if context else [last["content"]])
+        if vecs:
+            vec, ctx_vec = vecs[0], (vecs[1] if context and len(vecs) > 1 else None)
+            hit = response_cache.semantic_get(
+                vec,
+                model,
+                get_float(config, "semantic_cache_threshold", response_cache.DEFAULT_SIMILARITY),
+                ttl,
+                ctx_vec=ctx_vec,
+                ctx_threshold=get_float(
+                    config, "semantic_context_threshold", response_cache.DEFAULT_CONTEXT_SIMILARITY
+                ),
+            )
+            if hit is not None:
+                return hit, {}
+            pending["vec"] = vec
+            pending["ctx_vec"] = ctx_vec
+            pending["model"] = model
+    return None, pending
+
+
+def _semantic_context(messages: List[dict], turns: int = 3) -> str:
+    """Return the last *turns* user/assistant exchanges before the prompt."""
+    lines: List[str] = []
+    for message in reversed(messages[:-1]):
+        if len(lines) >= turns * 2:
+            break
+        content = message.get("content")
+        if message.get("role") in ("user", "assistant") and isinstance(content, str) and content.strip():
+            lines.append(f"{message['role']}: {content[:500]}")
+    return "\n".join(reversed(lines))
+
+
+def _cache_store(pending: Dict[str, Any], response: dict) -> None:
+    if "key" in pending:
+        response_cache.put(pending["key"], response)
+    if "vec" in pending:
+        response_cache.semantic_put(
+            pending["vec"], pending["model"], response, ctx_vec=pending["ctx_vec"]
+        )
+
+
+_MAX_TOOL_WORKERS = 8
+# Streaming adapters that accept an ``on_tool_call`` callback.
+_EARLY_DISPATCH_PROVIDERS = frozenset({"anthropic", "openai", "cerebras"})
+
+
+def _parse_tool_call(tool_call: dict) -> tuple:
+    """Return ``(name, arguments)`` for one OpenAI-shaped tool call."""
+    fn = tool_call.get("function", {})
+    try:
+        arguments = fastjson.loads(fn.get("arguments") or "{}")
+    except (ValueError, TypeError):
+        arguments = {}
+    return fn.get("name", "unknown"), arguments
+
+
+def _parse_tool_calls(response: dict, tool_calls: List[dict]) -> List[tuple]:
+    """``_parse_tool_call`` for each call, reusing decoded ``_tool_args``.
+
+    Anthropic and Ollama adapters hand back the argument objects they
+    serialized into the OpenAI shape, which saves parsing them again.
+    """
+    tool_args = response.get("_tool_args")
+    if tool_args and len(tool_args) == len(tool_calls):
+        return [
+            (tool_call.get("function", {}).get("name", "unknown"), arguments if isinstance(arguments, dict) else {})
+            for tool_call, arguments in zip(tool_calls, tool_args)
+        ]
+    return [_parse_tool_call(tool_call) for tool_call in tool_calls]
+
+
+def _run_mcp_tools(
+    tool_map: Dict[str, Any],
+    calls: List[tuple],
+    started: Optional[Dict[int, Any]] = None,
+    run_local=None,
+) -> Dict[int, str]:
+    """Run MCP tool calls concurrently and return ``{index: result_text}``.
+
+    *calls* holds ``(index, name, arguments)`` tuples. Tools requested in
+    the same round are independent I/O, so the round takes as long as the
+    slowest call rather than the sum of all of them. *started* maps indexes
+    to futures for calls already launched while the reply streamed.
+
+    Built-in tools may prompt the user, so they run one at a time on this
+    thread: *run_local* is called once the MCP calls are submitted and its
+    ``{index: result_text}`` is merged into the result.
+    """
+    started = started or {}
+    if calls:
+        sys.stderr.write("".join(f"  \033[2m⚡ {name}\033[0m\n" for _, name, _ in calls))
+    if not calls:
+        return run_local() if run_local else {}
+    if len(calls) == 1 and not started and run_local is None:
+        index, name, arguments = calls[0]
+        with Spinner(f"Running {name}"):
+            return {index: mcp_mod.execute_tool(tool_map, name, arguments)}
+    workers = min(_MAX_TOOL_WORKERS, len(calls))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            started.get(index) or pool.submit(mcp_mod.execute_tool, tool_map, name, arguments): index
+            for index, name, arguments in calls
+        }
+        texts = run_local() if run_local else {}
+        with Spinner(f"Running {len(calls)} tools"):
+            for future in as_completed(futures):
+                texts[futures[future]] = future.result()
+    return texts
+
+
+def _builtin_runner(builtin_clients: Dict[str, Any], calls: List[tuple]):
+    """Return a ``run_local`` callable for *calls*, or None if there are none."""
+    if not calls:
+        return None
+
+    def run() -> Dict[int, str]:
+        texts = {}
+        for index, name, arguments in calls:
+            print(f"  \033[2m⚡ {name}\033[0m", file=sys.stderr)
+            raw_result = builtin_clients[name].call_tool(name, arguments)
+            texts[index] = raw_result.get("content", [{}])[0].get("text", "")
+        return texts
+
+    return run
+
+
+class _EarlyToolRunner:
+    """Start MCP tool calls while the model is still streaming its reply.
+
+    Streaming providers call the runner as soon as a tool call is complete,
+    so slow tools overlap with the rest of the generation. Built-in tools
+    may prompt the user and are left for chat_turn.
+    """
+
+    def __init__(self, tool_map: Dict[str, Any], builtin_clients: Dict[str, Any]):
+        self._tool_map = tool_map
+        self._builtin_clients = builtin_clients
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[str, Any] = {}
+        # Names of every call started, including ones already taken.
+        self.dispatched: List[str] = []
+
+    def __call__(self, tool_call: dict) -> None:
+        name, arguments = _parse_tool_call(tool_call)
+        call_id = tool_call.get("id")
+        if not call_id or name in self._builtin_clients or name not in self._tool_map:
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=_MAX_TOOL_WORKERS)
+        self.dispatched.append(name)
+        self._futures[call_id] = self._pool.submit(mcp_mod.execute_tool, self._tool_map, name, arguments)
+
+    def take(self, tool_calls: List[dict]) -> Dict[int, Any]:
+        """Return ``{index: future}`` for the calls in *tool_calls* already started."""
+        started = {}
+        for index, tool_call in enumerate(tool_calls):
+            future = self._futures.pop(tool_call.get("id"), None)
+            if future is not None:
+                started[index] = future
+        return started
+
+    def close(self) -> None:
+        """Wait for any calls the final reply did not include."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self._futures.clear()
+
+
 def chat_turn(
     config: dict,
     provider: str,
@@ -364,40 +808,72 @@ def chat_turn(
     max_tool_rounds: int = 10,
     chat_state=None,
     on_token=None,
+    context: str = "",
+    history_start: int = 0,
+    tool_result_chars: int = 0,
 ) -> tuple:
     """Returns (reply_text, usage_info) where usage_info is a dict with
     input_tokens, output_tokens, and model.
 
     When *on_token* is a callable, the reply is streamed token-by-token
-    through that callback instead of blocking behind a spinner.
+    through that callback instead of blocking behind a spinner.  *context*
+    (recalled memories, history summary) is sent ahead of the latest user
+    message; see with_turn_context.  Messages before *history_start*, other
+    than the system message, stay in *messages* but are not sent, and tool
+    output from earlier turns is sent cut to *tool_result_chars*; see
+    history_view.
     """
     from .providers import STREAM_FNS
 
-    total_usage = {"input_tokens": 0, "output_tokens": 0, "model": ""}
+    total_usage = {"input_tokens": 0, "output_tokens": 0, "model": "", "tool_calls": 0}
     for _ in range(max_tool_rounds):
         if provider == "anthropic":
             sanitize_anthropic_messages(messages)
         if chat_state and getattr(chat_state, "needs_tool_refresh", False):
             tools = chat_state.tools
             chat_state.needs_tool_refresh = False
-        compressed = compress_context(messages, tools, provider)
-        if len(compressed) < len(messages):
-            messages.clear()
-            messages.extend(compressed)
-        send_messages = normalize_messages_for_provider(messages, provider)
+        view = history_view(messages, history_start, tool_result_chars)
+        compressed = compress_context(view, tools, provider)
+        if len(compressed) < len(view):
+            if view is messages:
+                messages.clear()
+                messages.extend(compressed)
+            view = compressed
+        send_messages = with_turn_context(normalize_messages_for_provider(view, provider), context)
 
         stream_fn = STREAM_FNS.get(provider) if on_token else None
-        if stream_fn:
-            response = stream_fn(config, send_messages, tools if tools else None, on_token)
+        early_tools = None
+        stream_kwargs: Dict[str, Any] = {}
+        if stream_fn and provider in _EARLY_DISPATCH_PROVIDERS and get_bool(config, "early_tool_dispatch", True):
+            early_tools = _EarlyToolRunner(tool_map, builtin_clients)
+            stream_kwargs["on_tool_call"] = early_tools
+        response, cache_pending = _cache_lookup(config, provider, send_messages, tools)
+        if response is not None:
+            if on_token:
+                on_token(response.get("content", ""))
         else:
-            with Spinner("Thinking"):
-                response = raw_fn(config, send_messages, tools if tools else None)
+            if stream_fn:
+                response = stream_fn(config, send_messages, tools if tools else None, on_token, **stream_kwargs)
+            else:
+                with Spinner("Thinking"):
+                    response = raw_fn(config, send_messages, tools if tools else None)
+            _cache_store(cache_pending, response)
 
         usage = response.get("_usage", {})
         total_usage["input_tokens"] += usage.get("input_tokens", 0)
         total_usage["output_tokens"] += usage.get("output_tokens", 0)
         total_usage["model"] = response.get("_model", total_usage["model"])
         content = response.get("content", "")
+        if isinstance(content, str) and content.startswith("[API error:") and early_tools and early_tools.dispatched:
+            # The stream failed after a tool call had already started. A
+            # retry or a fallback comes back with new call ids, so the same
+            # tool would run a second time; stop here instead.
+            early_tools.close()
+            names = ", ".join(dict.fromkeys(early_tools.dispatched))
+            print(f"  \033[33m\u26a0 Not retrying: {names} already ran before the error\033[0m", file=sys.stderr)
+            if on_token:
+                on_token(content)
+            return content, total_usage
         if isinstance(content, str) and content.startswith("[API error:"):
             # Retry once on same provider with 1s backoff (transient 429/5xx)
             err_lower = content.lower()
@@ -406,7 +882,7 @@ def chat_turn(
                 print(f"  \033[33m\u26a0 Transient error, retrying in 1s...\033[0m", file=sys.stderr)
                 time.sleep(1)
                 if stream_fn:
-                    response = stream_fn(config, send_messages, tools if tools else None, on_token)
+                    response = stream_fn(config, send_messages, tools if tools else None, on_token, **stream_kwargs)
                 else:
                     with Spinner("Retrying"):
                         response = raw_fn(config, send_messages, tools if tools else None)
@@ -430,23 +906,36 @@ def chat_turn(
                     fb_config["model"] = fb_model
                     if needs_ctx_switch:
                         normalize_messages_on_switch(messages, fb_provider)
-                    fb_messages = normalize_messages_for_provider(messages, fb_provider)
-                    with Spinner(f"Retrying with {fb_provider}/{fb_model}"):
-                        response = fb_fn(fb_config, fb_messages, tools if tools else None)
+                        view = history_view(messages, history_start, tool_result_chars)
+                    fb_messages = with_turn_context(normalize_messages_for_provider(view, fb_provider), context)
+                    fb_stream = STREAM_FNS.get(fb_provider) if on_token else None
+                    if fb_stream:
+                        response = fb_stream(fb_config, fb_messages, tools if tools else None, on_token)
+                    else:
+                        with Spinner(f"Retrying with {fb_provider}/{fb_model}"):
+                            response = fb_fn(fb_config, fb_messages, tools if tools else None)
                     fb_content = response.get("content", "")
                     if not (isinstance(fb_content, str) and fb_content.startswith("[API error:")):
                         break
+                content = response.get("content", "")
+                if on_token and isinstance(content, str) and content.startswith("[API error:"):
+                    # Streams return errors instead of emitting them; show it
+                    # through the printer like any other reply.
+                    on_token(content)
         tool_calls = response.get("tool_calls")
+        started = early_tools.take(tool_calls or []) if early_tools else {}
         if not tool_calls:
             recovered = extract_textual_tool_use_blocks(response.get("content", ""))
             if not recovered:
+                if early_tools:
+                    early_tools.close()
                 return response.get("content", ""), total_usage
             tool_calls = [{
                 "id": str(block.get("id")),
                 "type": "function",
                 "function": {
                     "name": block.get("name", ""),
-                    "arguments": json.dumps(block.get("input", {})),
+                    "arguments": fastjson.dumps(block.get("input", {})).decode(),
                 },
             } for block in recovered]
             response["tool_calls"] = tool_calls
@@ -454,21 +943,20 @@ def chat_turn(
                 response["_anthropic_content"] = recovered
             response["content"] = ""
             print("  \033[2m(recovered textual tool call)\033[0m", file=sys.stderr)
+        parsed = _parse_tool_calls(response, tool_calls)
+        total_usage["tool_calls"] += len(tool_calls)
+        indexed = [(i, name, arguments) for i, (name, arguments) in enumerate(parsed)]
+        texts = _run_mcp_tools(
+            tool_map,
+            [call for call in indexed if call[1] not in builtin_clients],
+            started,
+            _builtin_runner(builtin_clients, [call for call in indexed if call[1] in builtin_clients]),
+        )
+        if early_tools:
+            early_tools.close()
         results = []
-        for tool_call in tool_calls:
-            fn = tool_call.get("function", {})
-            name = fn.get("name", "unknown")
-            try:
-                arguments = json.loads(fn.get("arguments", "{}"))
-            except (json.JSONDecodeError, TypeError):
-                arguments = {}
-            print(f"  \033[2m⚡ {name}\033[0m", file=sys.stderr)
-            if name in builtin_clients:
-                raw_result = builtin_clients[name].call_tool(name, arguments)
-                result_text = raw_result.get("content", [{}])[0].get("text", "")
-            else:
-                with Spinner(f"Running {name}"):
-                    result_text = mcp_mod.execute_tool(tool_map, name, arguments)
+        for i, tool_call in enumerate(tool_calls):
+            result_text = compact_json_text(texts[i])
             if len(result_text) > 8000:
                 result_text = result_text[:8000] + "\n... (truncated — result too large)"
             results.append({"id": tool_call.get("id", ""), "content": result_text})
@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import codecs
+import copy
+import heapq
 import json
 import os
 import subprocess
+import sys
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 MAX_GROUP_TOOLS = 200
@@ -28,48 +33,190 @@ def get_agent_mode() -> bool:
     return _agent_mode
 
 
+# (path, mtime_ns, size) of the last tool_prefs.json read, and its contents.
+_prefs_cache: Optional[Tuple[Tuple[str, int, int], dict]] = None
+
+
+def _prefs_stamp() -> Tuple[str, int, int]:
+    st = TOOL_PREFS_PATH.stat()
+    return str(TOOL_PREFS_PATH), st.st_mtime_ns, st.st_size
+
+
 def load_tool_prefs() -> dict:
+    """Return a fresh copy of the saved tool prefs; the file is only re-read when it changes."""
+    global _prefs_cache
     try:
-        return json.loads(TOOL_PREFS_PATH.read_text())
+        stamp = _prefs_stamp()
+        if _prefs_cache is None or _prefs_cache[0] != stamp:
+            _prefs_cache = (stamp, json.loads(TOOL_PREFS_PATH.read_text()))
     except (FileNotFoundError, json.JSONDecodeError, OSError):
         return {}
+    return copy.deepcopy(_prefs_cache[1])
 
 
 def save_tool_prefs(prefs: dict):
+    """Write *prefs* atomically; skipped when the file already holds exactly these prefs."""
+    global _prefs_cache
+    try:
+        if _prefs_cache is not None and _prefs_cache[1] == prefs and _prefs_cache[0] == _prefs_stamp():
+            return
+    except OSError:
+        pass
     TOOL_PREFS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    TOOL_PREFS_PATH.write_text(json.dumps(prefs, indent=2))
+    tmp = TOOL_PREFS_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(prefs, indent=2))
+    tmp.replace(TOOL_PREFS_PATH)
+    try:
+        _prefs_cache = (_prefs_stamp(), copy.deepcopy(prefs))
+    except OSError:
+        _prefs_cache = None
+
+
+# Words that suggest the user wants something done rather than discussed;
+# seeing one brings tools back after idle_tool_turns has dropped them.
+TOOL_HINT_WORDS = frozenset({
+    "run", "search", "find", "file", "files", "create", "delete", "deploy",
+    "install", "open", "send", "check", "list", "fetch", "email", "schedule",
+    "remember", "git", "commit", "disk", "weather", "scan", "apply", "exec",
+    "curl", "nmap", "connect",
+})
+
+
+def wants_tools(text: str) -> bool:
+    """True when *text* looks like a request for an action."""
+    return any(word.strip(".,!?:;\"'()").lower() in TOOL_HINT_WORDS for word in text.split())
+
+
+_SELF_GROUPED_TOOLS = frozenset({"local_shell", "manage_tools", "save_memory"})
+
+
+# Kept on idle turns so the model can still run a command or load tools.
+_CORE_TOOL_NAMES = frozenset({"local_shell", "manage_tools"})
+_core_tools_cache: Optional[Tuple[List[dict], int, List[dict]]] = None
+
+
+def core_tools(tools: List[dict]) -> List[dict]:
+    """Return the local_shell and manage_tools entries of *tools*.
+
+    The same list object comes back while *tools* is unchanged, so the
+    provider's encoded-tools cache keeps hitting.
+    """
+    global _core_tools_cache
+    cached = _core_tools_cache
+    if cached is not None and cached[0] is tools and cached[1] == len(tools):
+        return cached[2]
+    core = [tool for tool in tools if tool.get("function", {}).get("name") in _CORE_TOOL_NAMES]
+    _core_tools_cache = (tools, len(tools), core)
+    return core
 
 
 def tool_group(name: str, tool_map: dict) -> str:
-    if name in ("local_shell", "manage_tools", "save_memory"):
+    if name in _SELF_GROUPED_TOOLS:
         return name
     client = tool_map.get(name)
     client_name = getattr(client, "name", "unknown") if client else "unknown"
     if client_name == "composio" and "_" in name:
-        return name.split("_")[0].lower()
+        return name.partition("_")[0].lower()
     return client_name
 
 
+@dataclass
+class _ToolIndex:
+    """Group of every tool, computed once per tool list.
+
+    ``groups`` runs parallel to ``all_tools``.  The last filter result is
+    kept alongside, keyed by the (disabled, picked) sets that produced it.
+    """
+
+    all_tools: List[dict]
+    tool_map: dict
+    sizes: Tuple[int, int]
+    groups: List[str]
+    by_group: Dict[str, List[str]]
+    filter_key: Optional[Tuple[frozenset, frozenset]] = None
+    filtered: Optional[List[dict]] = None
+    # Lowercased word of "name description" -> positions of the tools using it.
+    search_vocab: Optional[Dict[str, List[int]]] = None
+    names: Optional[frozenset] = None
+
+
+_tool_index: Optional[_ToolIndex] = None
+
+
+def _index_tools(all_tools: List[dict], tool_map: dict) -> _ToolIndex:
+    """Return the index for *all_tools*, rebuilding it when the tools change."""
+    global _tool_index
+    index = _tool_index
+    sizes = (len(all_tools), len(tool_map))
+    if index is None or index.all_tools is not all_tools or index.tool_map is not tool_map or index.sizes != sizes:
+        groups = [tool_group(tool["function"]["name"], tool_map) for tool in all_tools]
+        by_group: Dict[str, List[str]] = {}
+        for tool, grp in zip(all_tools, groups):
+            by_group.setdefault(grp, []).append(tool["function"]["name"])
+        index = _ToolIndex(all_tools, tool_map, sizes, groups, by_group)
+        _tool_index = index
+    return index
+
+
 def group_tools(all_tools: List[dict], tool_map: dict) -> Dict[str, List[str]]:
-    groups: Dict[str, List[str]] = {}
-    for tool in all_tools:
-        name = tool["function"]["name"]
-        groups.setdefault(tool_group(name, tool_map), []).append(name)
-    return groups
+    """Map each group to its tool names.  The result is shared; don't modify it."""
+    return _index_tools(all_tools, tool_map).by_group
+
+
+def tool_names(all_tools: List[dict], tool_map: dict) -> frozenset:
+    """Return the names of *all_tools*, computed once per tool list."""
+    index = _index_tools(all_tools, tool_map)
+    if index.names is None:
+        index.names = frozenset(tool["function"]["name"] for tool in all_tools)
+    return index.names
+
+
+def search_tools(all_tools: List[dict], tool_map: dict, query: str, limit: int = 20) -> List[Tuple[int, str, str]]:
+    """Return up to *limit* ``(score, name, description)`` matches, best first.
+
+    A tool scores one point per query word found as a substring of its
+    lowercased name and description.  Query words contain no whitespace, so
+    they can only match inside a single word of that text; the words are
+    indexed once per tool list and each query scans the vocabulary instead
+    of every description.
+    """
+    index = _index_tools(all_tools, tool_map)
+    if index.search_vocab is None:
+        vocab: Dict[str, List[int]] = {}
+        for position, tool in enumerate(all_tools):
+            fn = tool["function"]
+            for word in set((fn["name"] + " " + fn.get("description", "")).lower().split()):
+                vocab.setdefault(word, []).append(position)
+        index.search_vocab = vocab
+    scores: Dict[int, int] = {}
+    for keyword in query.lower().split():
+        hits = set()
+        for word, positions in index.search_vocab.items():
+            if keyword in word:
+                hits.update(positions)
+        for position in hits:
+            scores[position] = scores.get(position, 0) + 1
+    matches = []
+    for position, score in scores.items():
+        fn = all_tools[position]["function"]
+        matches.append((score, fn["name"], fn.get("description", "")[:80]))
+    return heapq.nlargest(limit, matches)
 
 
 def apply_filter(all_tools: List[dict], tool_map: dict, prefs: dict) -> List[dict]:
-    disabled = set(prefs.get("disabled_groups", []))
-    picked = set(prefs.get("picked_tools", []))
+    disabled = frozenset(prefs.get("disabled_groups", []))
+    picked = frozenset(prefs.get("picked_tools", []))
     if not disabled:
         return all_tools
-    result = []
-    for tool in all_tools:
-        name = tool["function"]["name"]
-        grp = tool_group(name, tool_map)
-        if grp not in disabled or name in picked:
-            result.append(tool)
-    return result
+    index = _index_tools(all_tools, tool_map)
+    if index.filter_key != (disabled, picked):
+        index.filtered = [
+            tool
+            for tool, grp in zip(all_tools, index.groups)
+            if grp not in disabled or tool["function"]["name"] in picked
+        ]
+        index.filter_key = (disabled, picked)
+    return index.filtered
 
 
 def cap_tools(tools: List[dict], max_tools: int = MAX_ACTIVE_TOOLS) -> List[dict]:
@@ -239,6 +386,53 @@ SAVE_MEMORY_TOOL = {
 }
 
 
+_MAX_SHELL_OUTPUT = 15000
+# Raw bytes kept per stream; enough for _MAX_SHELL_OUTPUT characters of UTF-8.
+_MAX_SHELL_OUTPUT_BYTES = _MAX_SHELL_OUTPUT * 4
+
+
+def _drain(pipe, sink: bytearray, echo: bool) -> None:
+    """Copy *pipe* into *sink* up to the byte cap, echoing it to stderr if asked."""
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    for chunk in iter(lambda: pipe.read1(4096), b""):
+        room = _MAX_SHELL_OUTPUT_BYTES - len(sink)
+        if room > 0:
+            sink += chunk[:room]
+        if echo:
+            sys.stderr.write(decoder.decode(chunk))
+            sys.stderr.flush()
+    pipe.close()
+
+
+def _run_shell(cmd: str, timeout: int, echo: bool = False) -> Tuple[int, str, str]:
+    """Run *cmd* in a shell and return ``(returncode, stdout, stderr)``.
+
+    Output is read as it arrives, so memory stays bounded however much a
+    command prints, and *echo* shows it live.  Raises
+    ``subprocess.TimeoutExpired`` after killing the shell.
+    """
+    proc = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = bytearray(), bytearray()
+    readers = [
+        threading.Thread(target=_drain, args=(proc.stdout, out, echo), daemon=True),
+        threading.Thread(target=_drain, args=(proc.stderr, err, echo), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    try:
+        returncode = proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        # Background children may hold the pipes open; don't wait on them.
+        for reader in readers:
+            reader.join(1)
+        raise
+    for reader in readers:
+        reader.join()
+    return returncode, out.decode(errors="replace"), err.decode(errors="replace")
+
+
 class LocalShellClient:
     name = "local_shell"
 
@@ -269,21 +463,21 @@ class LocalShellClient:
             print("  \033[2m(agent mode — auto-executing)\033[0m")
 
         try:
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout)
+            returncode, stdout, stderr = _run_shell(cmd, timeout, echo=self.policy.interactive)
         except subprocess.TimeoutExpired:
             return {"content": [{"type": "text", "text": f"Command timed out after {timeout}s"}]}
         except Exception as exc:
             return {"content": [{"type": "text", "text": f"Error: {exc}"}]}
 
-        output = result.stdout or ""
-        if result.stderr:
-            output += ("\n--- stderr ---\n" + result.stderr) if output else result.stderr
+        output = stdout
+        if stderr:
+            output += ("\n--- stderr ---\n" + stderr) if output else stderr
         if not output:
-            output = f"(no output, exit code {result.returncode})"
-        elif result.returncode != 0:
-            output += f"\n(exit code {result.returncode})"
-        if len(output) > 15000:
-            output = output[:15000] + "\n... (truncated)"
+            output = f"(no output, exit code {returncode})"
+        elif returncode != 0:
+            output += f"\n(exit code {returncode})"
+        if len(output) > _MAX_SHELL_OUTPUT:
+            output = output[:_MAX_SHELL_OUTPUT] + "\n... (truncated)"
         return {"content": [{"type": "text", "text": output}]}
 
 
@@ -315,17 +509,9 @@ class ManageToolsClient:
 
         if action == "search":
             query = arguments.get("query", "").lower()
-            keywords = query.split()
-            matches = []
-            for tool in state.all_tools:
-                fn = tool["function"]
-                haystack = (fn["name"] + " " + fn.get("description", "")).lower()
-                score = sum(1 for keyword in keywords if keyword in haystack)
-                if score:
-                    matches.append((score, fn["name"], fn.get("description", "")[:80]))
-            matches.sort(reverse=True)
-            lines = [f"Found {len(matches[:20])} tools matching '{query}':"]
-            for _, tool_name, desc in matches[:20]:
+            matches = search_tools(state.all_tools, state.tool_map, query)
+            lines = [f"Found {len(matches)} tools matching '{query}':"]
+            for _, tool_name, desc in matches:
                 lines.append(f"  {tool_name} — {desc}")
             if len(lines) == 1:
                 lines.append("  No tools found.")
@@ -349,7 +535,7 @@ class ManageToolsClient:
 
         if action == "enable_tools":
             names = arguments.get("tools", [])
-            valid = {tool["function"]["name"] for tool in state.all_tools}
+            valid = tool_names(state.all_tools, state.tool_map)
             picked = set(prefs.get("picked_tools", []))
             added = []
             for tool_name in names:
@@ -462,7 +648,7 @@ class ConchConfigClient:
         return {"content": [{"type": "text", "text": msg}]}
 
     def call_tool(self, name: str, arguments: dict) -> dict:
-        from .providers import KNOWN_MODELS, MODEL_PRICING, DEFAULT_API_KEY_ENVS
+        from .providers import _MODEL_TO_PROVIDER, KNOWN_MODELS, MODEL_PRICING, DEFAULT_API_KEY_ENVS
         import os
 
         action = arguments.get("action", "get")
@@ -503,11 +689,7 @@ class ConchConfigClient:
         if action == "set_model":
             if not value:
                 return self._text("Error: provide a model name in 'value'")
-            target_provider = None
-            for prov, models in KNOWN_MODELS.items():
-                if value in models:
-                    target_provider = prov
-                    break
+            target_provider = _MODEL_TO_PROVIDER.get(value)
             if not target_provider:
                 return self._text(f"Unknown model '{value}'. Use action=list_models to see options.")
             key_env = DEFAULT_API_KEY_ENVS.get(target_provider, "")
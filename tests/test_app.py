@@ -0,0 +1,139 @@
+"""Tests for conch.app — chat loop helpers."""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from conch import app
+from conch.tooling import ToolRuntimeState
+
+
+class _FakeEditor:
+    def __init__(self, length):
+        self.length = length
+        self.calls = []
+
+    def get_current_history_length(self):
+        return self.length
+
+    def append_history_file(self, n, path):
+        self.calls.append(("append", n))
+
+    def write_history_file(self, path):
+        self.calls.append(("write", None))
+
+
+class TestSaveHistory(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "chat_history")
+
+    def test_appends_new_entries(self):
+        open(self.path, "w").close()
+        editor = _FakeEditor(12)
+        app._save_history(editor, self.path, 10)
+        self.assertEqual(editor.calls, [("append", 2)])
+        editor = _FakeEditor(10)
+        app._save_history(editor, self.path, 10)
+        self.assertEqual(editor.calls, [])
+
+    def test_rewrites_when_missing_or_full(self):
+        editor = _FakeEditor(3)
+        app._save_history(editor, self.path, 0)
+        self.assertEqual(editor.calls, [("write", None)])
+        open(self.path, "w").close()
+        editor = _FakeEditor(app._HISTORY_LENGTH)
+        app._save_history(editor, self.path, app._HISTORY_LENGTH)
+        self.assertEqual(editor.calls, [("write", None)])
+
+    def test_start_is_clamped(self):
+        open(self.path, "w").close()
+        editor = _FakeEditor(5)
+        self.assertEqual(app._save_history(editor, self.path, 40), 5)
+        self.assertEqual(editor.calls, [])
+
+    def test_saving_twice_does_not_repeat_entries(self):
+        try:
+            import readline
+        except ImportError:
+            self.skipTest("readline not available")
+        if not hasattr(readline, "append_history_file"):
+            self.skipTest("readline cannot append")
+        readline.clear_history()
+        self.addCleanup(readline.clear_history)
+        with open(self.path, "w") as fh:
+            fh.writelines(f"old {i}\n" for i in range(10))
+        readline.read_history_file(self.path)
+        start = readline.get_current_history_length()
+        readline.add_history("new 1")
+        readline.add_history("new 2")
+        start = app._save_history(readline, self.path, start)
+        app._save_history(readline, self.path, start)
+        with open(self.path) as fh:
+            lines = fh.read().splitlines()
+        self.assertEqual(len(lines), 12)
+        self.assertEqual(lines[-2:], ["new 1", "new 2"])
+
+
+class _TtyInput(io.StringIO):
+    def isatty(self):
+        return True
+
+
+class TestChatLoopHistory(unittest.TestCase):
+    def setUp(self):
+        try:
+            import readline
+        except ImportError:
+            self.skipTest("readline not available")
+        if not hasattr(readline, "append_history_file"):
+            self.skipTest("readline cannot append")
+        self.readline = readline
+        readline.clear_history()
+        self.addCleanup(readline.clear_history)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.state = tmp.name
+        self.path = os.path.join(tmp.name, "conch", "chat_history")
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as fh:
+            fh.writelines(f"old {i}\n" for i in range(100))
+
+    def test_session_appends_only_its_own_lines(self):
+        entries = iter(["one", "two", "three"])
+
+        def fake_input(prompt=""):
+            line = next(entries, None)
+            if line is None:
+                raise EOFError
+            self.readline.add_history(line)
+            return line
+
+        def raw_fn(config, messages, tools):
+            return {"content": "ok", "tool_calls": None}
+
+        config = {"provider": "openai", "chat_model": "m", "cache_enabled": "false", "max_turns": "2"}
+        with patch.dict(os.environ, {"XDG_STATE_HOME": self.state}), \
+                patch.object(app, "load_config", return_value=config), \
+                patch.dict(app.RAW_FNS, {"openai": raw_fn}), \
+                patch.object(app, "_detect_location", return_value=""), \
+                patch.object(app, "_load_runtime_tools",
+                             return_value=({}, ToolRuntimeState(all_tools=[], tool_map={}, tools=[]))), \
+                patch.object(app, "prewarm_connection"), \
+                patch.object(sys, "stdin", _TtyInput()), \
+                patch("builtins.input", fake_input), \
+                contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            app.chat_loop()
+        with open(self.path) as fh:
+            lines = fh.read().splitlines()
+        self.assertEqual(len(lines), 103)
+        self.assertEqual(lines[-3:], ["one", "two", "three"])
+
+
+if __name__ == "__main__":
+    unittest.main()
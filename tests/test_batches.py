@@ -0,0 +1,45 @@
+"""Tests for conch.batches — provider batch API result mapping."""
+
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+from conch import batches, providers
+
+
+class TestAnthropicBatch(unittest.TestCase):
+    def setUp(self):
+        providers._API_KEYS.clear()
+
+    def test_results_returned_in_input_order(self):
+        results = "\n".join(json.dumps(row) for row in [
+            {"custom_id": "req-1", "result": {"type": "errored", "error": {"type": "error", "error": {"message": "overloaded"}}}},
+            {"custom_id": "req-0", "result": {"type": "succeeded", "message": {"content": [{"type": "text", "text": "Paris"}]}}},
+        ]).encode()
+        posted = []
+
+        def fake_post(url, body, headers, timeout=60):
+            posted.append(json.loads(body))
+            return b'{"id": "msgbatch_1"}'
+
+        def fake_get(url, headers, timeout=60):
+            if url.endswith("/msgbatch_1"):
+                return b'{"processing_status": "ended", "results_url": "https://example.test/results"}'
+            return results
+
+        requests = [
+            [{"role": "system", "content": "be brief"}, {"role": "user", "content": "capital of France?"}],
+            [{"role": "user", "content": "capital of Peru?"}],
+        ]
+        with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "sk-ant"}), \
+                patch.object(batches, "_post", fake_post), patch.object(batches, "_get", fake_get):
+            replies = batches.run_anthropic_batch({}, requests, poll_seconds=0)
+        self.assertEqual(replies, ["Paris", "[API error: overloaded]"])
+        first = posted[0]["requests"][0]["params"]
+        self.assertEqual(first["system"], "be brief")
+        self.assertEqual(first["messages"], [{"role": "user", "content": "capital of France?"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Tests for conch.cache — exact-match response cache."""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from conch import cache
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._env = patch.dict(os.environ, {"XDG_CACHE_HOME": self._tmp.name})
+        self._env.start()
+        self.messages = [{"role": "user", "content": "capital of France?"}]
+
+    def tearDown(self):
+        self._env.stop()
+        self._tmp.cleanup()
+
+    def test_roundtrip(self):
+        key = cache.response_key("openai", "gpt-4o", self.messages)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {"role": "assistant", "content": "Paris", "_usage": {"input_tokens": 9}})
+        hit = cache.get(key)
+        self.assertEqual(hit["content"], "Paris")
+        self.assertNotIn("_usage", hit)
+
+    def test_key_depends_on_request(self):
+        base = cache.response_key("openai", "gpt-4o", self.messages)
+        self.assertEqual(base, cache.response_key("openai", "gpt-4o", list(self.messages)))
+        self.assertNotEqual(base, cache.response_key("openai", "gpt-4.1", self.messages))
+        tools = b'[{"function":{"name":"local_shell"}}]'
+        self.assertNotEqual(base, cache.response_key("openai", "gpt-4o", self.messages, tools))
+        described = b'[{"function":{"name":"local_shell","description":"Run a command"}}]'
+        self.assertNotEqual(
+            cache.response_key("openai", "gpt-4o", self.messages, tools),
+            cache.response_key("openai", "gpt-4o", self.messages, described),
+        )
+        self.assertNotEqual(base, cache.response_key("openai", "gpt-4o", self.messages, temperature=0.2))
+
+    def test_stale_entry_ignored(self):
+        key = cache.response_key("openai", "gpt-4o", self.messages)
+        cache.put(key, {"content": "Paris"})
+        self.assertIsNone(cache.get(key, ttl=-1))
+
+    def test_recent_entries_served_from_memory(self):
+        key = cache.response_key("openai", "gpt-4o", self.messages)
+        cache.put(key, {"content": "Paris"})
+        cache._entry_path(key).unlink()
+        hit = cache.get(key)
+        self.assertEqual(hit["content"], "Paris")
+        hit["content"] = "changed"
+        self.assertEqual(cache.get(key)["content"], "Paris")
+        self.assertIsNone(cache.get(key, ttl=-1))
+
+    def test_skips_errors_and_tool_calls(self):
+        key = cache.response_key("openai", "gpt-4o", self.messages)
+        cache.put(key, {"content": "[API error: HTTP Error 500]"})
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {"content": "checking", "tool_calls": [{"id": "1"}]})
+        self.assertIsNone(cache.get(key))
+
+
+class TestSemanticCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._env = patch.dict(os.environ, {"XDG_CACHE_HOME": self._tmp.name})
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._tmp.cleanup()
+
+    def test_near_duplicate_hits(self):
+        cache.semantic_put([1.0, 0.0, 0.1], "gpt-4o", {"content": "Paris"})
+        hit = cache.semantic_get([0.98, 0.02, 0.1], "gpt-4o")
+        self.assertEqual(hit["content"], "Paris")
+
+    def test_dissimilar_misses(self):
+        cache.semantic_put([1.0, 0.0, 0.0], "gpt-4o", {"content": "Paris"})
+        self.assertIsNone(cache.semantic_get([0.0, 1.0, 0.0], "gpt-4o"))
+
+    def test_other_model_misses(self):
+        cache.semantic_put([1.0, 0.0, 0.0], "gpt-4o", {"content": "Paris"})
+        self.assertIsNone(cache.semantic_get([1.0, 0.0, 0.0], "llama3.3"))
+
+    def test_context_must_match(self):
+        cache.semantic_put([1.0, 0.0], "gpt-4o", {"content": "red circle"}, ctx_vec=[0.0, 1.0])
+        self.assertIsNotNone(cache.semantic_get([1.0, 0.0], "gpt-4o", ctx_vec=[0.05, 1.0]))
+        self.assertIsNone(cache.semantic_get([1.0, 0.0], "gpt-4o", ctx_vec=[1.0, 0.0]))
+        self.assertIsNone(cache.semantic_get([1.0, 0.0], "gpt-4o"))
+
+    def test_vectors_stored_as_int8(self):
+        cache.semantic_put([0.6, -0.8, 0.0], "gpt-4o", {"content": "Paris"})
+        row = cache._load_semantic_rows()[-1]
+        self.assertEqual(row["vec"], [95, -127, 0])
+        self.assertAlmostEqual(cache._cosine([0.6, -0.8, 0.0], row["vec"], row["vec_scale"]), 1.0, places=2)
+
+    def test_float_rows_still_match(self):
+        path = cache._semantic_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('{"ts": %f, "model": "gpt-4o", "vec": [1.0, 0.0], "ctx": null, '
+                        '"reply": {"content": "Paris"}}\n' % time.time())
+        self.assertEqual(cache.semantic_get([1.0, 0.0], "gpt-4o")["content"], "Paris")
+
+    @unittest.skipUnless(cache._HAS_NUMPY, "numpy not installed")
+    def test_numpy_scores_match_python(self):
+        for i, vec in enumerate(([1.0, 0.2, 0.1], [0.3, 1.0, 0.0], [0.5, 0.5, 0.7], [0.1, 0.1, 1.0])):
+            cache.semantic_put(vec, "gpt-4o", {"content": f"q{i}"})
+        cache.semantic_put([1.0, 0.0], "gpt-4o", {"content": "other dim"})
+        path = cache._semantic_path()
+        with path.open("a") as fh:
+            fh.write('{"ts": %f, "model": "gpt-4o", "vec": [0.8, 0.6, 0.0], "ctx": null, '
+                     '"reply": {"content": "legacy"}}\n' % time.time())
+        cache._semantic_mtime = None  # the append may land within the same mtime tick
+        query = cache._unit([0.9, 0.4, 0.2])
+        with patch.object(cache, "_SCORE_BLOCK_ROWS", 2):
+            fast = {row["reply"]["content"]: sim for sim, row in cache._candidates(query, 0.0)}
+        with patch.object(cache, "_HAS_NUMPY", False):
+            slow = {row["reply"]["content"]: sim for sim, row in cache._candidates(query, 0.0)}
+        self.assertEqual(set(fast), set(slow))
+        self.assertIn("legacy", fast)
+        self.assertNotIn("other dim", fast)
+        for name, sim in slow.items():
+            self.assertAlmostEqual(fast[name], sim, delta=0.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+"""Tests for conch.commands — slash command dispatch."""
+
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from conch.commands import handle_slash_command
+
+
+def _run(cmd, **kwargs):
+    with redirect_stdout(io.StringIO()):
+        return handle_slash_command(cmd, {}, "openai", "gpt-4o", lambda on: None, **kwargs)
+
+
+class TestHandleSlashCommand(unittest.TestCase):
+    def test_unknown_command(self):
+        self.assertIsNone(_run("/nope"))
+
+    def test_case_insensitive_and_aliases(self):
+        self.assertEqual(_run("/CLEAR"), "clear_conversation")
+        self.assertEqual(_run("/reload"), "reload_tools")
+        self.assertEqual(_run("/rounds 5"), 5)
+        self.assertEqual(_run("/queue off"), "queue_off")
+
+    def test_commands_needing_missing_context_are_ignored(self):
+        self.assertIsNone(_run("/new"))
+        self.assertEqual(_run("/new", conv_mgr=object()), "new_conversation")
+        self.assertIsNone(_run("/switch abc"))
+        self.assertEqual(_run("/switch  abc ", conv_mgr=object()), ("switch_conversation", "abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Tests for conch.composio — auth config lookup."""
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from conch import composio
+
+
+class TestApiGet(unittest.TestCase):
+    def test_query_string_skips_empty_params(self):
+        response = MagicMock()
+        response.__enter__.return_value.read.return_value = b"{}"
+        with patch.object(composio, "urlopen", return_value=response) as urlopen:
+            composio._api_get("/api/v1/apps", {"appNames": "google calendar", "cursor": "", "limit": "5"})
+        self.assertEqual(urlopen.call_args[0][0], composio._BASE + "/api/v1/apps?appNames=google%20calendar&limit=5")
+
+
+class TestAuthConfigId(unittest.TestCase):
+    def setUp(self):
+        composio._AUTH_CONFIG_CACHE.clear()
+        self.addCleanup(composio._AUTH_CONFIG_CACHE.clear)
+
+    def test_lookup_is_cached_per_app(self):
+        with patch.object(composio, "_api_get", return_value={"items": [{"id": "ac_1"}]}) as api_get:
+            self.assertEqual(composio._auth_config_id("github"), "ac_1")
+            self.assertEqual(composio._auth_config_id("github"), "ac_1")
+        self.assertEqual(api_get.call_count, 1)
+
+    def test_failed_lookup_is_retried(self):
+        with patch.object(composio, "_api_get", return_value={"items": []}) as api_get:
+            self.assertIsNone(composio._auth_config_id("nope"))
+            self.assertIsNone(composio._auth_config_id("nope"))
+        self.assertEqual(api_get.call_count, 4)
+
+
+class TestConnect(unittest.TestCase):
+    def setUp(self):
+        composio._AUTH_CONFIG_CACHE.clear()
+        self.addCleanup(composio._AUTH_CONFIG_CACHE.clear)
+        patcher = patch.dict("os.environ", {"COMPOSIO_API_KEY": "k"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_already_connected_skips_initiation(self):
+        with patch.object(composio, "check_connection", return_value=(True, "github is connected")), \
+                patch.object(composio, "_auth_config_id", return_value="ac_1"), \
+                patch.object(composio, "_api_post") as api_post:
+            ok, msg = composio.connect("github")
+        self.assertTrue(ok)
+        self.assertIn("/reload", msg)
+        api_post.assert_not_called()
+
+    def test_connected_app_does_not_wait_for_lookup(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def slow_lookup(app_slug):
+            release.wait(5)
+            return "ac_1"
+
+        with patch.object(composio, "check_connection", return_value=(True, "github is connected")), \
+                patch.object(composio, "_auth_config_id", side_effect=slow_lookup):
+            started = time.monotonic()
+            ok, _msg = composio.connect("github")
+        self.assertTrue(ok)
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_missing_auth_config(self):
+        with patch.object(composio, "check_connection", return_value=(False, "")), \
+                patch.object(composio, "_auth_config_id", return_value=None):
+            ok, msg = composio.connect("nope")
+        self.assertFalse(ok)
+        self.assertIn("No auth config", msg)
+
+
+if __name__ == "__main__":
+    unittest.main()
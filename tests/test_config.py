@@ -0,0 +1,48 @@
+"""Tests for conch.config — file loading and value helpers."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from conch import config as config_mod
+from conch.config import get_bool, get_int, load_config
+
+
+class TestLoadConfig(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        home = Path(self._tmp.name)
+        patcher = patch.dict(os.environ, {"XDG_CONFIG_HOME": str(home / ".config"), "HOME": str(home)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.path = home / ".config" / "conch" / "config"
+        self.path.parent.mkdir(parents=True)
+
+    def test_defaults_without_files(self):
+        self.assertEqual(load_config()["provider"], "cerebras")
+
+    def test_copies_are_independent_and_edits_are_picked_up(self):
+        self.path.write_text("provider=openai\n# comment\nmodel = 'gpt-4o'\n")
+        config = load_config()
+        self.assertEqual((config["provider"], config["model"]), ("openai", "gpt-4o"))
+        config["provider"] = "ollama"
+        self.assertEqual(load_config()["provider"], "openai")
+        with patch.object(config_mod, "_parse_config_file", wraps=config_mod._parse_config_file) as parse:
+            load_config()
+            parse.assert_not_called()
+            self.path.write_text("provider=ollama\n")
+            self.assertEqual(load_config()["provider"], "ollama")
+
+
+class TestValueHelpers(unittest.TestCase):
+    def test_get_bool_and_int(self):
+        self.assertTrue(get_bool({"x": "Yes"}, "x"))
+        self.assertFalse(get_bool({}, "x"))
+        self.assertEqual(get_int({"n": "bad"}, "n", 7), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Tests for conch.daemon — warm MCP servers over a UNIX socket."""
+
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from conch import daemon
+
+
+class _FakeServer:
+    name = "fake"
+
+    def list_tools(self):
+        return [{"type": "function", "function": {"name": "echo", "parameters": {"type": "object"}}}]
+
+    def call_tool(self, name, arguments):
+        return {"content": [{"type": "text", "text": arguments["text"]}]}
+
+    def close(self):
+        pass
+
+
+class _SlowServer(_FakeServer):
+    def __init__(self):
+        self.closed = False
+
+    def call_tool(self, name, arguments):
+        time.sleep(2.5)
+        return {"content": [{"type": "text", "text": "closed" if self.closed else "open"}]}
+
+    def close(self):
+        self.closed = True
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs UNIX sockets")
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        env = patch.dict(os.environ, {"XDG_RUNTIME_DIR": tmp.name})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_no_daemon_running(self):
+        self.assertIsNone(daemon.load_tools(autostart=False))
+
+    def test_tools_and_calls_go_through_socket(self):
+        with patch("conch.daemon.mcp_mod.create_clients", return_value={"fake": _FakeServer()}):
+            server = threading.Thread(target=daemon.serve, kwargs={"idle_seconds": 1})
+            server.start()
+            try:
+                for _ in range(100):
+                    if daemon.socket_path().exists():
+                        break
+                    time.sleep(0.01)
+                tools, tool_map = daemon.load_tools(autostart=False)
+                self.assertEqual([t["function"]["name"] for t in tools], ["echo"])
+                self.assertEqual(tool_map["echo"].name, "fake")
+                result = tool_map["echo"].call_tool("echo", {"text": "hi"})
+                self.assertEqual(result["content"][0]["text"], "hi")
+            finally:
+                server.join(timeout=5)
+        self.assertFalse(server.is_alive())
+        self.assertFalse(daemon.socket_path().exists())
+
+    def test_running_call_keeps_daemon_alive(self):
+        slow = _SlowServer()
+        with patch("conch.daemon.mcp_mod.create_clients", return_value={"fake": slow}):
+            server = threading.Thread(target=daemon.serve, kwargs={"idle_seconds": 1})
+            server.start()
+            try:
+                for _ in range(100):
+                    if daemon.socket_path().exists():
+                        break
+                    time.sleep(0.01)
+                _tools, tool_map = daemon.load_tools(autostart=False)
+                result = tool_map["echo"].call_tool("echo", {"text": "hi"})
+                self.assertEqual(result["content"][0]["text"], "open")
+                self.assertTrue(server.is_alive())
+            finally:
+                server.join(timeout=5)
+        self.assertFalse(server.is_alive())
+        self.assertTrue(slow.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
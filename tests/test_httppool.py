@@ -0,0 +1,131 @@
+"""Tests for conch.httppool — keep-alive connection reuse and error mapping."""
+
+import http.server
+import socket
+import struct
+import threading
+import time
+import unittest
+import urllib.error
+
+from conch import httppool
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+    resets = 0
+
+    def do_POST(self):
+        _Handler.connections.add(self.client_address)
+        _Handler.last_headers = self.headers
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.path == "/reset":
+            # Accept the request, then abort the connection with an RST.
+            _Handler.resets += 1
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            self.connection.close()
+            self.close_connection = True
+            return
+        status = 429 if self.path == "/limited" else 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.server.daemon_threads = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = "http://127.0.0.1:%d" % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _Handler.connections.clear()
+
+    def test_echoes_body(self):
+        with httppool.urlopen(self.base + "/echo", b'{"a":1}', {}) as resp:
+            self.assertEqual(resp.status, 200)
+            self.assertEqual(resp.read(), b'{"a":1}')
+
+    def test_reuses_connection(self):
+        for _ in range(3):
+            with httppool.urlopen(self.base + "/echo", b"{}", {}) as resp:
+                resp.read()
+        self.assertEqual(len(_Handler.connections), 1)
+
+    def test_reset_after_request_is_not_resent(self):
+        with httppool.urlopen(self.base + "/echo", b"{}", {}) as resp:
+            resp.read()
+        _Handler.resets = 0
+        with self.assertRaises(ConnectionResetError):
+            httppool.urlopen(self.base + "/reset", b"{}", {})
+        self.assertEqual(_Handler.resets, 1)
+
+    def test_http_error_raised(self):
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            httppool.urlopen(self.base + "/limited", b"{}", {})
+        self.assertIn("429", str(ctx.exception))
+
+    def test_line_iteration(self):
+        with httppool.urlopen(self.base + "/echo", b"one\ntwo\n", {}) as resp:
+            self.assertEqual(list(resp), [b"one\n", b"two\n"])
+
+    def test_small_post_headers(self):
+        with httppool.urlopen(self.base + "/echo", b"{}", {"Expect": "100-continue"}) as resp:
+            resp.read()
+        self.assertEqual(_Handler.last_headers["Content-Length"], "2")
+        self.assertIsNone(_Handler.last_headers["Expect"])
+        conn = httppool._pool[("http", "127.0.0.1", self.server.server_address[1])][-1]
+        self.assertTrue(conn.sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+
+    def test_expired_idle_connection_not_reused(self):
+        key = ("http", "127.0.0.1", self.server.server_address[1])
+        with httppool.urlopen(self.base + "/echo", b"x", {}) as resp:
+            resp.read()
+        idle = httppool._pool[key][-1]
+        _, reused = httppool._checkout(key, timeout=5)
+        self.assertTrue(reused)
+        httppool._checkin(key, idle)
+        httppool._idle_since[idle] -= httppool._IDLE_EXPIRY + 1
+        conn, reused = httppool._checkout(key, timeout=5)
+        self.assertFalse(reused)
+        self.assertIsNot(conn, idle)
+        self.assertIsNone(idle.sock)
+        conn.close()
+
+    def test_prewarm_opens_reusable_connection(self):
+        key = ("http", "127.0.0.1", self.server.server_address[1])
+        for conn in httppool._pool.pop(key, []):
+            conn.close()
+        httppool.prewarm(self.base + "/echo")
+        for _ in range(200):
+            if httppool._pool.get(key):
+                break
+            time.sleep(0.01)
+        conn, reused = httppool._checkout(key, timeout=5)
+        self.assertTrue(reused)
+        conn.close()
+
+    def test_read_timeout_applied_after_connect(self):
+        key = ("http", "127.0.0.1", self.server.server_address[1])
+        conn = httppool._new_connection(key, timeout=90, connect_timeout=2)
+        self.assertEqual(conn.sock.gettimeout(), 90)
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
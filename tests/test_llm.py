@@ -0,0 +1,67 @@
+"""Tests for conch.llm — command extraction and tool detection."""
+
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from conch import llm
+
+
+class TestExtractCommand(unittest.TestCase):
+    def test_fenced_blocks(self):
+        self.assertEqual(llm.extract_command("Run:\n```bash\n$ ls -la\n```"), "ls -la")
+        self.assertEqual(llm.extract_command("```\ndf -h\n```", "openai"), "df -h")
+
+    def test_provider_strategies(self):
+        self.assertEqual(llm.extract_command("Here is the command:\n$ git status", "anthropic"), "git status")
+        self.assertEqual(llm.extract_command("I would use `docker ps -a` here.", "cerebras"), "docker ps -a")
+
+
+class TestDetectTools(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.bin = Path(self._tmp.name)
+        patcher = patch.dict(os.environ, {"PATH": str(self.bin)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        llm._detected_tools_cache = None
+        self.addCleanup(setattr, llm, "_detected_tools_cache", None)
+
+    def _install(self, name, mode=0o755):
+        path = self.bin / name
+        path.write_text("#!/bin/sh\n")
+        path.chmod(mode)
+        os.utime(self.bin, ns=(0, self.bin.stat().st_mtime_ns + 1_000_000))
+
+    def test_detects_executables_and_refreshes_on_install(self):
+        self.assertEqual(llm._detect_tools(), "")
+        self._install("git")
+        self._install("nmap", mode=stat.S_IRUSR)
+        text = llm._detect_tools()
+        self.assertTrue(text.startswith("Available tools: git\n"))
+        self.assertIn("nmap", text.split("\n")[1])
+        with patch("shutil.which") as which:
+            self.assertEqual(llm._detect_tools(), text)
+        which.assert_not_called()
+
+    def test_windows_names_drop_pathext(self):
+        with patch.dict(os.environ, {"PATHEXT": ".COM;.EXE;.BAT;.CMD"}):
+            names = llm._strip_pathext(["git.exe", "Docker.EXE", "kubectl.cmd", "nmap.dll", "README"])
+        self.assertEqual(names, {"git", "docker", "kubectl"})
+
+    def test_inventory_can_be_turned_off(self):
+        self._install("git")
+        _, with_tools = llm.build_messages({"provider": "openai"}, "hi", {})
+        self.assertIn("Available tools: git", with_tools)
+        with patch.object(llm, "_detect_tools") as detect:
+            _, without = llm.build_messages({"provider": "openai", "send_tool_inventory": "false"}, "hi", {})
+        detect.assert_not_called()
+        self.assertNotIn("Available tools", without)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Tests for conch.mcp — tool collection."""
+
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+from conch import mcp
+from conch.mcp import StdioMcpClient, collect_tools, load_cached_tool_map, save_tool_cache
+
+
+class _FakeClient:
+    def __init__(self, name, tool_names, delay=0.0):
+        self.name = name
+        self._tool_names = tool_names
+        self._delay = delay
+
+    def list_tools(self):
+        time.sleep(self._delay)
+        return [{"type": "function", "function": {"name": n}} for n in self._tool_names]
+
+
+class TestCollectTools(unittest.TestCase):
+    def test_order_follows_configuration(self):
+        clients = {
+            "slow": _FakeClient("slow", ["b_tool", "a_tool"], delay=0.05),
+            "fast": _FakeClient("fast", ["c_tool"]),
+        }
+        tools, tool_map = collect_tools(clients)
+        self.assertEqual([t["function"]["name"] for t in tools], ["b_tool", "a_tool", "c_tool"])
+        self.assertIs(tool_map["c_tool"], clients["fast"])
+
+
+class TestToolCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.config_path = Path(self._tmp.name) / "mcp.json"
+        for name, value in (
+            ("_STATE_DIR", Path(self._tmp.name)),
+            ("_TOOL_CACHE_PATH", Path(self._tmp.name) / "tool_cache.json"),
+            ("CONFIG_PATH", self.config_path),
+        ):
+            patcher = patch.object(mcp, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_tool_map_rebuilt_from_server_names(self):
+        clients = {"gh": _FakeClient("gh", ["gh_issue"]), "fs": _FakeClient("fs", ["read_file"])}
+        tools, tool_map = collect_tools(clients)
+        save_tool_cache(tools, tool_map)
+        fresh = {"gh": _FakeClient("gh", []), "fs": _FakeClient("fs", [])}
+        cached_map = load_cached_tool_map(fresh)
+        self.assertIs(cached_map["read_file"], fresh["fs"])
+        self.assertEqual(set(cached_map), {"gh_issue", "read_file"})
+        self.assertIsNone(load_cached_tool_map({"gh": fresh["gh"]}))
+        save_tool_cache(tools)
+        self.assertIsNone(load_cached_tool_map(fresh))
+
+    def test_config_edit_invalidates_cache(self):
+        self.config_path.write_text('{"mcpServers": {}}')
+        save_tool_cache([{"type": "function", "function": {"name": "t"}}])
+        self.assertEqual(len(mcp.load_cached_tools()), 1)
+        self.config_path.write_text('{"mcpServers": {"gh": {"command": "gh-mcp"}}}')
+        self.assertIsNone(mcp.load_cached_tools())
+
+
+# Reads two requests, then answers them in reverse order after a notification.
+_REVERSING_SERVER = """
+import json, sys
+first = json.loads(sys.stdin.readline())
+second = json.loads(sys.stdin.readline())
+print(json.dumps({"jsonrpc": "2.0", "method": "notifications/progress"}), flush=True)
+for req in (second, first):
+    text = req["params"]["arguments"]["text"]
+    print(json.dumps({"jsonrpc": "2.0", "id": req["id"], "result": {"content": [{"type": "text", "text": text}]}}), flush=True)
+"""
+
+
+# Answers each request with a notification and then a reply too large for
+# the pipe buffer, without reading further requests until both are written.
+_LARGE_REPLY_SERVER = """
+import json, sys
+for line in sys.stdin:
+    req = json.loads(line)
+    print(json.dumps({"jsonrpc": "2.0", "method": "notifications/progress"}), flush=True)
+    text = str(len(req["params"]["arguments"]["text"])) + " " + "x" * 300000
+    print(json.dumps({"jsonrpc": "2.0", "id": req["id"], "result": {"content": [{"type": "text", "text": text}]}}), flush=True)
+"""
+
+
+class TestStdioClient(unittest.TestCase):
+    def test_concurrent_calls_get_their_own_replies(self):
+        client = StdioMcpClient("rev", sys.executable, ["-c", _REVERSING_SERVER])
+        self.addCleanup(client.close)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(client.call_tool, "echo", {"text": t}) for t in ("one", "two")]
+            texts = [f.result(timeout=10)["content"][0]["text"] for f in futures]
+        self.assertEqual(texts, ["one", "two"])
+        client._proc.wait(timeout=10)
+        self.assertRegex(client.call_tool("echo", {"text": "x"})["content"][0]["text"], "closed connection|failed to send")
+
+    def test_server_stderr_does_not_block_replies(self):
+        noisy = "import sys\nsys.stderr.write('x' * 200000)\nsys.stderr.flush()\n" + _REVERSING_SERVER
+        client = StdioMcpClient("noisy", sys.executable, ["-c", noisy])
+        self.addCleanup(client.close)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(client.call_tool, "echo", {"text": t}) for t in ("a", "b")]
+            self.assertEqual([f.result(timeout=10)["content"][0]["text"] for f in futures], ["a", "b"])
+
+    def test_large_requests_and_replies_do_not_deadlock(self):
+        pool = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(pool.shutdown, wait=False)
+        client = StdioMcpClient("large", sys.executable, ["-c", _LARGE_REPLY_SERVER])
+        # Runs first, so a deadlocked test fails instead of hanging.
+        self.addCleanup(client.close)
+        futures = [pool.submit(client.call_tool, "echo", {"text": "y" * (1000000 + n)}) for n in range(4)]
+        texts = [f.result(timeout=20)["content"][0]["text"].split()[0] for f in futures]
+        self.assertEqual(texts, [str(1000000 + n) for n in range(4)])
+
+    def test_lazy_client_spawns_on_first_request(self):
+        client = StdioMcpClient("missing", "/nonexistent/mcp-server", lazy=True)
+        client.close()
+        result = client.call_tool("anything", {})
+        self.assertIn("failed to start MCP server", result["content"][0]["text"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Tests for conch.memory — recall."""
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from conch.memory import MemoryStore
+
+
+class TestMemoryStore(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        patcher = patch.dict(os.environ, {"XDG_STATE_HOME": self._tmp.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+        self.store = MemoryStore()
+
+    def test_build_context_tracks_changes(self):
+        self.assertEqual(self.store.build_context("coffee order"), "")
+        entry = self.store.add("Usual coffee order is a flat white")
+        context = self.store.build_context("coffee order")
+        self.assertIn("flat white", context)
+        self.assertIs(self.store.build_context("coffee order"), context)
+        self.store.forget(int(entry["id"]))
+        self.assertEqual(self.store.build_context("coffee order"), "")
+
+    def test_entries_survive_reload(self):
+        self.store.add("Prefers tabs over spaces \u2713")
+        second = self.store.add("second")
+        self.assertFalse(self.store.forget(999))
+        self.store.forget(int(second["id"]))
+        self.assertEqual([e["content"] for e in MemoryStore().get_all()], ["Prefers tabs over spaces \u2713"])
+
+    def test_file_is_read_on_first_use(self):
+        self.store.add("first")
+        loads = []
+        real_load = MemoryStore._load
+
+        def counting_load(store):
+            loads.append(store)
+            return real_load(store)
+
+        with patch.object(MemoryStore, "_load", counting_load):
+            store = MemoryStore()
+            self.assertEqual(loads, [])
+            store.add("second")
+            self.assertEqual([e["id"] for e in store.get_all()], [1, 2])
+        self.assertEqual(loads, [store])
+
+    def test_ids_are_not_reused_after_forget(self):
+        self.store.add("one")
+        two = self.store.add("two")
+        self.store.forget(int(two["id"]))
+        self.assertEqual(self.store.add("three")["id"], 3)
+
+    def test_add_during_build_is_not_hidden_by_cache(self):
+        self.store.add("deploy with docker")
+        real_build = self.store._build_context
+        adders = []
+
+        def build_while_adding(query, limit):
+            built = real_build(query, limit)
+            adder = threading.Thread(target=self.store.add, args=("deploy with helm",))
+            adder.start()
+            adder.join(0.2)
+            adders.append(adder)
+            return built
+
+        with patch.object(self.store, "_build_context", build_while_adding):
+            self.store.build_context("deploy")
+        adders[0].join()
+        self.assertIn("helm", self.store.build_context("deploy"))
+
+    def test_forget_drops_cached_tokens(self):
+        entry = self.store.add("unique words here")
+        self.store.build_context("unique")
+        self.store.forget(int(entry["id"]))
+        self.assertNotIn("unique words here", self.store._entry_tokens)
+
+    def test_ranking_by_shared_tokens(self):
+        self.store.add("deploy the api with docker")
+        self.store.add("api keys live in the vault")
+        self.store.add("lunch was good")
+        self.store.build_context("warm")
+        self.store.add("docker api deploy script is deploy.sh")
+        lines = self.store.build_context("deploy api docker").splitlines()
+        self.assertEqual(lines[1:], [
+            "- deploy the api with docker",
+            "- docker api deploy script is deploy.sh",
+            "- api keys live in the vault",
+        ])
+        self.store.forget(1)
+        self.assertNotIn("with docker", self.store.build_context("deploy api docker"))
+
+
+if __name__ == "__main__":
+    unittest.main()
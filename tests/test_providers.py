@@ -0,0 +1,154 @@
+"""Tests for conch.providers — request body encoding and config resolution."""
+
+import json
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from conch import providers
+from conch.providers import _encode_body, _iter_sse, resolve_config
+
+
+class TestEncodeBody(unittest.TestCase):
+    def assertRoundTrips(self, body):
+        self.assertEqual(json.loads(_encode_body(body)), body)
+
+    def test_openai_style_system_message(self):
+        self.assertRoundTrips({
+            "model": "gpt-4o",
+            "messages": [
+                {"role": "system", "content": "You are helpful. ✓ \"quoted\""},
+                {"role": "user", "content": "hi"},
+            ],
+            "temperature": 0.7,
+        })
+
+    def test_system_only(self):
+        self.assertRoundTrips({"model": "m", "messages": [{"role": "system", "content": "s"}]})
+
+    def test_anthropic_style_system_field(self):
+        self.assertRoundTrips({
+            "model": "claude-sonnet-4-6",
+            "system": "Be brief.",
+            "messages": [{"role": "user", "content": [{"type": "text", "text": "hi"}]}],
+        })
+
+    def test_no_system(self):
+        self.assertRoundTrips({"model": "m", "messages": [{"role": "user", "content": "hi"}]})
+        self.assertRoundTrips({"model": "m", "messages": []})
+
+    def test_anthropic_system_cache_control(self):
+        body = {"model": "m", "system": "Be brief.", "messages": []}
+        system = json.loads(_encode_body(body, cache_system=True))["system"]
+        self.assertEqual(system, [{"type": "text", "text": "Be brief.", "cache_control": {"type": "ephemeral"}}])
+        body["system"] = ""
+        self.assertNotIn("system", json.loads(_encode_body(body, cache_system=True)))
+
+    def test_cached_system_reused(self):
+        body = {"model": "m", "messages": [{"role": "system", "content": "s"}, {"role": "user", "content": "a"}]}
+        first = _encode_body(body)
+        body["messages"].append({"role": "assistant", "content": "b"})
+        self.assertEqual(json.loads(_encode_body(body))["messages"][2]["content"], "b")
+        self.assertTrue(first.startswith(b'{"model":"m"'))
+
+    def test_tools_encoded_once_per_list(self):
+        tools = [{"type": "function", "function": {"name": "search", "parameters": {"type": "object"}}}]
+        body = {"model": "m", "tools": tools, "messages": []}
+        self.assertRoundTrips(body)
+        anthropic = json.loads(_encode_body(body, anthropic_tools=True))["tools"]
+        self.assertEqual(anthropic, [{"name": "search", "description": "", "input_schema": {"type": "object"}}])
+        self.assertIs(providers._encoded_tools(tools), providers._encoded_tools(tools))
+        tools.append({"type": "function", "function": {"name": "fetch"}})
+        self.assertEqual(len(json.loads(_encode_body(body))["tools"]), 2)
+
+
+class TestResolveConfig(unittest.TestCase):
+    def setUp(self):
+        providers._API_KEYS.clear()
+
+    def test_defaults_and_overrides(self):
+        with patch.dict(os.environ, {"CEREBRAS_API_KEY": " sk-1 \n"}, clear=True):
+            cfg = resolve_config({"model": "m"}, "cerebras")
+        self.assertEqual(cfg.model, "m")
+        self.assertEqual(cfg.api_key, "sk-1")
+        self.assertEqual(cfg.base_url, "https://api.cerebras.ai/v1")
+        self.assertEqual(cfg.temperature, 0.7)
+        self.assertEqual(resolve_config({"temperature": "0.2"}, "openai").temperature, 0.2)
+
+    def test_base_url_only_for_configurable_endpoints(self):
+        config = {"base_url": "http://gpu:11434/", "chat_model": "qwen3"}
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(resolve_config(config, "ollama").base_url, "http://gpu:11434")
+            self.assertEqual(resolve_config(config, "openai").base_url, "https://api.openai.com/v1")
+            self.assertEqual(resolve_config(config, "ollama").model, "qwen3")
+
+    def test_prewarm_needs_key_and_runs_once_per_endpoint(self):
+        with patch.dict(os.environ, {}, clear=True), patch.object(providers, "_prewarm") as dial:
+            self.assertEqual(providers.prewarm_connection({}, "openai"), "")
+            dial.assert_not_called()
+            os.environ["OPENAI_API_KEY"] = "sk-3"
+            done = providers.prewarm_connection({}, "openai")
+            done = providers.prewarm_connection({}, "openai", done)
+            self.assertEqual(dial.call_count, 1)
+            done = providers.prewarm_connection({}, "ollama", done)
+            providers.prewarm_connection({}, "openai", done)
+        self.assertEqual(
+            [c.args[0] for c in dial.call_args_list],
+            ["https://api.openai.com/v1", "http://localhost:11434", "https://api.openai.com/v1"],
+        )
+
+    def test_api_key_remembered_once_set(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(providers.api_key_for("OPENAI_API_KEY"), "")
+            os.environ["OPENAI_API_KEY"] = "sk-2"
+            self.assertEqual(providers.api_key_for("OPENAI_API_KEY"), "sk-2")
+            del os.environ["OPENAI_API_KEY"]
+            self.assertEqual(providers.api_key_for("OPENAI_API_KEY"), "sk-2")
+
+
+class TestIterSse(unittest.TestCase):
+    def test_parses_data_lines_until_done(self):
+        lines = [
+            b": keep-alive\n",
+            b"event: content_block_delta\n",
+            b'data: {"delta": "hi"}\n',
+            b"\n",
+            b'data:{"delta": "\xe2\x9c\x93"}\r\n',
+            b"data: not json\n",
+            b"data: [DONE]\n",
+            b'data: {"delta": "late"}\n',
+        ]
+        self.assertEqual(list(_iter_sse(iter(lines))), [{"delta": "hi"}, {"delta": "\u2713"}])
+
+
+class TestStreamOpenaiCompat(unittest.TestCase):
+    def test_tool_calls_dispatched_as_they_complete(self):
+        lines = [
+            b'data: {"choices": [{"delta": {"tool_calls": [{"index": 0, "id": "a", "function": {"name": "one", "arguments": "{\\"x\\""}}]}}]}\n',
+            b'data: {"choices": [{"delta": {"tool_calls": [{"index": 0, "function": {"arguments": ": 1}"}}]}}]}\n',
+            b'data: {"choices": [{"delta": {"tool_calls": [{"index": 1, "id": "b", "function": {"name": "two", "arguments": "{}"}}]}}]}\n',
+            b'data: {"choices": [{"delta": {}, "finish_reason": "tool_calls"}]}\n',
+            b"data: [DONE]\n",
+        ]
+        seen = []
+
+        def on_tool_call(tool_call):
+            seen.append((tool_call["id"], tool_call["function"]["arguments"], len(seen_lines)))
+
+        seen_lines = []
+
+        def feed():
+            for line in lines:
+                seen_lines.append(line)
+                yield line
+
+        response = MagicMock()
+        response.__enter__.return_value = feed()
+        with patch.object(providers, "_urlopen", return_value=response):
+            result = providers._stream_openai_compat("u", {}, {}, "m", "openai", None, on_tool_call)
+        self.assertEqual(seen, [("a", '{"x": 1}', 3), ("b", "{}", 4)])
+        self.assertEqual([tc["id"] for tc in result["tool_calls"]], ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
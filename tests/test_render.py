@@ -2,10 +2,11 @@
 
 import io
 import sys
+import time
 import unittest
 from unittest.mock import patch
 
-from conch.render import StreamPrinter, highlight, _format_line, _highlight_code
+from conch.render import Spinner, StreamPrinter, highlight, _format_line, _highlight_code
 
 
 class TestFormatLine(unittest.TestCase):
@@ -137,5 +138,24 @@ class TestStreamPrinter(unittest.TestCase):
         self.assertEqual(p._partial_written, 0)
 
 
+class _TtyBuffer(io.StringIO):
+    def isatty(self):
+        return True
+
+
+class TestSpinner(unittest.TestCase):
+    def test_frames_and_clear_cover_label(self):
+        buf = _TtyBuffer()
+        label = "Running a long descriptive tool name"
+        with patch.object(sys, "stderr", buf):
+            with Spinner(label):
+                time.sleep(0.2)
+        output = buf.getvalue()
+        self.assertTrue(output.startswith("\r\033[36m\u280b\033[0m \033[2m" + label))
+        self.assertEqual(output.count(label), 1)
+        self.assertIn("\r\033[36m\u2819\033[0m\r", output)
+        self.assertTrue(output.endswith("\r" + " " * (len(label) + 4) + "\r"))
+
+
 if __name__ == "__main__":
     unittest.main()
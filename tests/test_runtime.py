@@ -1,15 +1,33 @@
 """Tests for conch.runtime — message normalization and context compression."""
 
+import contextlib
+import io
+import os
+import tempfile
+import threading
 import unittest
+from unittest.mock import MagicMock, patch
 
 from conch.runtime import (
+    HistorySummarizer,
+    _EarlyToolRunner,
+    _cache_lookup,
+    _parse_tool_calls,
+    _run_mcp_tools,
+    chat_turn,
+    compact_json_text,
     compress_context,
     estimate_tokens,
     normalize_messages_for_provider,
     normalize_messages_on_switch,
     sanitize_anthropic_messages,
     extract_textual_tool_use_blocks,
+    history_view,
+    trim_tool_results,
+    window_start,
+    with_turn_context,
 )
+from conch.conversations import ConversationManager
 
 
 class TestEstimateTokens(unittest.TestCase):
@@ -163,5 +181,303 @@ class TestExtractTextualToolUse(unittest.TestCase):
         self.assertIsNone(extract_textual_tool_use_blocks(None))
 
 
+
+class TestWindowMessages(unittest.TestCase):
+    def _history(self, turns):
+        msgs = [{"role": "system", "content": "sys"}]
+        for i in range(turns):
+            msgs.append({"role": "user", "content": f"q{i}"})
+            msgs.append({"role": "assistant", "content": None, "tool_calls": [{"id": f"t{i}"}]})
+            msgs.append({"role": "tool", "tool_call_id": f"t{i}", "content": "r"})
+            msgs.append({"role": "assistant", "content": f"a{i}"})
+        return msgs
+
+    def test_keeps_recent_turns(self):
+        msgs = self._history(5)
+        view = history_view(msgs, window_start(msgs, 2))
+        self.assertEqual(view[0]["content"], "sys")
+        self.assertEqual(view[1]["content"], "q3")
+        self.assertEqual(len(view), 9)
+        self.assertEqual(len(msgs), 21)
+
+    def test_noop_under_limit(self):
+        msgs = self._history(2)
+        self.assertEqual(window_start(msgs, 5), 1)
+        self.assertIs(history_view(msgs, 1), msgs)
+
+    def test_zero_disables(self):
+        msgs = self._history(3)
+        self.assertEqual(window_start(msgs, 0), 1)
+
+    def test_saved_conversation_keeps_every_turn(self):
+        sent = []
+
+        def raw_fn(config, messages, tools):
+            sent.append([m["content"] for m in messages if m["role"] == "user"])
+            return {"content": "a", "tool_calls": None}
+
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {"XDG_STATE_HOME": tmp}):
+            manager = ConversationManager()
+            conv = manager.create(model="m", provider="openai")
+            conv.messages = messages = [{"role": "system", "content": "sys"}]
+            for i in range(25):
+                messages.append({"role": "user", "content": f"q{i}"})
+                reply, _usage = chat_turn(
+                    {"cache_enabled": "false"}, "openai", raw_fn, messages, None, {}, {},
+                    history_start=window_start(messages, 20),
+                )
+                messages.append({"role": "assistant", "content": reply})
+                manager.save(conv)
+            loaded = manager.load(conv.id)
+        self.assertEqual(sent[-1][0], "q5")
+        self.assertEqual(len(sent[-1]), 20)
+        self.assertEqual(len(loaded.messages), 51)
+        self.assertEqual(loaded.messages[1]["content"], "q0")
+
+
+class TestTrimToolResults(unittest.TestCase):
+    def test_trims_both_shapes(self):
+        long = "a" * 50 + "b" * 5000 + "z" * 50
+        msgs = [
+            {"role": "tool", "tool_call_id": "t1", "content": long},
+            {"role": "user", "content": [{"type": "tool_result", "tool_use_id": "t2", "content": long}]},
+            {"role": "user", "content": "short"},
+        ]
+        trimmed = trim_tool_results(msgs, 400)
+        for text in (trimmed[0]["content"], trimmed[1]["content"][0]["content"]):
+            self.assertLess(len(text), 450)
+            self.assertTrue(text.startswith("a" * 50))
+            self.assertTrue(text.endswith("z" * 50))
+        self.assertIs(trimmed[2], msgs[2])
+        self.assertEqual(msgs[0]["content"], long)
+        self.assertEqual(msgs[1]["content"][0]["content"], long)
+
+    def test_view_trims_answered_turns_only(self):
+        long = "x" * 5000
+        msgs = [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": "q0"},
+            {"role": "tool", "tool_call_id": "t0", "content": long},
+            {"role": "user", "content": "q1"},
+            {"role": "tool", "tool_call_id": "t1", "content": long},
+        ]
+        view = history_view(msgs, 0, 400)
+        self.assertLess(len(view[2]["content"]), 450)
+        self.assertEqual(view[4]["content"], long)
+        self.assertEqual(msgs[2]["content"], long)
+
+
+class TestWithTurnContext(unittest.TestCase):
+    def test_prefixes_latest_user_text_on_a_copy(self):
+        msgs = [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": "first"},
+            {"role": "assistant", "content": "ok"},
+            {"role": "user", "content": "second"},
+            {"role": "user", "content": [{"type": "tool_result", "tool_use_id": "t", "content": "r"}]},
+        ]
+        sent = with_turn_context(msgs, "remembered")
+        self.assertEqual(sent[3]["content"], "remembered\n\nsecond")
+        self.assertEqual(msgs[3]["content"], "second")
+        self.assertIs(sent[0], msgs[0])
+        self.assertIs(with_turn_context(msgs, ""), msgs)
+
+
+class TestParseToolCalls(unittest.TestCase):
+    def test_prefers_decoded_arguments(self):
+        calls = [{"id": "1", "function": {"name": "search", "arguments": '{"q": "stale"}'}}]
+        self.assertEqual(_parse_tool_calls({"_tool_args": [{"q": "fresh"}]}, calls), [("search", {"q": "fresh"})])
+
+    def test_falls_back_to_json(self):
+        calls = [
+            {"id": "1", "function": {"name": "search", "arguments": '{"q": "x"}'}},
+            {"id": "2", "function": {"name": "fetch", "arguments": "not json"}},
+        ]
+        self.assertEqual(_parse_tool_calls({}, calls), [("search", {"q": "x"}), ("fetch", {})])
+
+
+class TestCompactJsonText(unittest.TestCase):
+    def test_pretty_json_is_compacted(self):
+        self.assertEqual(compact_json_text('{\n  "a": [1, 2],\n  "b": "\u00e9"\n}'), '{"a":[1,2],"b":"\u00e9"}')
+
+    def test_other_text_unchanged(self):
+        for text in ("plain output", '{"a":1}', "{not: json}"):
+            self.assertEqual(compact_json_text(text), text)
+
+
+class TestCacheLookup(unittest.TestCase):
+    def test_key_follows_tool_schemas_and_temperature(self):
+        messages = [{"role": "user", "content": "hi"}]
+        tools = [{"type": "function", "function": {"name": "fetch", "description": "Fetch a URL"}}]
+        edited = [{"type": "function", "function": {"name": "fetch", "description": "Fetch a page"}}]
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {"XDG_CACHE_HOME": tmp}):
+            keys = [
+                _cache_lookup({}, "openai", messages, tools)[1]["key"],
+                _cache_lookup({}, "openai", messages, edited)[1]["key"],
+                _cache_lookup({"temperature": "0.2"}, "openai", messages, tools)[1]["key"],
+            ]
+        self.assertEqual(len(set(keys)), 3)
+
+
+class TestHistorySummarizer(unittest.TestCase):
+    def test_summary_follows_conversation(self):
+        seen = []
+
+        def raw_fn(config, messages, tools):
+            seen.append(messages[-1]["content"])
+            return {"content": f"- point {len(seen)}"}
+
+        history = HistorySummarizer()
+        history.add("c1", [{"role": "user", "content": "q0"}, {"role": "assistant", "content": "a0"}], {}, raw_fn)
+        history.join()
+        self.assertIn("point 1", history.current("c1"))
+        self.assertIn("user: q0", seen[0])
+        history.add("c1", [{"role": "user", "content": "q1"}], {}, raw_fn)
+        history.join()
+        self.assertIn("point 1", seen[1])
+        self.assertIn("point 2", history.current("c1"))
+        self.assertEqual(history.current("c2"), "")
+
+    def test_advance_hands_each_turn_over_once(self):
+        seen = []
+
+        def raw_fn(config, messages, tools):
+            seen.append(messages[-1]["content"])
+            return {"content": "- point"}
+
+        msgs = [{"role": "system", "content": "sys"}]
+        for i in range(4):
+            msgs += [{"role": "user", "content": f"q{i}"}, {"role": "assistant", "content": f"a{i}"}]
+        history = HistorySummarizer()
+        self.assertEqual(history.advance("c1", msgs, 5, {}, raw_fn), 5)
+        history.join()
+        self.assertEqual(history.advance("c1", msgs, 3, {}, raw_fn), 5)
+        history.join()
+        self.assertEqual(len(seen), 1)
+        self.assertIn("user: q1", seen[0])
+        self.assertNotIn("q2", seen[0])
+
+
+class TestChatTurnStreaming(unittest.TestCase):
+    def test_fallback_reply_is_streamed(self):
+        def failing(config, messages, tools, on_token=None, **kwargs):
+            return {"content": "[API error: boom]", "tool_calls": None}
+
+        def fallback(config, messages, tools, on_token=None):
+            on_token("from fallback")
+            return {"content": "from fallback", "tool_calls": None}
+
+        tokens = []
+        config = {"cache_enabled": "false", "chat_model": "m1"}
+        with patch.dict("conch.providers.STREAM_FNS", {"openai": failing, "ollama": fallback}), \
+                patch("conch.providers.get_fallback_chain", return_value=[("ollama", "m2", True)]), \
+                contextlib.redirect_stderr(io.StringIO()):
+            reply, _usage = chat_turn(
+                config, "openai", failing, [{"role": "user", "content": "hi"}],
+                None, {}, {}, on_token=tokens.append,
+            )
+        self.assertEqual(reply, "from fallback")
+        self.assertEqual(tokens, ["from fallback"])
+
+    def test_final_error_reaches_printer(self):
+        def failing(config, messages, tools, on_token=None, **kwargs):
+            return {"content": "[API error: boom]", "tool_calls": None}
+
+        tokens = []
+        with patch.dict("conch.providers.STREAM_FNS", {"openai": failing}), \
+                patch("conch.providers.get_fallback_chain", return_value=[]):
+            reply, _usage = chat_turn(
+                {"cache_enabled": "false"}, "openai", failing, [{"role": "user", "content": "hi"}],
+                None, {}, {}, on_token=tokens.append,
+            )
+        self.assertEqual(tokens, [reply])
+
+    def test_no_retry_after_a_tool_was_dispatched(self):
+        for provider in ("anthropic", "openai"):
+            calls, attempts = [], []
+
+            class _Client:
+                def call_tool(self, name, arguments):
+                    calls.append(name)
+                    return {"content": [{"type": "text", "text": "sent"}]}
+
+            def stream(config, messages, tools, on_token=None, on_tool_call=None):
+                attempts.append(provider)
+                on_tool_call({"id": f"t{len(attempts)}", "function": {"name": "send_email", "arguments": "{}"}})
+                return {"content": "[API error: overloaded]", "tool_calls": None}
+
+            fallback = MagicMock()
+            tokens = []
+            err = io.StringIO()
+            with patch.dict("conch.providers.STREAM_FNS", {provider: stream, "ollama": fallback}), \
+                    patch("conch.providers.get_fallback_chain", return_value=[("ollama", "m2", True)]), \
+                    patch("conch.runtime.time.sleep"), contextlib.redirect_stderr(err):
+                reply, _usage = chat_turn(
+                    {"cache_enabled": "false"}, provider, stream, [{"role": "user", "content": "mail bob"}],
+                    [{"name": "send_email"}], {"send_email": _Client()}, {}, on_token=tokens.append,
+                )
+            self.assertEqual(reply, "[API error: overloaded]")
+            self.assertEqual((calls, attempts), (["send_email"], [provider]))
+            fallback.assert_not_called()
+            self.assertIn("send_email already ran", err.getvalue())
+            self.assertEqual(tokens, [reply])
+
+
+class _BarrierClient:
+    """Fake MCP client whose calls only finish once all of them are running."""
+
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties, timeout=2)
+
+    def call_tool(self, name, arguments):
+        self.barrier.wait()
+        return {"content": [{"type": "text", "text": f"{name}:{arguments['n']}"}]}
+
+
+class TestRunMcpTools(unittest.TestCase):
+    def test_runs_concurrently_and_keys_by_index(self):
+        client = _BarrierClient(3)
+        tool_map = {"a": client, "b": client, "c": client}
+        calls = [(0, "a", {"n": 0}), (2, "b", {"n": 2}), (5, "c", {"n": 5})]
+        with contextlib.redirect_stderr(io.StringIO()):
+            results = _run_mcp_tools(tool_map, calls)
+        self.assertEqual(results, {0: "a:0", 2: "b:2", 5: "c:5"})
+
+    def test_local_calls_overlap_remote_ones(self):
+        client = _BarrierClient(2)
+
+        def run_local():
+            client.barrier.wait()
+            return {1: "local"}
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            results = _run_mcp_tools({"a": client}, [(0, "a", {"n": 0})], run_local=run_local)
+        self.assertEqual(results, {0: "a:0", 1: "local"})
+
+    def test_early_started_calls_are_reused(self):
+        calls = []
+
+        class _Client:
+            def call_tool(self, name, arguments):
+                calls.append(name)
+                return {"content": [{"type": "text", "text": name}]}
+
+        tool_map = {"search": _Client(), "fetch": _Client()}
+        runner = _EarlyToolRunner(tool_map, builtin_clients={"local_shell": object()})
+        runner({"id": "t1", "function": {"name": "search", "arguments": "{}"}})
+        runner({"id": "t2", "function": {"name": "local_shell", "arguments": "{}"}})
+        tool_calls = [
+            {"id": "t1", "function": {"name": "search"}},
+            {"id": "t3", "function": {"name": "fetch"}},
+        ]
+        started = runner.take(tool_calls)
+        self.assertEqual(list(started), [0])
+        with contextlib.redirect_stderr(io.StringIO()):
+            results = _run_mcp_tools(tool_map, [(0, "search", {}), (1, "fetch", {})], started)
+        runner.close()
+        self.assertEqual(results, {0: "search", 1: "fetch"})
+        self.assertEqual(sorted(calls), ["fetch", "search"])
+
+
 if __name__ == "__main__":
     unittest.main()
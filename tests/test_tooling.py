@@ -1,14 +1,28 @@
 """Tests for conch.tooling — profiles, tool groups, filtering."""
 
+import contextlib
+import io
+import tempfile
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
 from conch.tooling import (
     BUILTIN_PROFILES,
+    LocalShellClient,
+    LocalShellPolicy,
     PINNED_TOOL_NAMES,
+    apply_filter,
     cap_tools,
+    core_tools,
     group_tools,
     list_profiles,
+    load_tool_prefs,
+    save_tool_prefs,
+    search_tools,
     tool_group,
+    tool_names,
+    wants_tools,
 )
 
 
@@ -27,6 +41,19 @@ class TestToolGroup(unittest.TestCase):
         self.assertEqual(result, "unknown")
 
 
+class TestWantsTools(unittest.TestCase):
+    def test_action_words(self):
+        self.assertTrue(wants_tools("Can you search for flights?"))
+        self.assertTrue(wants_tools("Deploy it."))
+        self.assertFalse(wants_tools("What do you think about that?"))
+
+    def test_core_tools(self):
+        tools = [_make_tool("github_list"), _make_tool("local_shell"), _make_tool("manage_tools")]
+        core = core_tools(tools)
+        self.assertEqual([t["function"]["name"] for t in core], ["local_shell", "manage_tools"])
+        self.assertIs(core_tools(tools), core)
+
+
 class TestGroupTools(unittest.TestCase):
     def test_groups_by_name(self):
         tools = [_make_tool("local_shell"), _make_tool("save_memory")]
@@ -35,6 +62,37 @@ class TestGroupTools(unittest.TestCase):
         self.assertIn("save_memory", groups)
 
 
+class TestApplyFilter(unittest.TestCase):
+    def test_keeps_order_and_tracks_changes(self):
+        tools = [_make_tool("local_shell"), _make_tool("save_memory"), _make_tool("manage_tools")]
+        tool_map = {}
+        prefs = {"disabled_groups": ["save_memory"]}
+        names = [t["function"]["name"] for t in apply_filter(tools, tool_map, prefs)]
+        self.assertEqual(names, ["local_shell", "manage_tools"])
+        self.assertIs(apply_filter(tools, tool_map, prefs), apply_filter(tools, tool_map, dict(prefs)))
+        prefs["picked_tools"] = ["save_memory"]
+        self.assertEqual(len(apply_filter(tools, tool_map, prefs)), 3)
+        tools.append(_make_tool("save_memory_extra"))
+        self.assertEqual(len(group_tools(tools, tool_map)), 4)
+        self.assertIn("save_memory_extra", tool_names(tools, tool_map))
+
+
+class TestSearchTools(unittest.TestCase):
+    def test_substring_scoring_matches_linear_scan(self):
+        tools = [
+            {"type": "function", "function": {"name": "github_create_issue", "description": "Create an issue"}},
+            {"type": "function", "function": {"name": "github_list_issues", "description": "List issues in a repo"}},
+            {"type": "function", "function": {"name": "slack_send", "description": "Send a Slack message"}},
+        ]
+        tool_map = {}
+        matches = search_tools(tools, tool_map, "Issue list")
+        self.assertEqual([m[1] for m in matches], ["github_list_issues", "github_create_issue"])
+        self.assertEqual(matches[0][0], 2)
+        self.assertEqual(search_tools(tools, tool_map, "hub_cre")[0][1], "github_create_issue")
+        self.assertEqual(search_tools(tools, tool_map, "nothing"), [])
+        self.assertEqual(len(search_tools(tools, tool_map, "s", limit=2)), 2)
+
+
 class TestCapTools(unittest.TestCase):
     def test_no_cap_when_under_limit(self):
         tools = [_make_tool(f"t{i}") for i in range(5)]
@@ -54,6 +112,62 @@ class TestCapTools(unittest.TestCase):
         self.assertIn("local_shell", names)
 
 
+class TestLocalShellClient(unittest.TestCase):
+    def setUp(self):
+        self.client = LocalShellClient()
+        self.client.set_policy(LocalShellPolicy(interactive=False, allow_auto_execute=True))
+
+    def _run(self, command, timeout=10):
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = self.client.call_tool("local_shell", {"command": command, "timeout": timeout})
+        return result["content"][0]["text"]
+
+    def test_output_streams_and_exit_code(self):
+        text = self._run("echo out; echo err >&2; exit 3")
+        self.assertEqual(text, "out\n\n--- stderr ---\nerr\n\n(exit code 3)")
+
+    def test_large_output_truncated(self):
+        text = self._run("yes x | head -c 200000")
+        self.assertTrue(text.endswith("\n... (truncated)"))
+        self.assertEqual(len(text), 15000 + len("\n... (truncated)"))
+
+    def test_timeout(self):
+        self.assertEqual(self._run("sleep 5", timeout=1), "Command timed out after 1s")
+
+
+class TestToolPrefs(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "tool_prefs.json"
+        patcher = patch("conch.tooling.TOOL_PREFS_PATH", self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_round_trip_returns_independent_copies(self):
+        self.assertEqual(load_tool_prefs(), {})
+        save_tool_prefs({"disabled_groups": ["github"]})
+        prefs = load_tool_prefs()
+        prefs["disabled_groups"].append("jira")
+        self.assertEqual(load_tool_prefs(), {"disabled_groups": ["github"]})
+        self.assertFalse(self.path.with_suffix(".tmp").exists())
+
+    def test_unchanged_prefs_are_not_rewritten(self):
+        save_tool_prefs({"disabled_groups": ["github"]})
+        stamp = self.path.stat().st_mtime_ns
+        with patch.object(Path, "replace") as replace:
+            save_tool_prefs({"disabled_groups": ["github"]})
+        replace.assert_not_called()
+        self.assertEqual(self.path.stat().st_mtime_ns, stamp)
+        save_tool_prefs({"disabled_groups": []})
+        self.assertEqual(load_tool_prefs(), {"disabled_groups": []})
+
+    def test_external_edit_is_picked_up(self):
+        save_tool_prefs({"disabled_groups": []})
+        self.path.write_text('{"disabled_groups": ["slack", "gmail"]}')
+        self.assertEqual(load_tool_prefs()["disabled_groups"], ["slack", "gmail"])
+
+
 class TestProfiles(unittest.TestCase):
     def test_builtin_profiles_exist(self):
         self.assertIn("minimal", BUILTIN_PROFILES)